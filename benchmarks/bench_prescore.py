@@ -0,0 +1,98 @@
+"""Highlight pre-scoring: cost and how many windows/tokens reach the LLM.
+
+Usage:
+    python benchmarks/bench_prescore.py [--hours 1] [--top-k 8] [--workdir /tmp/pixal-prescore]
+
+Synthesizes a VOD's PCM audio (quiet speech-like noise with a few loud,
+bursty "hype" moments) and a matching transcript, runs the HighlightScorer
+and reports scoring time, prompt tokens with and without top-K selection,
+and how many of the planted moments landed in the selected windows.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.utils.audio_cache import SAMPLE_RATE  # noqa: E402
+from src.utils.highlight_scorer import HighlightScorer  # noqa: E402
+from src.utils.tokens import estimate_tokens  # noqa: E402
+from src.utils.transcript_format import encode_transcript  # noqa: E402
+
+WORDS = "so anyway chat we are going to try this again and see what happens here".split()
+HYPE = "no way let's go that was insane clip it".split()
+
+
+def synthesize(path, seconds, moments, seed=11):
+    rng = np.random.default_rng(seed)
+    with open(path, "wb") as f:
+        for block in range(0, seconds, 600):
+            n = min(600, seconds - block)
+            audio = rng.normal(0, 0.02, n * SAMPLE_RATE).astype(np.float32)
+            for m in moments:
+                lo, hi = max(m, block), min(m + 20, block + n)
+                if lo < hi:
+                    seg = slice((lo - block) * SAMPLE_RATE, (hi - block) * SAMPLE_RATE)
+                    t = np.arange(seg.stop - seg.start) / SAMPLE_RATE
+                    # loud, 5 Hz amplitude-modulated bursts
+                    audio[seg] = rng.normal(0, 0.3, len(t)) * (0.6 + 0.4 * np.sin(2 * np.pi * 5 * t))
+            f.write(audio.tobytes())
+
+
+def transcript_for(seconds, moments, seed=12):
+    rng = random.Random(seed)
+    segments, t = [], 0.0
+    while t < seconds:
+        length = rng.uniform(2.0, 6.0)
+        hype = any(m <= t < m + 20 for m in moments)
+        pool = HYPE if hype else WORDS
+        words = [rng.choice(pool) for _ in range(int(length * (4 if hype else 2.5)))]
+        segments.append({"start": round(t, 2), "end": round(t + length, 2), "text": " ".join(words)})
+        t += length + rng.uniform(0.0, 1.0)
+    return segments
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--hours", type=float, default=1.0)
+    ap.add_argument("--top-k", type=int, default=8)
+    ap.add_argument("--window-tokens", type=int, default=6000)
+    ap.add_argument("--workdir", default="/tmp/pixal-prescore")
+    args = ap.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    seconds = int(args.hours * 3600)
+    rng = random.Random(4)
+    moments = sorted(rng.sample(range(60, seconds - 60, 60), 5))
+    pcm_path = os.path.join(args.workdir, f"synthetic_{seconds}s.f32")
+    if not os.path.exists(pcm_path):
+        synthesize(pcm_path, seconds, moments)
+    transcript = transcript_for(seconds, moments)
+
+    # Same windowing as ClipHunter, without constructing the API client
+    from src.agents.cliphunter import ClipHunter
+    hunter = ClipHunter.__new__(ClipHunter)
+    hunter.window_tokens, hunter.window_overlap = args.window_tokens, ClipHunter.WINDOW_OVERLAP_SECONDS
+    windows = hunter.split_windows(transcript)
+
+    started = time.perf_counter()
+    top = HighlightScorer(pcm_path).top_windows(windows, transcript, k=args.top_k)
+    elapsed = time.perf_counter() - started
+
+    def tokens(ws):
+        return sum(estimate_tokens(encode_transcript(w)[0]) for w in ws)
+
+    found = sum(any(w[0]["start"] <= m + 10 <= w[-1]["end"] for w in top) for m in moments)
+    print(f"VOD:            {args.hours:.1f} h, {len(transcript)} segments")
+    print(f"scoring:        {elapsed * 1000:.0f} ms ({elapsed / args.hours:.2f} s per hour of audio)")
+    print(f"windows:        {len(windows)} total -> {len(top)} sent")
+    print(f"prompt tokens:  {tokens(windows):,} -> {tokens(top):,}")
+    print(f"planted moments in sent windows: {found}/{len(moments)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Tokens per minute of VOD for the JSON vs compact transcript prompt encodings.
+
+Usage:
+    python benchmarks/bench_prompt_tokens.py [--transcript assets/meta/transcript.json] [--minutes 60]
+
+Without --transcript, a synthetic Whisper-like transcript is generated.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.utils.tokens import estimate_tokens  # noqa: E402
+from src.utils.transcript_format import encode_transcript  # noqa: E402
+
+WORDS = "yo chat that was insane no way he actually hit that shot let's go clip it bro what".split()
+
+
+def synthetic_transcript(minutes, seed=3):
+    rng = random.Random(seed)
+    segments, t = [], 0.0
+    while t < minutes * 60:
+        length = rng.uniform(1.0, 6.0)
+        words = [rng.choice(WORDS) for _ in range(max(1, int(length * 2.5)))]
+        segments.append({"start": round(t, 2), "end": round(t + length, 2), "text": " " + " ".join(words)})
+        t += length + rng.uniform(0.0, 1.5)
+    return segments
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--transcript", help="Transcript JSON to measure")
+    ap.add_argument("--minutes", type=float, default=60, help="Length of the synthetic transcript")
+    args = ap.parse_args()
+
+    if args.transcript:
+        with open(args.transcript, "r") as f:
+            transcript = json.load(f)
+    else:
+        transcript = synthetic_transcript(args.minutes)
+    minutes = max(1e-9, (transcript[-1]["end"] - transcript[0]["start"]) / 60) if transcript else 1
+
+    started = time.perf_counter()
+    before = estimate_tokens(json.dumps(transcript, indent=2))
+    compact, _ = encode_transcript(transcript)
+    after = estimate_tokens(compact)
+    elapsed = time.perf_counter() - started
+
+    print(f"segments:              {len(transcript)} over {minutes:.1f} min")
+    print(f"json indent=2:         {before:>9} tokens  ({before / minutes:,.0f} tokens/min)")
+    print(f"compact [mm:ss] lines: {after:>9} tokens  ({after / minutes:,.0f} tokens/min)")
+    print(f"reduction:             {100 * (1 - after / before):.1f}%  (measured in {elapsed * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
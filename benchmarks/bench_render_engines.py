@@ -0,0 +1,91 @@
+"""Compare RenderForge's per_clip and single_pass engines on a synthetic VOD.
+
+Usage:
+    python benchmarks/bench_render_engines.py [--duration 600] [--clips 10] [--workers 2]
+
+Generates a 1080p60 test-pattern VOD with ffmpeg's lavfi sources, writes a
+synthetic editspec, then renders it once per engine and prints wall times.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.agents.renderforge import RenderForge  # noqa: E402
+
+
+def make_vod(path, duration, ffmpeg_bin):
+    cmd = [
+        ffmpeg_bin, "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size=1920x1080:rate=60:duration={duration}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={duration}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-g", "600",
+        "-c:a", "aac", "-shortest",
+        path,
+    ]
+    subprocess.run(cmd, check=True)
+
+
+def make_editspec(path, duration, count, seed=7):
+    rng = random.Random(seed)
+    clips = []
+    for i in range(count):
+        start = round(rng.uniform(0, duration - 40), 2)
+        clips.append({
+            "start": start,
+            "end": round(start + rng.uniform(15, 35), 2),
+            "title": f"Bench clip {i + 1}",
+            "captions": [{"start": start + 1, "text": f"caption {i + 1}"}],
+            "caption_style": "impact_flash",
+        })
+    with open(path, "w") as f:
+        json.dump(clips, f, indent=2)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--duration", type=int, default=600, help="Synthetic VOD length in seconds")
+    ap.add_argument("--clips", type=int, default=10)
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--ffmpeg-threads", type=int, default=4)
+    ap.add_argument("--ffmpeg-bin", default="ffmpeg")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pixal_bench_") as tmp:
+        vod = os.path.join(tmp, "vod.mp4")
+        editspec = os.path.join(tmp, "editspec.json")
+        print(f"Generating {args.duration}s synthetic VOD...")
+        make_vod(vod, args.duration, args.ffmpeg_bin)
+        make_editspec(editspec, args.duration, args.clips)
+
+        timings = {}
+        for engine in ("per_clip", "single_pass"):
+            forge = RenderForge(
+                workers=args.workers,
+                ffmpeg_threads=args.ffmpeg_threads,
+                ffmpeg_bin=args.ffmpeg_bin,
+                video_input=vod,
+                editspec_path=editspec,
+                output_dir=os.path.join(tmp, engine),
+                engine=engine,
+            )
+            started = time.perf_counter()
+            summary = forge.run()
+            timings[engine] = (time.perf_counter() - started, summary["failed"])
+
+        print("")
+        print(f"{'engine':<12} {'wall (s)':>10} {'failed':>7}")
+        for engine, (wall, failed) in timings.items():
+            print(f"{engine:<12} {wall:>10.2f} {failed:>7}")
+        base = timings["per_clip"][0]
+        print(f"single_pass speed-up: {base / timings['single_pass'][0]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Compare single-process and chunked multi-process transcription.
+
+Usage:
+    python benchmarks/bench_transcribe_chunked.py INPUT.mp4 [--model tiny] [--workers 4] [--chunk 300]
+
+Transcribes INPUT once with the classic single model.transcribe() call and
+once with the process pool, then prints wall times, speed-up and segment counts.
+Needs openai-whisper and ffmpeg; use a few minutes of real speech.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.agents.transcriptor import Transcriptor  # noqa: E402
+
+
+def timed_run(input_path, output_path, **kwargs):
+    transcriptor = Transcriptor(input_path=input_path, output_path=output_path, **kwargs)
+    started = time.perf_counter()
+    transcriptor.transcribe()
+    elapsed = time.perf_counter() - started
+    with open(output_path, "r") as f:
+        return elapsed, len(json.load(f))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("input")
+    ap.add_argument("--model", default="tiny")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() // 2 or 1)
+    ap.add_argument("--chunk", type=float, default=300, help="Window length in seconds")
+    ap.add_argument("--threads-per-worker", type=int, default=2)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pixal_bench_") as tmp:
+        single, single_segments = timed_run(
+            args.input, os.path.join(tmp, "single.json"), model_size=args.model,
+        )
+        parallel, parallel_segments = timed_run(
+            args.input, os.path.join(tmp, "parallel.json"), model_size=args.model,
+            workers=args.workers, chunk_seconds=args.chunk, threads_per_worker=args.threads_per_worker,
+        )
+
+    print("")
+    print(f"{'mode':<22} {'wall (s)':>10} {'segments':>9}")
+    print(f"{'single process':<22} {single:>10.1f} {single_segments:>9}")
+    print(f"{f'{args.workers} workers':<22} {parallel:>10.1f} {parallel_segments:>9}")
+    print(f"speed-up: {single / parallel:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Load time and memory of transcript.json vs the columnar transcript.
+
+Usage:
+    python benchmarks/bench_transcript_columnar.py [--segments 200000] [--workdir /tmp/pixal-cols]
+
+Writes a synthetic transcript in both formats, then loads each one in a
+fresh interpreter and reports wall time and RSS growth, both for a
+plain load and for a load followed by 1000 clip range queries.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from src.utils.transcript_columnar import write_columnar  # noqa: E402
+
+WORDS = "yo chat that was insane no way he actually hit that shot let's go clip it bro what".split()
+
+# Runs in a child process so each measurement starts from a clean heap
+PROBE = r"""
+import json, sys, time
+sys.path.insert(0, sys.argv[3])
+from src.utils.transcript_columnar import ColumnarTranscript
+from src.utils.transcript_index import TranscriptIndex
+import numpy as np
+def rss_kb():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+before = rss_kb()
+t0 = time.perf_counter()
+if sys.argv[1] == "json":
+    with open(sys.argv[2]) as f:
+        transcript = json.load(f)
+else:
+    transcript = ColumnarTranscript(sys.argv[2])
+loaded = time.perf_counter() - t0
+if sys.argv[4] == "query":
+    index = TranscriptIndex(transcript)
+    rng = np.random.default_rng(1)
+    starts = rng.uniform(0, float(index.ends[-1]) - 60, 1000)
+    hits = index.overlapping_batch(np.stack([starts, starts + 45], axis=1))
+total = time.perf_counter() - t0
+grown = rss_kb() - before
+print(json.dumps({"load": loaded, "total": total, "rss_kb": grown, "n": len(transcript)}))
+"""
+
+
+def synthetic_transcript(n, seed=3):
+    rng = random.Random(seed)
+    segments, t = [], 0.0
+    for _ in range(n):
+        length = rng.uniform(1.0, 6.0)
+        words = [rng.choice(WORDS) for _ in range(max(1, int(length * 2.5)))]
+        segments.append({"start": round(t, 2), "end": round(t + length, 2), "text": " ".join(words)})
+        t += length + rng.uniform(0.0, 1.5)
+    return segments
+
+
+def probe(fmt, path, mode):
+    out = subprocess.run([sys.executable, "-c", PROBE, fmt, path, ROOT, mode], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--segments", type=int, default=200_000)
+    ap.add_argument("--workdir", default="/tmp/pixal-cols")
+    args = ap.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    json_path = os.path.join(args.workdir, "transcript.json")
+    cols_path = os.path.join(args.workdir, "transcript.cols")
+    segments = synthetic_transcript(args.segments)
+    with open(json_path, "w") as f:
+        json.dump(segments, f, indent=2)
+    write_columnar(segments, cols_path, source=json_path)
+
+    print(f"segments: {args.segments} ({segments[-1]['end'] / 3600:.1f} h)")
+    print(f"json:     {os.path.getsize(json_path) / 1e6:8.1f} MB on disk")
+    print(f"columnar: {dir_size(cols_path) / 1e6:8.1f} MB on disk")
+    for mode in ("load", "query"):
+        j, c = probe("json", json_path, mode), probe("columnar", cols_path, mode)
+        print(f"[{mode}] json     {j['total'] * 1000:8.1f} ms  +{j['rss_kb'] / 1024:7.1f} MB RSS")
+        print(f"[{mode}] columnar {c['total'] * 1000:8.1f} ms  +{c['rss_kb'] / 1024:7.1f} MB RSS"
+              f"  ({j['total'] / max(c['total'], 1e-9):.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Range queries on large transcripts: linear scan vs TranscriptIndex.
+
+Usage:
+    python benchmarks/bench_transcript_index.py [--segments 100000] [--queries 1000]
+
+Builds a synthetic Whisper-like transcript, then times "segments overlapping
+[a, b]" for random clip-sized ranges with the old linear scan, single index
+lookups and one batched lookup, plus boundary snapping.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.utils.transcript_index import TranscriptIndex  # noqa: E402
+
+
+def synthetic_transcript(n, seed=5):
+    rng = random.Random(seed)
+    segments, t = [], 0.0
+    for i in range(n):
+        length = rng.uniform(1.0, 6.0)
+        segments.append({"start": round(t, 2), "end": round(t + length, 2), "text": f" segment {i}"})
+        t += length + rng.uniform(0.0, 1.5)
+    return segments
+
+
+def linear(transcript, start, end):
+    return [seg for seg in transcript if seg["start"] < end and seg["end"] > start]
+
+
+def timed(fn):
+    started = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - started
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--segments", type=int, default=100_000)
+    ap.add_argument("--queries", type=int, default=1000)
+    args = ap.parse_args()
+
+    transcript = synthetic_transcript(args.segments)
+    total = transcript[-1]["end"]
+    rng = random.Random(7)
+    ranges = []
+    for _ in range(args.queries):
+        start = rng.uniform(0, total - 60)
+        ranges.append((start, start + rng.uniform(15, 60)))
+
+    index, build = timed(lambda: TranscriptIndex(transcript))
+    scan, t_scan = timed(lambda: [linear(transcript, a, b) for a, b in ranges])
+    single, t_single = timed(lambda: [index.overlapping(a, b) for a, b in ranges])
+    batch, t_batch = timed(lambda: index.overlapping_batch(ranges))
+    _, t_snap = timed(lambda: index.snap([t for r in ranges for t in r]))
+    assert scan == single == batch
+
+    per = 1e6 / args.queries
+    print(f"segments:        {len(transcript)} ({total / 3600:.1f} h), {args.queries} queries")
+    print(f"index build:     {build * 1000:9.1f} ms")
+    print(f"linear scan:     {t_scan * 1000:9.1f} ms  ({t_scan * per:,.1f} us/query)")
+    print(f"index single:    {t_single * 1000:9.1f} ms  ({t_single * per:,.1f} us/query)")
+    print(f"index batch:     {t_batch * 1000:9.1f} ms  ({t_batch * per:,.1f} us/query)")
+    print(f"snap {2 * args.queries} times: {t_snap * 1000:9.1f} ms")
+    print(f"speedup (batch): {t_scan / max(t_batch, 1e-9):,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
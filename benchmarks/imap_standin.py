@@ -0,0 +1,266 @@
+"""Local IMAP stand-in server for exercising EmailWatchdog offline.
+
+Usage:
+    python benchmarks/imap_standin.py DIR [--port 1143] [--no-idle]
+        [--newsletter-mb 0] [--summary-every 0]
+
+Serves the .eml files in DIR as a single INBOX; files dropped into DIR while
+it runs are delivered as new mail and pushed to IDLEing clients. Point the
+watchdog at it with
+
+    EMAIL_IMAP_SERVER=127.0.0.1:1143 EMAIL_ADDRESS=x EMAIL_PASSWORD=x  (and email.ssl: false)
+
+Supports just what IMAPClient and the watchdog use: CAPABILITY, LOGIN,
+SELECT, UID SEARCH (ALL / UNSEEN / UID set), UID FETCH (RFC822, BODY[...],
+BODY.PEEK[HEADER.FIELDS (...)]), IDLE, NOOP and LOGOUT. --no-idle drops IDLE
+from the capabilities to exercise the polling fallback.
+
+--newsletter-mb adds a large HTML newsletter to the inbox at startup, and
+--summary-every delivers a synthetic stream summary every N seconds. The
+server logs the bytes sent per FETCH (header-only scans vs full bodies) and,
+for every trigger email, the time from delivery to the client fetching it.
+"""
+import argparse
+import email
+import os
+import re
+import select
+import socketserver
+import threading
+import time
+from email.message import EmailMessage
+
+POLL_SECONDS = 0.05
+TRIGGER_SUBJECT = "Your Stream Summary"
+
+
+class Mailbox:
+    def __init__(self, directory):
+        self.directory = directory
+        self.messages = []  # {"uid", "name", "raw", "seen", "delivered"}
+        self.known = set()
+        self.cond = threading.Condition()
+        # UIDs follow the sorted file names, so they stay valid across restarts
+        self.uidvalidity = 1
+
+    def scan(self):
+        names = sorted(n for n in os.listdir(self.directory) if n.endswith(".eml") and n not in self.known)
+        if not names:
+            return
+        with self.cond:
+            for name in names:
+                with open(os.path.join(self.directory, name), "rb") as f:
+                    raw = f.read().replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+                self.known.add(name)
+                self.messages.append({"uid": len(self.messages) + 1, "name": name, "raw": raw,
+                                      "seen": False, "delivered": time.monotonic()})
+                print(f"[imap] delivered uid {len(self.messages)}: {name} ({len(raw):,} bytes)")
+            self.cond.notify_all()
+
+    def watch(self):
+        while True:
+            self.scan()
+            time.sleep(POLL_SECONDS)
+
+
+def _uid_set(spec, max_uid):
+    uids = set()
+    for part in spec.split(","):
+        lo, _, hi = part.partition(":")
+        lo = max_uid if lo == "*" else int(lo)
+        hi = lo if not hi else (max_uid if hi == "*" else int(hi))
+        lo, hi = min(lo, hi), max(lo, hi)
+        uids.update(range(lo, hi + 1))
+    return uids
+
+
+def _header_fields(raw, fields):
+    msg = email.message_from_bytes(raw)
+    wanted = {f.lower() for f in fields}
+    lines = [f"{k}: {v}" for k, v in msg.items() if k.lower() in wanted]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8")
+
+
+class IMAPHandler(socketserver.StreamRequestHandler):
+    mailbox = None
+    idle = True
+
+    def send(self, line):
+        self.wfile.write(line if isinstance(line, bytes) else line.encode("utf-8") + b"\r\n")
+
+    def capabilities(self):
+        return "IMAP4rev1 UIDPLUS" + (" IDLE" if self.idle else "")
+
+    def handle(self):
+        self.send(f"* OK [CAPABILITY {self.capabilities()}] Pixal IMAP stand-in ready")
+        self.exists = 0
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            tag, _, rest = line.decode("utf-8", "replace").rstrip("\r\n").partition(" ")
+            cmd, _, args = rest.partition(" ")
+            cmd = cmd.upper()
+            if cmd == "UID":
+                cmd, _, args = args.partition(" ")
+                cmd = "UID " + cmd.upper()
+            handler = getattr(self, "cmd_" + cmd.replace(" ", "_").lower(), None)
+            if handler is None:
+                self.send(f"{tag} BAD unsupported command {cmd}")
+                continue
+            if handler(tag, args) is False:
+                return
+
+    def cmd_capability(self, tag, args):
+        self.send(f"* CAPABILITY {self.capabilities()}")
+        self.send(f"{tag} OK CAPABILITY completed")
+
+    def cmd_login(self, tag, args):
+        self.send(f"{tag} OK LOGIN completed")
+
+    def cmd_noop(self, tag, args):
+        self._report_exists()
+        self.send(f"{tag} OK NOOP completed")
+
+    def cmd_logout(self, tag, args):
+        self.send("* BYE logging out")
+        self.send(f"{tag} OK LOGOUT completed")
+        return False
+
+    def cmd_select(self, tag, args):
+        with self.mailbox.cond:
+            self.exists = len(self.mailbox.messages)
+            unseen = sum(1 for m in self.mailbox.messages if not m["seen"])
+        self.send("* FLAGS (\\Seen)")
+        self.send(f"* {self.exists} EXISTS")
+        self.send("* 0 RECENT")
+        self.send(f"* OK [UNSEEN {unseen}] unseen")
+        self.send(f"* OK [UIDVALIDITY {self.mailbox.uidvalidity}] UIDs valid")
+        self.send(f"* OK [UIDNEXT {self.exists + 1}] next UID")
+        self.send(f"{tag} OK [READ-WRITE] SELECT completed")
+
+    cmd_examine = cmd_select
+
+    def _report_exists(self):
+        with self.mailbox.cond:
+            count = len(self.mailbox.messages)
+        if count != self.exists:
+            self.exists = count
+            self.send(f"* {count} EXISTS")
+
+    def cmd_uid_search(self, tag, args):
+        with self.mailbox.cond:
+            messages = list(self.mailbox.messages)
+        criteria = args.upper().split()
+        if "UNSEEN" in criteria:
+            messages = [m for m in messages if not m["seen"]]
+        if "UID" in criteria:
+            wanted = _uid_set(criteria[criteria.index("UID") + 1], len(self.mailbox.messages))
+            messages = [m for m in messages if m["uid"] in wanted]
+        self._report_exists()
+        self.send("* SEARCH" + "".join(f" {m['uid']}" for m in messages))
+        self.send(f"{tag} OK SEARCH completed")
+
+    def cmd_uid_fetch(self, tag, args):
+        spec, _, items = args.partition(" ")
+        with self.mailbox.cond:
+            messages = list(self.mailbox.messages)
+        wanted = _uid_set(spec, len(messages))
+        sent = 0
+        for seq, m in enumerate(messages, 1):
+            if m["uid"] not in wanted:
+                continue
+            parts = [f"UID {m['uid']}".encode()]
+            if re.search(r"\bRFC822\b(?!\.)", items, re.I) or re.search(r"BODY(\.PEEK)?\[\]", items, re.I):
+                name = "RFC822" if "RFC822" in items.upper() else "BODY[]"
+                parts.append(f"{name} {{{len(m['raw'])}}}\r\n".encode() + m["raw"])
+                if "PEEK" not in items.upper():
+                    m["seen"] = True
+                if TRIGGER_SUBJECT in email.message_from_bytes(m["raw"]).get("Subject", ""):
+                    print(f"[imap] trigger uid {m['uid']} fetched {time.monotonic() - m['delivered']:.3f}s after delivery")
+            fields = re.search(r"BODY(?:\.PEEK)?\[HEADER\.FIELDS \(([^)]*)\)\]", items, re.I)
+            if fields:
+                names = fields.group(1).split()
+                data = _header_fields(m["raw"], names)
+                parts.append(f"BODY[HEADER.FIELDS ({' '.join(n.upper() for n in names)})] {{{len(data)}}}\r\n".encode() + data)
+            payload = f"* {seq} FETCH (".encode() + b" ".join(parts) + b")\r\n"
+            sent += len(payload)
+            self.send(payload)
+        print(f"[imap] FETCH {items} for {len(wanted)} messages: {sent:,} bytes sent")
+        self.send(f"{tag} OK FETCH completed")
+
+    def cmd_idle(self, tag, args):
+        if not self.idle:
+            self.send(f"{tag} BAD IDLE not supported")
+            return
+        self.send("+ idling")
+        while True:
+            with self.mailbox.cond:
+                if len(self.mailbox.messages) == self.exists:
+                    self.mailbox.cond.wait(POLL_SECONDS)
+            self._report_exists()
+            readable, _, _ = select.select([self.connection], [], [], 0)
+            if readable:
+                line = self.rfile.readline()
+                if not line:
+                    return False
+                if line.strip().upper() == b"DONE":
+                    self.send(f"{tag} OK IDLE terminated")
+                    return
+
+
+def _write_eml(directory, name, subject, body, subtype="plain"):
+    msg = EmailMessage()
+    msg["From"] = "streams@example.com"
+    msg["To"] = "pixal@example.com"
+    msg["Subject"] = subject
+    msg.set_content(body, subtype=subtype)
+    tmp = os.path.join(directory, name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(msg.as_bytes())
+    os.replace(tmp, os.path.join(directory, name))
+
+
+def _deliver_summaries(directory, every):
+    n = 0
+    while True:
+        time.sleep(every)
+        n += 1
+        body = f"Title: Stand-in stream {n}\n#gaming #clips\nPeak moments: 00:01:05 00:04:30\n"
+        _write_eml(directory, f"{time.time():.3f}-summary.eml", f"{TRIGGER_SUBJECT} #{n}", body)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("directory")
+    ap.add_argument("--port", type=int, default=1143)
+    ap.add_argument("--no-idle", action="store_true", help="don't advertise IDLE (polling fallback)")
+    ap.add_argument("--newsletter-mb", type=float, default=0.0, help="add an HTML newsletter of this size at startup")
+    ap.add_argument("--summary-every", type=float, default=0.0, help="deliver a stream summary every N seconds")
+    args = ap.parse_args()
+
+    os.makedirs(args.directory, exist_ok=True)
+    if args.newsletter_mb:
+        html = "<html><body>" + "<p>Weekly deals and news</p>" * int(args.newsletter_mb * 1e6 / 27) + "</body></html>"
+        _write_eml(args.directory, f"{time.time():.3f}-newsletter.eml", "This week's newsletter", html, "html")
+
+    IMAPHandler.mailbox = Mailbox(args.directory)
+    IMAPHandler.idle = not args.no_idle
+    IMAPHandler.mailbox.scan()
+    threading.Thread(target=IMAPHandler.mailbox.watch, daemon=True).start()
+    if args.summary_every:
+        threading.Thread(target=_deliver_summaries, args=(args.directory, args.summary_every), daemon=True).start()
+
+    socketserver.ThreadingTCPServer.daemon_threads = True
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", args.port), IMAPHandler)
+    print(f"IMAP stand-in serving {os.path.abspath(args.directory)} on 127.0.0.1:{args.port}"
+          + ("" if IMAPHandler.idle else " (no IDLE)"))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
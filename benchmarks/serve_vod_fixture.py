@@ -0,0 +1,132 @@
+"""Local HTTP server for exercising VODFetcher against fixture media.
+
+Usage:
+    python benchmarks/serve_vod_fixture.py DIR [--port 8765] [--rate-mbps 0] [--drop-after-mb 0]
+
+Serves DIR with HTTP Range support, so yt-dlp's generic extractor can
+download `http://127.0.0.1:PORT/<file>.mp4` or an HLS playlist
+(`<name>.m3u8`) and resume a partial download. Make an HLS fixture with:
+
+    ffmpeg -i sample.mp4 -c copy -f hls -hls_time 2 -hls_playlist_type vod DIR/sample.m3u8
+
+--rate-mbps throttles every response, which makes fragment concurrency
+visible in the download's MB/s. --drop-after-mb closes the first response
+for each file after that many MB, so the next fetch has to resume from the .part file.
+Total bytes served are logged after every response, which shows how much
+of the fixture a full, audio-only or ranged ingest actually transferred.
+"""
+import argparse
+import functools
+import os
+import re
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+CHUNK = 64 * 1024
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    rate_bps = 0
+    drop_after = 0
+    dropped = set()
+    bytes_served = 0
+    lock = threading.Lock()
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) or not os.path.exists(path):
+            return super().send_head()
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        m = re.match(r"bytes=(\d*)-(\d*)", self.headers.get("Range", ""))
+        if m and (m.group(1) or m.group(2)):
+            if m.group(1):
+                start = int(m.group(1))
+                end = int(m.group(2)) if m.group(2) else size - 1
+            else:
+                start = max(0, size - int(m.group(2)))
+            if start >= size:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.end_headers()
+                return None
+            end = min(end, size - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        self._range = (path, start, end)
+        return None
+
+    def do_GET(self):
+        self._range = None
+        result = self.send_head()
+        if result is not None:  # directory listing or 404 from the base class
+            try:
+                self.copyfile(result, self.wfile)
+            finally:
+                result.close()
+            return
+        if self._range is None:
+            return
+        path, start, end = self._range
+        with self.lock:
+            drop = self.drop_after and path not in self.dropped
+            if drop:
+                self.dropped.add(path)
+        try:
+            self._send_range(path, start, end - start + 1, drop)
+        finally:
+            self.log_message("served %s bytes total", f"{FixtureHandler.bytes_served:,}")
+
+    def _send_range(self, path, start, remaining, drop):
+        sent = 0
+        with open(path, "rb") as f:
+            f.seek(start)
+            while remaining > 0:
+                chunk = f.read(min(CHUNK, remaining))
+                if not chunk:
+                    break
+                if drop and sent + len(chunk) > self.drop_after:
+                    tail = chunk[:max(0, self.drop_after - sent)]
+                    self.wfile.write(tail)
+                    with self.lock:
+                        FixtureHandler.bytes_served += len(tail)
+                    self.log_message("dropping connection after %d bytes of %s", self.drop_after, self.path)
+                    self.close_connection = True
+                    return
+                self.wfile.write(chunk)
+                sent += len(chunk)
+                with self.lock:
+                    FixtureHandler.bytes_served += len(chunk)
+                remaining -= len(chunk)
+                if self.rate_bps:
+                    time.sleep(len(chunk) / self.rate_bps)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("directory")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--rate-mbps", type=float, default=0.0, help="per-response throttle, MB/s (0 = unlimited)")
+    ap.add_argument("--drop-after-mb", type=float, default=0.0, help="cut each file's first response after N MB")
+    args = ap.parse_args()
+
+    FixtureHandler.rate_bps = args.rate_mbps * 1e6
+    FixtureHandler.drop_after = int(args.drop_after_mb * 1e6)
+    handler = functools.partial(FixtureHandler, directory=args.directory)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"Serving {os.path.abspath(args.directory)} on http://127.0.0.1:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Local stand-in for the OpenAI chat completions endpoint.
+
+Simulates response latency and rate limiting so ScriptCrafter's concurrency,
+rate limiter and backoff can be exercised without real API calls:
+
+    python benchmarks/stub_llm_server.py --port 8765 --latency 2.0 --limit-rpm 30
+    OPENAI_API_BASE=http://127.0.0.1:8765/v1 python pixalctl.py step craft
+
+Every request over --limit-rpm in the trailing minute gets a 429, and
+--error-rate injects random 503s.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_EDIT = {
+    "title": "Stub clip title",
+    "narration": "Stub narration.",
+    "captions": [{"start": 0.0, "text": "stub caption"}],
+    "overlays": [],
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 1.0
+    limit_rpm = 0
+    error_rate = 0.0
+    recent = deque()
+    lock = threading.Lock()
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _rate_limited(self):
+        if not self.limit_rpm:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            while self.recent and now - self.recent[0] > 60:
+                self.recent.popleft()
+            if len(self.recent) >= self.limit_rpm:
+                return True
+            self.recent.append(now)
+        return False
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if self._rate_limited():
+            self._send(429, {"error": {"message": "Rate limit reached", "type": "requests"}})
+            return
+        if random.random() < self.error_rate:
+            self._send(503, {"error": {"message": "Service unavailable", "type": "server_error"}})
+            return
+
+        time.sleep(self.latency)
+        self._send(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(CANNED_EDIT)},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=1.0, help="Seconds per successful response")
+    ap.add_argument("--limit-rpm", type=int, default=0, help="Answer 429 above this many requests/minute (0 = off)")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    args = ap.parse_args()
+
+    StubHandler.latency = args.latency
+    StubHandler.limit_rpm = args.limit_rpm
+    StubHandler.error_rate = args.error_rate
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), StubHandler)
+    print(f"Stub LLM server on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,29 @@ import argparse
 import json
 import os
 import shutil
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
 from src.utils.config import load_config
 from src.utils.doctor import doctor_check
 from src.utils.logger import get_logger
+from src.utils.workspace import Workspace, job_id_for
 
 # Display constants
 DESCRIPTION_PREVIEW_LENGTH = 50
+DEFAULT_BATCH_CONCURRENCY = 2
+DEFAULT_HEARTBEAT_SECONDS = 30
+DEFAULT_POLL_SECONDS = 5
+
+def _workspace(args) -> Workspace:
+    """The configured layout, or the per-job workspace selected with --job."""
+    cfg = load_config(args.config)
+    return Workspace.for_job(cfg, args.job) if args.job else Workspace(cfg)
 
 def cmd_doctor(args):
     cfg = load_config(args.config)
@@ -34,7 +48,8 @@ def cmd_doctor(args):
     return 0 if ok else 1
 
 def cmd_run(args):
-    cfg = load_config(args.config)
+    ws = _workspace(args)
+    cfg = ws.cfg
     log = get_logger("pixal", cfg["runtime"]["log_file"])
 
     # Doctor gate: must pass required checks before running
@@ -44,13 +59,246 @@ def cmd_run(args):
         return 1
 
     from src.pipeline import run_all
-    run_id = run_all(vod_url=args.vod, file_path=args.file, config_path=args.config)
+    run_id = run_all(vod_url=args.vod, file_path=args.file, config_path=args.config, force=args.force,
+                     mode="streaming" if args.streaming else None,
+                     bypass_llm_cache=args.no_llm_cache, workspace=ws)
     log.info(f"Run complete. run_id={run_id}")
     return 0
 
-def cmd_step(args):
+def _batch_sources(args) -> list:
+    sources = list(args.sources or [])
+    if args.from_file:
+        with open(args.from_file, "r", encoding="utf-8") as f:
+            sources += [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+    # The same source twice would mean two jobs sharing one workspace
+    return list(dict.fromkeys(sources))
+
+def _prepare_job(cfg: dict, job_id: str, source: str, meta: dict) -> Workspace:
+    """Create the job's workspace and its stream_meta (from `meta`, else a stub)."""
+    ws = Workspace.for_job(cfg, job_id)
+    stream_meta = ws.path("stream_meta")
+    if meta is not None or not os.path.exists(stream_meta):
+        os.makedirs(os.path.dirname(stream_meta), exist_ok=True)
+        with open(stream_meta, "w", encoding="utf-8") as f:
+            json.dump(meta if meta is not None else {"stream_title": Path(source).stem, "tags": [], "peak_moments": []},
+                      f, indent=2)
+    return ws
+
+def _job_command(config: str, job_id: str, source: str, streaming: bool) -> list:
+    cmd = [sys.executable, os.path.abspath(__file__), "--config", config, "--job", job_id, "run"]
+    cmd += ["--file", source] if os.path.exists(source) else ["--vod", source]
+    if streaming:
+        cmd.append("--streaming")
+    return cmd
+
+def _run_batch_job(args, cfg: dict, source: str, meta: dict) -> dict:
+    """Run one VOD or file through `pixalctl run` in its own workspace and process."""
+    job_id = job_id_for(source)
+    ws = _prepare_job(cfg, job_id, source, meta)
+    cmd = _job_command(args.config, job_id, source, args.streaming)
+    log_path = os.path.join(ws.root, "batch.log")
+    started = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as out:
+        code = subprocess.run(cmd, stdout=out, stderr=subprocess.STDOUT).returncode
+    return {"job": job_id, "source": source, "ok": code == 0, "seconds": time.perf_counter() - started, "log": log_path}
+
+def cmd_batch(args):
+    """Run several VODs concurrently, each in its own workspace.
+
+    Jobs run as separate `pixalctl run --job` processes: agents print to
+    stdout and the Whisper model registry is per process, so processes keep
+    jobs from stepping on each other. Shared caches under cache/ use unique
+    temp names, and the VOD store locks each entry while it is fetched.
+    """
+    cfg = load_config(args.config)
+    log = get_logger("pixal", cfg["runtime"]["log_file"])
+
+    rep = doctor_check(ffmpeg_bin=cfg["runtime"]["ffmpeg_bin"])
+    if rep["missing_required_keys"] or not rep["ffmpeg_found"]:
+        log.error("Refusing to run batch. Fix doctor failures first. Run: python pixalctl.py doctor")
+        return 1
+
+    sources = _batch_sources(args)
+    if not sources:
+        log.error("batch needs VOD URLs / files as arguments or --from-file")
+        return 1
+    meta = None
+    if args.meta:
+        with open(args.meta, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    concurrency = args.concurrency or cfg.get("batch", {}).get("concurrency", DEFAULT_BATCH_CONCURRENCY)
+    concurrency = max(1, min(int(concurrency), len(sources)))
+
+    log.info(f"Batch: {len(sources)} jobs, {concurrency} at a time")
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda src: _run_batch_job(args, cfg, src, meta), sources))
+
+    for r in results:
+        status = "ok" if r["ok"] else "FAILED"
+        log.info(f"  {status:6} {r['job']} in {r['seconds']:.0f}s ({r['source']}); log: {r['log']}")
+    failed = sum(1 for r in results if not r["ok"])
+    log.info(f"Batch complete: {len(results) - failed}/{len(results)} jobs ok")
+    return 0 if failed == 0 else 1
+
+def cmd_submit(args):
+    """Queue VODs / files for `pixalctl worker`; returns as soon as they are queued."""
+    cfg = load_config(args.config)
+    log = get_logger("pixal", cfg["runtime"]["log_file"])
+    sources = _batch_sources(args)
+    if not sources:
+        log.error("submit needs VOD URLs / files as arguments or --from-file")
+        return 1
+    options = {"streaming": args.streaming}
+    if args.meta:
+        with open(args.meta, "r", encoding="utf-8") as f:
+            options["meta"] = json.load(f)
+
+    from src.utils.job_queue import JobQueue
+    queue = JobQueue.from_config(cfg)
+    for source in sources:
+        # Local files are queued by absolute path so workers in any cwd find them
+        if os.path.exists(source):
+            source = os.path.abspath(source)
+        job_id = job_id_for(source)
+        log.info(f"Queued #{queue.enqueue(job_id, source, options, args.max_attempts)} {job_id} ({source})")
+    return 0
+
+def _work_job(args, cfg: dict, queue, worker: str, job: dict, stop, log):
+    """Run one claimed job in its workspace, heartbeating its lease until it exits."""
+    opts = job["options"]
+    ws = _prepare_job(cfg, job["job_id"], job["source"], opts.get("meta"))
+    cmd = _job_command(args.config, job["job_id"], job["source"], opts.get("streaming", False))
+    heartbeat = float(cfg.get("queue", {}).get("heartbeat_seconds", DEFAULT_HEARTBEAT_SECONDS))
+    log_path = os.path.join(ws.root, "worker.log")
+    log.info(f"[{worker}] Running #{job['id']} {job['job_id']} (attempt {job['attempts']}/{job['max_attempts']})")
+    started = time.perf_counter()
+    with open(log_path, "a", encoding="utf-8") as out:
+        out.write(f"--- job #{job['id']} attempt {job['attempts']} by {worker} at {datetime.now().isoformat()}\n")
+        out.flush()
+        proc = subprocess.Popen(cmd, stdout=out, stderr=subprocess.STDOUT)
+        last_beat = time.monotonic()
+        code = None
+        while code is None:
+            try:
+                code = proc.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                pass
+            if code is None and stop.is_set():
+                proc.terminate()
+                proc.wait()
+            elif code is None and time.monotonic() - last_beat >= heartbeat:
+                last_beat = time.monotonic()
+                if not queue.heartbeat(job["id"], worker):
+                    log.warning(f"[{worker}] Lost the lease on #{job['id']}; stopping it")
+                    proc.terminate()
+                    proc.wait()
+                    return
+
+    # Ctrl-C reaches the job's process too, which may exit before `stop` is set
+    if stop.is_set() or code == -signal.SIGINT:
+        queue.release(job["id"], worker)
+        log.info(f"[{worker}] Released #{job['id']} back to the queue")
+    elif code == 0:
+        queue.complete(job["id"], worker)
+        log.info(f"[{worker}] Done #{job['id']} {job['job_id']} in {time.perf_counter() - started:.0f}s")
+    else:
+        queue.fail(job["id"], worker, f"pixalctl run exited with {code}; see {log_path}")
+        log.warning(f"[{worker}] Failed #{job['id']} {job['job_id']} (exit {code}); log: {log_path}")
+
+def cmd_worker(args):
+    """Consume the job queue with N concurrent pipeline processes.
+
+    Each slot claims a job, runs it as `pixalctl run --job` in the job's
+    workspace and heartbeats its lease meanwhile. Run as many workers (on as
+    many terminals or hosts sharing the queue file) as the machine allows.
+    """
+    cfg = load_config(args.config)
+    log = get_logger("pixal", cfg["runtime"]["log_file"])
+
+    rep = doctor_check(ffmpeg_bin=cfg["runtime"]["ffmpeg_bin"])
+    if rep["missing_required_keys"] or not rep["ffmpeg_found"]:
+        log.error("Refusing to start worker. Fix doctor failures first. Run: python pixalctl.py doctor")
+        return 1
+
+    import socket
+    import threading
+    from src.utils.job_queue import JobQueue
+    queue = JobQueue.from_config(cfg)
+    q_cfg = cfg.get("queue", {})
+    concurrency = max(1, int(args.concurrency or q_cfg.get("concurrency", DEFAULT_BATCH_CONCURRENCY)))
+    poll = float(q_cfg.get("poll_seconds", DEFAULT_POLL_SECONDS))
+    stop = threading.Event()
+
+    def slot(n):
+        worker = f"{socket.gethostname()}:{os.getpid()}:{n}"
+        while not stop.is_set():
+            job = queue.claim(worker)
+            if job is None:
+                if args.drain:
+                    return
+                stop.wait(poll)
+                continue
+            if stop.is_set():
+                # Ctrl-C arrived while claiming; don't spend an attempt on it
+                queue.release(job["id"], worker)
+                return
+            try:
+                _work_job(args, cfg, queue, worker, job, stop, log)
+            except KeyboardInterrupt:
+                queue.release(job["id"], worker)
+                raise
+            except Exception as e:
+                queue.fail(job["id"], worker, f"worker error: {e}")
+                log.error(f"[{worker}] Worker error on #{job['id']}: {e}")
+
+    log.info(f"Worker: {concurrency} slots on {queue.path} " + ("(until drained)" if args.drain else "(Ctrl-C to stop)"))
+    threads = [threading.Thread(target=slot, args=(n,), daemon=True) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    try:
+        while any(t.is_alive() for t in threads):
+            for t in threads:
+                t.join(0.5)
+    except KeyboardInterrupt:
+        log.info("Worker stopping; handing running jobs back to the queue")
+        stop.set()
+        for t in threads:
+            t.join()
+    counts = queue.counts()
+    log.info("Queue: " + ", ".join(f"{n} {state}" for state, n in counts.items()))
+    return 0
+
+def cmd_queue(args):
     cfg = load_config(args.config)
     log = get_logger("pixal", cfg["runtime"]["log_file"])
+    from src.utils.job_queue import JobQueue
+    queue = JobQueue.from_config(cfg)
+
+    if args.action == "retry":
+        if args.id is None:
+            log.error("queue retry needs --id (see: pixalctl queue list --state dead)")
+            return 1
+        if not queue.retry(args.id):
+            log.error(f"Job #{args.id} is not in the dead-letter state")
+            return 1
+        log.info(f"Requeued #{args.id}")
+        return 0
+
+    jobs = queue.jobs(args.state)
+    if not jobs:
+        log.info("Job queue is empty" + (f" ({args.state})" if args.state else ""))
+    for job in jobs:
+        updated = datetime.fromtimestamp(job["updated"]).isoformat(timespec="seconds")
+        error = f" error={job['last_error']}" if job["last_error"] else ""
+        log.info(f"  #{job['id']:<4} {job['state']:7} {job['job_id']} attempts={job['attempts']}/{job['max_attempts']} "
+                 f"updated={updated}{error}")
+    log.info("Queue: " + ", ".join(f"{n} {state}" for state, n in queue.counts().items()))
+    return 0
+
+def cmd_step(args):
+    ws = _workspace(args)
+    cfg = ws.cfg
+    log = get_logger("pixal", cfg["runtime"]["log_file"])
 
     rep = doctor_check(ffmpeg_bin=cfg["runtime"]["ffmpeg_bin"])
     if rep["missing_required_keys"] or not rep["ffmpeg_found"]:
@@ -58,7 +306,7 @@ def cmd_step(args):
         return 1
 
     from src.pipeline import run_step
-    run_step(args.step, config_path=args.config)
+    run_step(args.step, config_path=args.config, bypass_llm_cache=args.no_llm_cache, workspace=ws)
     log.info(f"Step complete: {args.step}")
     return 0
 
@@ -69,18 +317,14 @@ def _file_info(path: Path):
     return {"path": str(path), "mtime": datetime.fromtimestamp(st.st_mtime).isoformat(), "size": st.st_size}
 
 def cmd_status(args):
-    cfg = load_config(args.config)
+    ws = _workspace(args)
+    cfg = ws.cfg
     log = get_logger("pixal", cfg["runtime"]["log_file"])
 
     checks = [
-        Path(cfg["paths"]["transcript"]),
-        Path(cfg["paths"]["clips"]),
-        Path(cfg["paths"]["editspec"]),
-        Path(cfg["paths"]["augmented_editspec"]),
-        Path(cfg["paths"]["fcpxml"]),
-        Path("outputs/shorts"),
-        Path("outputs/capsynth"),
-        Path(cfg["paths"]["input_video"]),
+        Path(ws.path(name))
+        for name in ("transcript", "clips", "editspec", "augmented_editspec", "fcpxml",
+                     "shorts_dir", "capsynth_dir", "input_video")
     ]
 
     log.info("Status report:")
@@ -95,7 +339,21 @@ def cmd_status(args):
             else:
                 log.warning(f"  MISSING {p}")
 
-    runs_dir = Path(cfg["outputs"]["runs_dir"])
+    from src.utils.artifacts import load_manifest
+    manifest = load_manifest(ws.path("run_manifest"))
+    if manifest["steps"]:
+        log.info("Run manifest:")
+        for name, record in manifest["steps"].items():
+            log.info(f"  STEP {name} completed_at={record.get('completed_at')}")
+
+    cache = _transcript_cache(cfg)
+    entries = cache.entries()
+    if entries:
+        hits = sum(e.get("hits", 0) for e in entries)
+        size_mb = sum(e["bytes"] for e in entries) / (1024 * 1024)
+        log.info(f"Transcript cache: {len(entries)} entries ({size_mb:.1f} MB), {hits} hits")
+
+    runs_dir = Path(ws.path("runs_dir"))
     if runs_dir.exists():
         runs = sorted([d for d in runs_dir.iterdir() if d.is_dir()], reverse=True)
         if runs:
@@ -106,16 +364,77 @@ def cmd_status(args):
         log.info("Runs directory missing (will be created on first run).")
     return 0
 
-def _clean_outputs(cfg: dict, log):
+def _transcript_cache(cfg: dict):
+    from src.utils.transcript_cache import TranscriptCache
+    return TranscriptCache(cfg.get("cache", {}).get("transcripts_dir", "cache/transcripts"))
+
+def cmd_cache(args):
+    cfg = load_config(args.config)
+    log = get_logger("pixal", cfg["runtime"]["log_file"])
+    cache = _transcript_cache(cfg)
+
+    if args.action == "list":
+        entries = cache.entries()
+        if not entries:
+            log.info(f"Transcript cache is empty ({cache.cache_dir})")
+            return 0
+        log.info(f"Transcript cache ({cache.cache_dir}):")
+        for e in entries:
+            settings = e.get("settings", {})
+            last_used = datetime.fromtimestamp(e.get("last_used", 0)).isoformat(timespec="seconds")
+            log.info(
+                f"  {e['key'][:12]} model={settings.get('model_size')} lang={settings.get('language') or 'auto'} "
+                f"segments={e.get('segments')} size={e['bytes']} hits={e.get('hits', 0)} "
+                f"last_used={last_used} source={e.get('source')}"
+            )
+        return 0
+
+    if args.action == "prune":
+        if args.older_than_days is None and args.max_mb is None and not args.all:
+            log.error("prune needs --older-than-days, --max-mb or --all")
+            return 1
+        if args.all:
+            removed = cache.prune(max_mb=0)
+        else:
+            removed = cache.prune(older_than_days=args.older_than_days, max_mb=args.max_mb)
+        freed = sum(e["bytes"] for e in removed) / (1024 * 1024)
+        log.info(f"Pruned {len(removed)} transcript cache entries ({freed:.1f} MB)")
+        return 0
+
+    raise ValueError("cache action must be: list|prune")
+
+def cmd_transcript(args):
+    ws = _workspace(args)
+    log = get_logger("pixal", ws.path("log_file"))
+
+    from src.utils.transcript_columnar import columnar_path, columnar_to_json, json_to_columnar
+    json_path = ws.path("transcript")
+    if args.action == "to-columnar":
+        src = args.input or json_path
+        out = json_to_columnar(src, args.output or columnar_path(src))
+        log.info(f"Columnar transcript written to {out}")
+        return 0
+    if args.action == "to-json":
+        src = args.input or columnar_path(json_path)
+        out = columnar_to_json(src, args.output or json_path)
+        log.info(f"JSON transcript written to {out}")
+        return 0
+    raise ValueError("transcript action must be: to-columnar|to-json")
+
+def _clean_outputs(ws: Workspace, log):
     """Clean outputs directories."""
-    for p in ["outputs/shorts", "outputs/capsynth", cfg["outputs"]["runs_dir"]]:
-        if Path(p).exists():
+    for p in [ws.path("shorts_dir"), ws.path("capsynth_dir"), ws.path("runs_dir")]:
+        if Path(p).is_symlink():
+            # Legacy output paths link into the latest run folder
+            Path(p).unlink()
+            log.info(f"Deleted link: {p}")
+        elif Path(p).exists():
             shutil.rmtree(p)
             log.info(f"Deleted: {p}")
 
-def _clean_meta(log):
+def _clean_meta(ws: Workspace, log):
     """Clean assets/meta directory."""
-    meta = Path("assets/meta")
+    meta = Path(ws.meta_dir())
     if meta.exists():
         # Keep sample editspec if desired; for now wipe all JSON except .gitkeep
         for p in meta.glob("*"):
@@ -123,32 +442,32 @@ def _clean_meta(log):
                 continue
             if p.is_file():
                 p.unlink()
-        log.info("Cleared assets/meta (files only).")
+        log.info(f"Cleared {meta} (files only).")
 
 def cmd_clean(args):
-    cfg = load_config(args.config)
-    log = get_logger("pixal", cfg["runtime"]["log_file"])
+    ws = _workspace(args)
+    log = get_logger("pixal", ws.path("log_file"))
 
     target = args.target.lower()
     if target == "outputs":
-        _clean_outputs(cfg, log)
+        _clean_outputs(ws, log)
         return 0
 
     if target == "meta":
-        _clean_meta(log)
+        _clean_meta(ws, log)
         return 0
 
     if target == "all":
-        _clean_outputs(cfg, log)
-        _clean_meta(log)
+        _clean_outputs(ws, log)
+        _clean_meta(ws, log)
         return 0
 
     raise ValueError("clean target must be: outputs|meta|all")
 
 
-def _load_clips_index(log) -> list:
+def _load_clips_index(ws: Workspace, log) -> list:
     """Load the CLIPS_INDEX.json for metadata."""
-    clips_index_path = Path("outputs/capsynth/CLIPS_INDEX.json")
+    clips_index_path = Path(ws.path("capsynth_dir")) / "CLIPS_INDEX.json"
     if not clips_index_path.exists():
         log.warning("CLIPS_INDEX.json not found; metadata will be incomplete")
         return []
@@ -191,7 +510,8 @@ def _derive_upload_metadata(clip_info: dict, clip_path: Path) -> dict:
 
 def cmd_post(args):
     """Post command handler - validates and optionally uploads shorts."""
-    cfg = load_config(args.config)
+    ws = _workspace(args)
+    cfg = ws.cfg
     log = get_logger("pixal", cfg["runtime"]["log_file"])
 
     platform = args.platform.lower()
@@ -201,8 +521,12 @@ def cmd_post(args):
 
     # Always run validation first
     from src.agents.upload_validator import UploadValidator
+    from src.utils.media_analysis import MediaAnalysis
 
-    validator = UploadValidator()
+    analysis = MediaAnalysis.for_input(
+        ws.path("input_video"), cfg.get("cache", {}).get("analysis_dir", "cache/analysis")
+    )
+    validator = UploadValidator(analysis=analysis, workspace=ws)
     report = validator.validate_all()
     validator.print_summary(report)
 
@@ -219,10 +543,10 @@ def cmd_post(args):
         log.info("=" * 60)
 
         # Load metadata
-        clips_index = _load_clips_index(log)
+        clips_index = _load_clips_index(ws, log)
         clips_by_id = {item["clip_id"]: item for item in clips_index}
 
-        shorts_dir = Path("outputs/shorts")
+        shorts_dir = Path(ws.path("shorts_dir"))
         mp4_files = sorted(shorts_dir.glob("*.mp4"))
 
         # Apply limit if specified
@@ -268,6 +592,7 @@ def cmd_post(args):
 def main():
     ap = argparse.ArgumentParser(prog="pixalctl", description="Pixal Operator CLI")
     ap.add_argument("--config", default="pixal.yaml", help="Config file path (default pixal.yaml)")
+    ap.add_argument("--job", help="Use the per-job workspace workspaces/JOB (as created by batch)")
 
     sub = ap.add_subparsers(dest="cmd", required=True)
 
@@ -277,15 +602,63 @@ def main():
     p_run = sub.add_parser("run", help="Run full pipeline")
     p_run.add_argument("--vod", help="VOD URL (twitch/youtube)")
     p_run.add_argument("--file", help="Local video file path")
+    p_run.add_argument("--force", action="append", metavar="STEP",
+                       help="Re-run STEP and everything downstream even if up to date (repeatable; 'all' for every step)")
+    p_run.add_argument("--streaming", action="store_true",
+                       help="Move each clip through craft/forge/render/capsynth as soon as it is detected")
+    p_run.add_argument("--no-llm-cache", action="store_true", help="Skip LLM response cache lookups")
     p_run.set_defaults(func=cmd_run)
 
+    p_batch = sub.add_parser("batch", help="Run several VODs in parallel, each in its own workspace")
+    p_batch.add_argument("sources", nargs="*", help="VOD URLs or local video files")
+    p_batch.add_argument("--from-file", help="File with one VOD URL or path per line")
+    p_batch.add_argument("--concurrency", type=int,
+                         help=f"Jobs running at once (default batch.concurrency, else {DEFAULT_BATCH_CONCURRENCY})")
+    p_batch.add_argument("--meta", help="stream_meta JSON to use for every job")
+    p_batch.add_argument("--streaming", action="store_true", help="Run each job in streaming mode")
+    p_batch.set_defaults(func=cmd_batch)
+
+    p_submit = sub.add_parser("submit", help="Queue VODs for pixalctl worker")
+    p_submit.add_argument("sources", nargs="*", help="VOD URLs or local video files")
+    p_submit.add_argument("--from-file", help="File with one VOD URL or path per line")
+    p_submit.add_argument("--meta", help="stream_meta JSON to use for every job")
+    p_submit.add_argument("--streaming", action="store_true", help="Run each job in streaming mode")
+    p_submit.add_argument("--max-attempts", type=int, help="Attempts before a job is dead-lettered (default queue.max_attempts)")
+    p_submit.set_defaults(func=cmd_submit)
+
+    p_worker = sub.add_parser("worker", help="Run queued jobs, N at a time")
+    p_worker.add_argument("--concurrency", type=int,
+                          help=f"Jobs running at once (default queue.concurrency, else {DEFAULT_BATCH_CONCURRENCY})")
+    p_worker.add_argument("--drain", action="store_true", help="Exit once no job is runnable instead of waiting for more")
+    p_worker.set_defaults(func=cmd_worker)
+
+    p_queue = sub.add_parser("queue", help="List queued jobs or retry dead-lettered ones")
+    p_queue.add_argument("action", choices=["list", "retry"])
+    p_queue.add_argument("--state", choices=["queued", "running", "done", "dead"], help="list: only jobs in this state")
+    p_queue.add_argument("--id", type=int, help="retry: the dead job to requeue")
+    p_queue.set_defaults(func=cmd_queue)
+
     p_step = sub.add_parser("step", help="Run a single pipeline step")
-    p_step.add_argument("step", help="one of: transcribe, detect, craft, forge, timeline, render, capsynth")
+    p_step.add_argument("step", help="one of: audio, analyze, transcribe, detect, craft, forge, timeline, render, capsynth")
+    p_step.add_argument("--no-llm-cache", action="store_true", help="Skip LLM response cache lookups")
     p_step.set_defaults(func=cmd_step)
 
     p_status = sub.add_parser("status", help="Show pipeline outputs and timestamps")
     p_status.set_defaults(func=cmd_status)
 
+    p_cache = sub.add_parser("cache", help="List or prune the transcript cache")
+    p_cache.add_argument("action", choices=["list", "prune"])
+    p_cache.add_argument("--older-than-days", type=float, help="prune: drop entries unused for this many days")
+    p_cache.add_argument("--max-mb", type=float, help="prune: drop least recently used entries above this size")
+    p_cache.add_argument("--all", action="store_true", help="prune: drop every entry")
+    p_cache.set_defaults(func=cmd_cache)
+
+    p_transcript = sub.add_parser("transcript", help="Convert transcripts between JSON and the columnar format")
+    p_transcript.add_argument("action", choices=["to-columnar", "to-json"])
+    p_transcript.add_argument("--input", help="Source (default: paths.transcript or its .cols directory)")
+    p_transcript.add_argument("--output", help="Destination (default: next to / in place of paths.transcript)")
+    p_transcript.set_defaults(func=cmd_transcript)
+
     p_clean = sub.add_parser("clean", help="Clean generated artifacts")
     p_clean.add_argument("target", help="outputs|meta|all")
     p_clean.set_defaults(func=cmd_clean)
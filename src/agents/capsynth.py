@@ -2,41 +2,45 @@ import json
 import os
 from pathlib import Path
 
-EDITSPEC_PATH = "assets/meta/augmented_editspec.json"
-OUT_DIR = Path("outputs/capsynth")
+from src.utils.workspace import Workspace
 
 class CapSynth:
-    def __init__(self):
+    def __init__(self, workspace=None):
         print("[🎛️ INIT] CapSynth v0 (export pack) online")
-        (OUT_DIR / "subtitles").mkdir(parents=True, exist_ok=True)
-        (OUT_DIR / "manifests").mkdir(parents=True, exist_ok=True)
+        ws = workspace or Workspace()
+        self.editspec_path = ws.path("augmented_editspec")
+        self.out_dir = Path(ws.path("capsynth_dir"))
+        (self.out_dir / "subtitles").mkdir(parents=True, exist_ok=True)
+        (self.out_dir / "manifests").mkdir(parents=True, exist_ok=True)
 
     def run(self):
-        edits = self._load_json(EDITSPEC_PATH)
-        index = []
+        edits = self._load_json(self.editspec_path)
+        index = [self.export_clip(clip, i) for i, clip in enumerate(edits, start=1)]
+        self.write_index(index)
 
-        for i, clip in enumerate(edits, start=1):
-            clip_id = f"clip_{i:03}"
-            srt_path = OUT_DIR / "subtitles" / f"{clip_id}.srt"
-            manifest_path = OUT_DIR / "manifests" / f"{clip_id}.manifest.json"
+    def export_clip(self, clip, i):
+        """Write the subtitles and manifest of one clip; returns its CLIPS_INDEX entry."""
+        clip_id = f"clip_{i:03}"
+        srt_path = self.out_dir / "subtitles" / f"{clip_id}.srt"
+        manifest_path = self.out_dir / "manifests" / f"{clip_id}.manifest.json"
 
-            self._write_srt(srt_path, clip.get("captions", []), clip_start=clip["start"])
-            self._write_manifest(manifest_path, clip)
+        self._write_srt(srt_path, clip.get("captions", []), clip_start=clip["start"])
+        self._write_manifest(manifest_path, clip)
 
-            index.append({
-                "clip_id": clip_id,
-                "start": clip["start"],
-                "end": clip["end"],
-                "title": clip.get("title"),
-                "caption_style": clip.get("caption_style"),
-                "srt": str(srt_path),
-                "manifest": str(manifest_path),
-            })
+        return {
+            "clip_id": clip_id,
+            "start": clip["start"],
+            "end": clip["end"],
+            "title": clip.get("title"),
+            "caption_style": clip.get("caption_style"),
+            "srt": str(srt_path),
+            "manifest": str(manifest_path),
+        }
 
-        with open(OUT_DIR / "CLIPS_INDEX.json", "w", encoding="utf-8") as f:
-            json.dump(index, f, indent=2)
+    def write_index(self, index):
+        self._replace_text(self.out_dir / "CLIPS_INDEX.json", json.dumps(index, indent=2))
 
-        print(f"[✅] CapSynth export pack ready at: {OUT_DIR}")
+        print(f"[✅] CapSynth export pack ready at: {self.out_dir}")
 
     def _load_json(self, path):
         with open(path, "r", encoding="utf-8") as f:
@@ -55,8 +59,7 @@ class CapSynth:
             "overlays": clip.get("overlays", []),
             "caption_style": clip.get("caption_style"),
         }
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, indent=2)
+        self._replace_text(path, json.dumps(payload, indent=2))
 
     def _write_srt(self, path, captions, clip_start=0.0):
         # captions may be list[dict] or list[str]; normalize
@@ -68,7 +71,7 @@ class CapSynth:
                 normalized.append({"start": float(clip_start), "text": c})
         if not normalized:
             # still write an empty file to keep pipeline deterministic
-            path.write_text("", encoding="utf-8")
+            self._replace_text(path, "")
             return
 
         # naive timing: each caption shows ~2s; refine later if you want word-level timing
@@ -81,7 +84,14 @@ class CapSynth:
             lines.append(cap["text"].strip())
             lines.append("")
 
-        path.write_text("\n".join(lines), encoding="utf-8")
+        self._replace_text(path, "\n".join(lines))
+
+    def _replace_text(self, path, text):
+        # Export files may be hardlinked into earlier run folders; replace them
+        # instead of truncating the shared inode.
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
 
     def _fmt_srt_time(self, seconds):
         ms = int(round((seconds - int(seconds)) * 1000))
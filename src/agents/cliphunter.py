@@ -1,5 +1,15 @@
 import json
+import math
+from concurrent.futures import ThreadPoolExecutor
 from src.utils.env_loader import load_env
+from src.utils.highlight_scorer import HighlightScorer
+from src.utils.llm_cache import LLMCache
+from src.utils.ratelimit import RateLimiter, call_with_backoff
+from src.utils.tokens import estimate_tokens
+from src.utils.transcript_columnar import load_transcript
+from src.utils.transcript_format import encode_segment, encode_transcript
+from src.utils.transcript_stream import DEFAULT_IDLE_TIMEOUT, StreamIncomplete, follow_segments, stream_paths
+from src.utils.workspace import Workspace
 import anthropic
 
 
@@ -9,56 +19,270 @@ class ClipHunter:
     MAX_CLIP_DURATION = 60  # Maximum clip duration in seconds
     MIN_CLIPS = 5           # Minimum number of clips to extract
     MAX_CLIPS = 10          # Maximum number of clips to extract
-    # Limit transcript segments to prevent exceeding Claude's context window
-    # ~40 segments typically fits within ~8k tokens, leaving room for metadata and response
-    MAX_TRANSCRIPT_SEGMENTS = 40
+    # Transcript tokens packed into the single-prompt mode, leaving room for
+    # metadata and the response within Claude's budget
+    PROMPT_TOKEN_BUDGET = 8000
+    # Claude request settings (also part of the LLM cache key)
+    MODEL_NAME = "claude-sonnet-4-20250514"
+    MAX_TOKENS = 2048
+    TEMPERATURE = 0.5
+    # Windowed (map-reduce) detection over the full transcript
+    WINDOW_TOKEN_BUDGET = 6000      # transcript tokens per window prompt
+    WINDOW_OVERLAP_SECONDS = 60     # overlap so moments on a boundary are seen whole
+    WINDOW_CONCURRENCY = 4          # in-flight Claude requests
+    CLIPS_PER_WINDOW = 3            # candidates requested from each window
+    DEDUPE_OVERLAP = 0.5            # candidates overlapping more than this (IoU) are duplicates
+    MAX_DEAD_FRACTION = 0.5         # candidates more black or silent than this are dropped
+    REQUESTS_PER_MINUTE = 50
+    TOKENS_PER_MINUTE = 40000
+    MAX_RETRIES = 5
 
-    def __init__(self):
+    def __init__(
+        self,
+        cache=None,
+        mode="single",
+        window_tokens=None,
+        window_overlap=None,
+        concurrency=None,
+        requests_per_minute=None,
+        tokens_per_minute=None,
+        max_retries=None,
+        follow=False,
+        follow_timeout=None,
+        prescore_top_k=None,
+        audio_path=None,
+        analysis=None,
+        workspace=None,
+    ):
+        """Set up Claude access.
+
+        `cache` is an optional LLMCache shared with ScriptCrafter. `mode` is
+        "single" (one prompt over the head of the transcript) or "windowed"
+        (score overlapping windows of the whole transcript, then merge).
+        With `follow`, windowed mode reads the incremental transcript stream
+        and scores each window as soon as the Transcriptor has finished it;
+        it gives up after `follow_timeout` seconds without progress.
+        `prescore_top_k` ranks windows locally (audio at `audio_path`, the
+        PCM cache, plus transcript and metadata signals) and sends only the
+        best K to Claude; it needs the whole transcript, so it is skipped
+        while following a stream. `analysis` (a MediaAnalysis) adds scene
+        changes to pre-scoring and drops candidates that are mostly black or
+        silent. `workspace` locates the transcript, stream metadata and clips
+        (default: the repo-root layout).
+        """
         print("[🔍 INIT] ClipHunter ready")
+        if mode not in ("single", "windowed"):
+            raise ValueError(f"Unknown detection mode: {mode}")
+        self.cache = cache
+        self.mode = mode
+        self.window_tokens = int(window_tokens or self.WINDOW_TOKEN_BUDGET)
+        self.window_overlap = float(self.WINDOW_OVERLAP_SECONDS if window_overlap is None else window_overlap)
+        self.concurrency = max(1, int(concurrency or self.WINDOW_CONCURRENCY))
+        self.max_retries = int(self.MAX_RETRIES if max_retries is None else max_retries)
+        self.follow = follow and mode == "windowed"
+        self.follow_timeout = float(follow_timeout or DEFAULT_IDLE_TIMEOUT)
+        self.prescore_top_k = int(prescore_top_k) if prescore_top_k else None
+        self.audio_path = audio_path
+        self.analysis = analysis
+        self.limiter = RateLimiter(
+            requests_per_minute or self.REQUESTS_PER_MINUTE,
+            tokens_per_minute or self.TOKENS_PER_MINUTE,
+        )
         self.env = load_env()
         self.client = anthropic.Anthropic(api_key=self.env["CLAUDE_API_KEY"])
-        self.transcript_path = "assets/meta/transcript.json"
-        self.meta_path = "assets/meta/stream_meta.json"
-        self.output_path = "assets/meta/clips.json"
+        ws = workspace or Workspace()
+        self.transcript_path = ws.path("transcript")
+        self.meta_path = ws.path("stream_meta")
+        self.output_path = ws.path("clips")
+        self.stream_path, self.progress_path = stream_paths(self.transcript_path)
+
+    def detect(self, writer_alive=None):
+        """Detect clips and write them to clips.json; returns True on success.
 
-    def detect(self):
+        `writer_alive` tells a follower whether the in-process Transcriptor
+        is still running, so a slow window isn't mistaken for a stall.
+        """
         print("[🧠] Analyzing transcript with Claude...")
-        transcript = self.load_file(self.transcript_path)
+        if self.follow:
+            print(f"[📡] Following transcript stream {self.stream_path}")
+            transcript = follow_segments(self.stream_path, self.progress_path,
+                                         idle_timeout=self.follow_timeout, writer_alive=writer_alive)
+        else:
+            transcript = self.load_transcript()
         meta = self.load_file(self.meta_path)
 
         if transcript is None or meta is None:
             print("[❌] Failed to load required input files")
-            return
+            return False
 
-        prompt = self.build_prompt(transcript, meta)
         try:
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=2048,
-                temperature=0.5,
-                messages=[{"role": "user", "content": prompt}]
-            )
-        except Exception as e:
-            print(f"[❌] Claude API request failed: {e}")
-            return
+            if self.mode == "windowed":
+                clips = self.detect_windowed(transcript, meta)
+            else:
+                clips = self.ask_claude(self.build_prompt(transcript, meta))
+        except StreamIncomplete as e:
+            # Clips from part of the transcript would pass for a full result
+            print(f"[❌] Transcript stream ended early ({e}); not writing clips")
+            return False
+        if self.cache:
+            print(f"[💾] {self.cache.summary()}")
+        if not clips:
+            print("[❌] No clip candidates detected")
+            return False
+
+        with open(self.output_path, "w") as f:
+            json.dump(clips, f, indent=2)
+
+        print(f"[✅] Clip candidates saved to {self.output_path}")
+        return True
+
+    def ask_claude(self, prompt):
+        """Send one prompt and return the validated clip list, or None on failure."""
+        cache_key = LLMCache.make_key(self.MODEL_NAME, self.TEMPERATURE, self.MAX_TOKENS, prompt)
+        response_text = self.cache.get(cache_key) if self.cache else None
+        from_api = response_text is None
+        if from_api:
+            def request():
+                self.limiter.acquire(estimate_tokens(prompt) + self.MAX_TOKENS)
+                return self.client.messages.create(
+                    model=self.MODEL_NAME,
+                    max_tokens=self.MAX_TOKENS,
+                    temperature=self.TEMPERATURE,
+                    messages=[{"role": "user", "content": prompt}]
+                )
+
+            try:
+                response = call_with_backoff(request, max_retries=self.max_retries, label="Claude request")
+                # Extract text content from Claude response
+                response_text = response.content[0].text
+            except (IndexError, AttributeError) as e:
+                print(f"[❌] Failed to parse Claude response: {e}")
+                return None
+            except Exception as e:
+                print(f"[❌] Claude API request failed: {e}")
+                return None
 
         try:
-            # Extract text content from Claude response
-            response_text = response.content[0].text
             clips = json.loads(response_text)
-        except (json.JSONDecodeError, IndexError, KeyError) as e:
+        except json.JSONDecodeError as e:
             print(f"[❌] Failed to parse Claude response: {e}")
-            return
+            return None
 
         # Validate clips structure
         if not self.validate_clips(clips):
             print("[❌] Invalid clips structure received from Claude")
-            return
+            return None
 
-        with open(self.output_path, "w") as f:
-            json.dump(clips, f, indent=2)
+        # Only fresh responses that parsed and validated are worth storing; a
+        # hit was already refreshed by get(), and re-putting it would reset its TTL
+        if self.cache and from_api:
+            self.cache.put(cache_key, response_text)
+        return clips
 
-        print(f"[✅] Clip candidates saved to {self.output_path}")
+    def detect_windowed(self, transcript, meta):
+        """Map-reduce detection: score every window, then merge and rank candidates.
+
+        `transcript` may be any iterable of segments; windows are submitted
+        as soon as they fill up, so a live stream is scored while it grows.
+        """
+        print(f"[🪟] Scoring transcript windows ({self.concurrency} in flight)")
+
+        def score(window):
+            w_start, w_end = window[0]["start"], window[-1]["end"]
+            found = self.ask_claude(self.build_window_prompt(window, meta)) or []
+            # Keep candidates inside their window with a usable duration
+            return [
+                c for c in found
+                if w_start - 1 <= c["start"] < c["end"] <= w_end + 1
+                and self.MIN_CLIP_DURATION <= c["end"] - c["start"] <= self.MAX_CLIP_DURATION
+                and not self._is_dead_air(c)
+            ]
+
+        windows = self.iter_windows(transcript)
+        if self.prescore_top_k and not self.follow:
+            windows = list(windows)
+            scorer = HighlightScorer(self.audio_path, analysis=self.analysis)
+            top = scorer.top_windows(windows, transcript, meta, self.prescore_top_k)
+            print(f"[📈] Pre-scored {len(windows)} windows locally; sending the top {len(top)} to Claude")
+            windows = top
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = [pool.submit(score, window) for window in windows]
+            candidates = [c for fut in futures for c in fut.result()]
+        print(f"[🪟] Scored {len(futures)} windows")
+
+        clips = self.merge_candidates(candidates)
+        if len(clips) < self.MIN_CLIPS:
+            print(f"[⚠️] Only {len(clips)} clips found (wanted at least {self.MIN_CLIPS})")
+        return clips
+
+    def split_windows(self, transcript):
+        """Split the transcript into overlapping windows that fit the token budget."""
+        return list(self.iter_windows(transcript))
+
+    def iter_windows(self, segments):
+        """Yield overlapping windows that fit the token budget from a segment iterable."""
+        window, costs = [], []
+        fresh = 0  # segments in `window` that no yielded window contained
+        for seg in segments:
+            cost = estimate_tokens(encode_segment(seg)) + 1
+            while window and sum(costs) + cost > self.window_tokens:
+                if not fresh:
+                    # Only overlap is left and it still doesn't fit; a window of
+                    # it alone would repeat the last LLM call, so shrink it instead
+                    window, costs = window[1:], costs[1:]
+                    continue
+                yield window
+                fresh = 0
+                # Next window starts `window_overlap` seconds before this one ends
+                overlap_from = window[-1]["end"] - self.window_overlap
+                keep = len(window)
+                while keep - 1 > 0 and window[keep - 1]["start"] >= overlap_from:
+                    keep -= 1
+                window, costs = window[keep:], costs[keep:]
+            window.append(seg)
+            costs.append(cost)
+            fresh += 1
+        if fresh:
+            yield window
+
+    def merge_candidates(self, candidates):
+        """Deduplicate overlapping candidates (best score wins) and keep the top MAX_CLIPS."""
+        ranked = sorted(candidates, key=lambda c: self._as_score(c.get("score")), reverse=True)
+        kept = []
+        for cand in ranked:
+            if all(self._overlap_ratio(cand, k) <= self.DEDUPE_OVERLAP for k in kept):
+                kept.append(cand)
+            if len(kept) == self.MAX_CLIPS:
+                break
+        return sorted(kept, key=lambda c: c["start"])
+
+    def _is_dead_air(self, clip):
+        if self.analysis is None:
+            return False
+        return (
+            self.analysis.black_fraction(clip["start"], clip["end"]) > self.MAX_DEAD_FRACTION
+            or self.analysis.silent_fraction(clip["start"], clip["end"]) > self.MAX_DEAD_FRACTION
+        )
+
+    @staticmethod
+    def _overlap_ratio(a, b):
+        inter = min(a["end"], b["end"]) - max(a["start"], b["start"])
+        if inter <= 0:
+            return 0.0
+        union = max(a["end"], b["end"]) - min(a["start"], b["start"])
+        return inter / union
+
+    def load_transcript(self):
+        """Transcript segments, from the columnar copy when it is up to date."""
+        try:
+            return load_transcript(self.transcript_path)
+        except FileNotFoundError:
+            print(f"[❌] File not found: {self.transcript_path}")
+            return None
+        except json.JSONDecodeError as e:
+            print(f"[❌] Invalid JSON in {self.transcript_path}: {e}")
+            return None
 
     def load_file(self, path):
         try:
@@ -71,8 +295,20 @@ class ClipHunter:
             print(f"[❌] Invalid JSON in {path}: {e}")
             return None
 
+    @staticmethod
+    def _as_score(value) -> float:
+        """A finite float score; LLM replies sometimes send "8" or null."""
+        try:
+            score = float(value)
+        except (TypeError, ValueError):
+            return 0.0
+        return score if math.isfinite(score) else 0.0
+
     def validate_clips(self, clips):
-        """Validate that clips have the required structure."""
+        """Validate that clips have the required structure.
+
+        An optional `score` is coerced to a float so ranking can't fail on it.
+        """
         if not isinstance(clips, list):
             return False
         for clip in clips:
@@ -89,11 +325,13 @@ class ClipHunter:
                 return False
             if not isinstance(clip["tags"], list):
                 return False
+            if "score" in clip:
+                clip["score"] = self._as_score(clip["score"])
         return True
 
     def build_prompt(self, transcript, meta):
-        # Truncate transcript to prevent exceeding context window
-        truncated_transcript = transcript[:self.MAX_TRANSCRIPT_SEGMENTS] if len(transcript) > self.MAX_TRANSCRIPT_SEGMENTS else transcript
+        # Pack as much transcript as fits the budget (deterministic truncation)
+        transcript_text, _ = encode_transcript(transcript, token_budget=self.PROMPT_TOKEN_BUDGET)
 
         return f"""You are a video editor AI.
 
@@ -105,11 +343,37 @@ Each object should have:
 - reason (why this moment is worth clipping)
 - tags (hashtags to match tone and content as a list of strings)
 
+Transcript lines are formatted as [mm:ss-mm:ss] text (h:mm:ss past the first hour); give start and end in seconds.
+
+Stream Title: {meta.get("stream_title", "Unknown")}
+Tags: {', '.join(meta.get("tags", []))}
+Peak Moments: {meta.get("peak_moments", [])}
+
+Transcript:
+{transcript_text}
+
+IMPORTANT: Return ONLY the JSON array, no additional text or markdown formatting."""
+
+    def build_window_prompt(self, window, meta):
+        start, end = window[0]["start"], window[-1]["end"]
+        return f"""You are a video editor AI.
+
+The transcript below covers {start:.0f}s to {end:.0f}s of a longer stream. Find up to {self.CLIPS_PER_WINDOW} shortform-worthy clips in it that are between {self.MIN_CLIP_DURATION} to {self.MAX_CLIP_DURATION} seconds long. Return fewer (or an empty list) if nothing stands out. Format your output as a JSON list of clip objects.
+
+Each object should have:
+- start (seconds as a number)
+- end (seconds as a number)
+- reason (why this moment is worth clipping)
+- tags (hashtags to match tone and content as a list of strings)
+- score (1-10, how likely this clip is to perform well as a short)
+
+Transcript lines are formatted as [mm:ss-mm:ss] text (h:mm:ss past the first hour); give start and end in seconds.
+
 Stream Title: {meta.get("stream_title", "Unknown")}
 Tags: {', '.join(meta.get("tags", []))}
 Peak Moments: {meta.get("peak_moments", [])}
 
 Transcript:
-{json.dumps(truncated_transcript, indent=2)}
+{encode_transcript(window)[0]}
 
 IMPORTANT: Return ONLY the JSON array, no additional text or markdown formatting."""
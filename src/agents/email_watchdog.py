@@ -5,27 +5,62 @@ import re
 import email
 from imapclient import IMAPClient
 from imapclient.exceptions import IMAPClientError
-from email.header import decode_header
+from email.header import decode_header, make_header
 from datetime import datetime
+from src.utils.config import load_config
 from src.utils.env_loader import load_env
-from src.agents.transcriptor import Transcriptor
-from src.agents.cliphunter import ClipHunter
-from src.agents.scriptcrafter import ScriptCrafter
-from src.agents.narrator import Narrator
-from src.agents.timeline_builder import TimelineBuilder
+from src.utils.job_queue import JobQueue
+from src.utils.workspace import Workspace, job_id_for
+
+TRIGGER_SUBJECT = "Your Stream Summary"
+SUBJECT_HEADER = "BODY.PEEK[HEADER.FIELDS (SUBJECT)]"
+SUBJECT_RESPONSE = b"BODY[HEADER.FIELDS (SUBJECT)]"
+DEFAULT_CHECKPOINT = "workspaces/email_checkpoint.json"
+DEFAULT_IDLE_SECONDS = 300          # re-issue IDLE well inside the 29 min limit of RFC 2177
+DEFAULT_POLL_SECONDS = 60           # fallback for servers without IDLE
+DEFAULT_RECONNECT_MAX_SECONDS = 300
+SOCKET_TIMEOUT = 30
 
 class EmailWatchdog:
-    def __init__(self):
+    """Watches the inbox for stream summary emails and queues a pipeline job for each.
+
+    Keeps one connection open and waits in IMAP IDLE, so the server pushes
+    new mail instead of the watchdog polling for it. Scans fetch only the
+    Subject header; the full message is downloaded for trigger emails only.
+    The highest UID handled is checkpointed, so a restart or reconnect picks
+    up exactly where it left off.
+    """
+
+    def __init__(self, config_path: str = "pixal.yaml"):
         print("[⚙️ INIT] EmailWatchdog operational")
         self.env = load_env()
+        self.cfg = load_config(config_path)
+        mail = self.cfg.get("email", {})
+        self.folder = mail.get("folder", "INBOX")
+        self.ssl = mail.get("ssl", True)
+        self.checkpoint_path = mail.get("checkpoint", DEFAULT_CHECKPOINT)
+        self.idle_seconds = float(mail.get("idle_seconds", DEFAULT_IDLE_SECONDS))
+        self.poll_seconds = float(mail.get("poll_seconds", DEFAULT_POLL_SECONDS))
+        self.reconnect_max = float(mail.get("reconnect_max_seconds", DEFAULT_RECONNECT_MAX_SECONDS))
         self.server = None
+        self.can_idle = False
+        self.uidvalidity = None
+        self.uidnext = None
+        self.last_uid = None
 
     def connect(self):
+        # EMAIL_IMAP_SERVER may carry a port ("host:port"), e.g. a local test server
+        host, _, port = self.env["EMAIL_IMAP_SERVER"].partition(":")
         try:
-            self.server = IMAPClient(self.env["EMAIL_IMAP_SERVER"], ssl=True)
+            self.server = IMAPClient(host, port=int(port) if port else None, ssl=self.ssl, timeout=SOCKET_TIMEOUT)
             self.server.login(self.env["EMAIL_ADDRESS"], self.env["EMAIL_PASSWORD"])
-            self.server.select_folder("INBOX")
-            print("[📡] Connected to inbox")
+            info = self.server.select_folder(self.folder)
+            self.can_idle = self.server.has_capability("IDLE")
+            self.uidvalidity = info.get(b"UIDVALIDITY")
+            self.uidnext = info.get(b"UIDNEXT")
+            self._load_checkpoint()
+            mode = "IDLE push" if self.can_idle else f"polling every {self.poll_seconds:.0f}s"
+            print(f"[📡] Connected to {self.folder} ({mode})")
         except IMAPClientError as e:
             print(f"[❌] IMAP connection error: {e}")
             raise
@@ -33,26 +68,85 @@ class EmailWatchdog:
             print(f"[❌] Failed to connect to inbox: {e}")
             raise
 
+    def disconnect(self):
+        if self.server is None:
+            return
+        try:
+            self.server.logout()
+        except Exception:
+            # Dead connections can't log out cleanly; drop the socket
+            try:
+                self.server.shutdown()
+            except Exception:
+                pass
+        self.server = None
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            checkpoint = {}
+        same_mailbox = checkpoint.get("folder") == self.folder and checkpoint.get("uidvalidity") == self.uidvalidity
+        # A new UIDVALIDITY means the server renumbered the mailbox; old UIDs mean nothing
+        self.last_uid = checkpoint.get("last_uid") if same_mailbox else None
+
+    def _save_checkpoint(self, uid: int):
+        self.last_uid = uid
+        os.makedirs(os.path.dirname(self.checkpoint_path) or ".", exist_ok=True)
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "folder": self.folder,
+                "uidvalidity": self.uidvalidity,
+                "last_uid": uid,
+                "updated_at": datetime.now().isoformat(timespec="seconds"),
+            }, f, indent=2)
+        os.replace(tmp, self.checkpoint_path)
+
+    @staticmethod
+    def _subject(raw: bytes) -> str:
+        value = email.message_from_bytes(raw or b"").get("Subject", "")
+        try:
+            return str(make_header(decode_header(value)))
+        except (LookupError, UnicodeDecodeError):
+            return value
+
+    def _take_pending_exists(self) -> bool:
+        # EXISTS notices sent outside IDLE (e.g. alongside a SEARCH reply) are
+        # parked in imaplib's untagged responses instead of reaching idle_check.
+        # That dict is IMAPClient/imaplib internals; without it the notice is
+        # lost, which only delays the mail until the next scan's UID search
+        pending = getattr(getattr(self.server, "_imap", None), "untagged_responses", None)
+        if not isinstance(pending, dict):
+            return False
+        return bool(pending.pop("EXISTS", None))
+
     def search_trigger_emails(self):
         print("[📨] Scanning for stream summary...")
-        messages = self.server.search(["UNSEEN"])
-        if not messages:
-            return
-        for uid, message_data in self.server.fetch(messages, "RFC822").items():
-            email_msg = email.message_from_bytes(message_data[b"RFC822"])
-            subject, encoding = decode_header(email_msg["Subject"])[0]
-            subject = subject.decode(encoding or "utf-8") if isinstance(subject, bytes) else subject
-            if "Your Stream Summary" in subject:
-                print(f"[📬] Trigger email detected: {subject}")
-                payload = self.extract_payload(email_msg)
-                if payload:
-                    os.makedirs("assets/meta", exist_ok=True)
-                    with open("assets/meta/stream_meta.json", "w") as f:
-                        json.dump(payload, f, indent=2)
-                    print("[📁] Metadata saved. Initializing pipeline...")
-                    self.trigger_pipeline()
-                else:
-                    print("[⚠️] Metadata extraction failed.")
+        self._take_pending_exists()
+        if self.last_uid is None:
+            # No checkpoint yet: fall back to unread mail
+            messages = self.server.search(["UNSEEN"])
+        else:
+            # "N:*" always matches the newest message, even when it is below N
+            messages = [uid for uid in self.server.search(["UID", f"{self.last_uid + 1}:*"]) if uid > self.last_uid]
+        if messages:
+            headers = self.server.fetch(messages, [SUBJECT_HEADER])
+            for uid in sorted(headers):
+                subject = self._subject(headers[uid].get(SUBJECT_RESPONSE))
+                if TRIGGER_SUBJECT in subject:
+                    print(f"[📬] Trigger email detected: {subject}")
+                    email_msg = email.message_from_bytes(self.server.fetch([uid], "RFC822")[uid][b"RFC822"])
+                    payload = self.extract_payload(email_msg)
+                    if payload:
+                        self.enqueue_job(uid, payload)
+                    else:
+                        print("[⚠️] Metadata extraction failed.")
+                self._save_checkpoint(uid)
+        if self.last_uid is None and self.uidnext:
+            # Baseline so the next scan only looks at mail newer than this one
+            self._save_checkpoint(self.uidnext - 1)
 
     def extract_payload(self, email_msg):
         body = ""
@@ -68,38 +162,63 @@ class EmailWatchdog:
         title = re.search(r"Title:\s*(.*)", body)
         tags = re.findall(r"#\w+", body)
         times = re.findall(r"(\d{2}:\d{2}:\d{2})", body)
+        vod = re.search(r"https?://(?:www\.)?(?:twitch\.tv|youtube\.com|youtu\.be)/\S+", body)
 
         if not title:
             return None
 
         return {
-            "stream_title": title.group(1),
+            "stream_title": title.group(1).strip(),
             "tags": tags,
-            "peak_moments": times[:5]
+            "peak_moments": times[:5],
+            "vod_url": vod.group(0) if vod else None,
         }
 
-    def trigger_pipeline(self):
-        t = Transcriptor()
-        c = ClipHunter()
-        s = ScriptCrafter()
-        n = Narrator()
-        b = TimelineBuilder()
+    def enqueue_job(self, uid, payload):
+        """Queue a pipeline run for `pixalctl worker` instead of running it here,
+        so a burst of summaries doesn't stall polling and survives a crash."""
+        cfg = self.cfg
+        # Without a VOD link, process the configured input file as before.
+        # Summaries of the same VOD share one workspace (and its cached steps);
+        # enqueue() returns the pending job instead of queueing it twice.
+        source = payload.get("vod_url") or os.path.abspath(Workspace(cfg).path("input_video"))
+        job_id = job_id_for(source)
+        meta = {k: v for k, v in payload.items() if k != "vod_url"}
+        queued = JobQueue.from_config(cfg).enqueue(job_id, source, {"meta": meta})
+        print(f"[📁] Metadata from message {uid} queued as job #{queued} ({job_id}); "
+              "run `pixalctl worker` to process it")
 
-        t.transcribe()
-        c.detect()
-        s.craft()
-        n.speak()
-        b.build()
+    def wait_for_mail(self):
+        """Block until the server reports a mailbox change (or the IDLE/poll interval ends)."""
+        if not self.can_idle:
+            time.sleep(self.poll_seconds)
+            return
+        self.server.idle()
+        try:
+            # Mail that arrived between the last scan and IDLE must not wait for the next push
+            if self._take_pending_exists():
+                return
+            responses = self.server.idle_check(timeout=self.idle_seconds)
+        finally:
+            self.server.idle_done()
+        if any(len(r) > 1 and r[1] == b"EXISTS" for r in responses):
+            print("[🔔] New mail pushed by server")
 
     def watch(self):
-        self.connect()
-        while True:
-            try:
-                self.search_trigger_emails()
-                time.sleep(60)
-            except KeyboardInterrupt:
-                print("[🛑] Watchdog stopped by user")
-                break
-            except (IMAPClientError, OSError) as e:
-                print(f"[🔥] Watchdog error: {e}")
-                time.sleep(120)
+        backoff = 1.0
+        try:
+            while True:
+                try:
+                    self.connect()
+                    backoff = 1.0
+                    while True:
+                        self.search_trigger_emails()
+                        self.wait_for_mail()
+                except (IMAPClientError, OSError) as e:
+                    print(f"[🔥] Watchdog error: {e}; reconnecting in {backoff:.0f}s")
+                    self.disconnect()
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, self.reconnect_max)
+        except KeyboardInterrupt:
+            print("[🛑] Watchdog stopped by user")
+            self.disconnect()
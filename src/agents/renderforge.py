@@ -1,55 +1,474 @@
+import hashlib
 import json
 import os
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-OUTPUT_DIR = "outputs/shorts"
-VIDEO_INPUT = "stream_input.mp4"
-EDITSPEC_PATH = "assets/meta/augmented_editspec.json"
+from src.utils.fingerprint import fingerprint_file, hash_json_payload
+from src.utils.fsutil import link_or_copy
+from src.utils.keyframes import (
+    DEFAULT_KEYFRAMES_DIR,
+    keyframe_at_or_after,
+    keyframe_at_or_before,
+    load_keyframe_index,
+)
+from src.utils.media import probe_stream_types
+from src.utils.workspace import Workspace
+
+PRECUT_DIR = "cache/precut"
+RENDER_CACHE_DIR = "cache/renders"
+# Bump when the ffmpeg invocation changes in a way the cache key cannot see
+RENDER_CACHE_VERSION = 1
 
 TARGET_WIDTH = 1080
 TARGET_HEIGHT = 1920
 FPS = 30
 
+# ffmpeg threads per render job; the pool size is derived from this so that
+# workers * threads roughly matches the number of cores.
+DEFAULT_FFMPEG_THREADS = 4
+
+
+def default_worker_count(ffmpeg_threads=DEFAULT_FFMPEG_THREADS):
+    """Number of concurrent ffmpeg jobs that keeps every core busy without oversubscribing."""
+    cpus = os.cpu_count() or 1
+    return max(1, cpus // max(1, int(ffmpeg_threads)))
+
+
+# Render engines: "per_clip" runs one ffmpeg per clip; "single_pass" decodes the
+# source once per group of nearby clips and fans it out with split/trim branches.
+ENGINES = ("per_clip", "single_pass")
+# Clips whose gap is at most this many seconds share one decode in single_pass mode
+SINGLE_PASS_MAX_GAP = 120
+# Upper bound of outputs per single_pass graph (each branch holds its own encoder)
+SINGLE_PASS_MAX_CLIPS = 8
+
+
 class RenderForge:
-    def __init__(self):
+    def __init__(
+        self,
+        workers=None,
+        ffmpeg_threads=DEFAULT_FFMPEG_THREADS,
+        ffmpeg_bin="ffmpeg",
+        video_input=None,
+        editspec_path=None,
+        output_dir=None,
+        engine="per_clip",
+        max_gap=SINGLE_PASS_MAX_GAP,
+        max_group_clips=SINGLE_PASS_MAX_CLIPS,
+        precut=False,
+        precut_dir=PRECUT_DIR,
+        ffprobe_bin="ffprobe",
+        cache_dir=RENDER_CACHE_DIR,
+        keyframes_dir=DEFAULT_KEYFRAMES_DIR,
+        ranges=None,
+        range_fetcher=None,
+        workspace=None,
+    ):
         print("[🔥 INIT] RenderForge v1 online")
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown render engine: {engine} (expected one of: {', '.join(ENGINES)})")
+        self.ffmpeg_threads = int(ffmpeg_threads)
+        # "auto" (or unset) in pixal.yaml means derive from CPU count
+        if workers in (None, "", "auto"):
+            workers = default_worker_count(self.ffmpeg_threads)
+        self.workers = max(1, int(workers))
+        self.ffmpeg_bin = ffmpeg_bin
+        # Paths not given explicitly come from the workspace (default: repo-root layout)
+        ws = workspace or Workspace()
+        self.video_input = video_input or ws.path("input_video")
+        self.editspec_path = editspec_path or ws.path("augmented_editspec")
+        self.output_dir = output_dir or ws.path("shorts_dir")
+        self.engine = engine
+        self.max_gap = float(max_gap)
+        self.max_group_clips = max(1, int(max_group_clips))
+        self.precut = precut
+        self.precut_dir = precut_dir
+        self.ffprobe_bin = ffprobe_bin
+        self.keyframes_dir = keyframes_dir
+        self._keyframes = None
+        self._keyframes_lock = threading.Lock()
+        self._has_audio = {}
+        # Ranged ingest: when `video_input` is absent, clips are cut from
+        # downloaded {"start", "end", "path"} ranges of the source instead, and
+        # `range_fetcher(start, end)` fetches a missing one on demand.
+        self.ranges = sorted(ranges or [], key=lambda r: r["start"])
+        self.range_fetcher = range_fetcher
+        self._ranges_lock = threading.Lock()
+        # None disables the render cache
+        self.cache_dir = cache_dir
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        if self.precut:
+            os.makedirs(self.precut_dir, exist_ok=True)
 
     def run(self):
-        with open(EDITSPEC_PATH, "r") as f:
+        """Render every clip of the editspec through a bounded worker pool.
+
+        Failures are collected per clip instead of aborting the whole batch.
+        Clips whose cache key matches an earlier render are linked from the
+        render cache instead of being encoded again.
+
+        Returns:
+            dict: {"clips": [...], "failed": int, "wall_time": float} where each
+            clip entry holds index, output, ok, cached, wall_time and error.
+        """
+        with open(self.editspec_path, "r") as f:
             clips = json.load(f)
 
-        for idx, clip in enumerate(clips, start=1):
-            self.render_clip(clip, idx)
+        started = time.perf_counter()
+        results = []
+        pending = []
+        for index, clip in enumerate(clips, start=1):
+            hit = self.restore_from_cache(clip, index)
+            if hit:
+                results.append(hit)
+            else:
+                pending.append((index, clip))
+
+        jobs = self.plan_jobs(pending)
+        print(
+            f"[🧵] Rendering {len(pending)}/{len(clips)} clips as {len(jobs)} {self.engine} jobs "
+            f"with {self.workers} workers x {self.ffmpeg_threads} ffmpeg threads"
+        )
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            batches = list(pool.map(self._timed_job, jobs))
+        results = sorted(results + [r for batch in batches for r in batch], key=lambda r: r["index"])
+
+        for r in results:
+            if r["ok"] and not r["cached"]:
+                self.store_in_cache(clips[r["index"] - 1], r["index"])
+        summary = {
+            "clips": results,
+            "failed": sum(1 for r in results if not r["ok"]),
+            "wall_time": round(time.perf_counter() - started, 3),
+        }
+
+        for r in results:
+            if r["cached"]:
+                print(f"[♻️] clip {r['index']:03}: render cache hit")
+            elif r["ok"]:
+                print(f"[⏱️] clip {r['index']:03}: {r['wall_time']:.2f}s")
+            else:
+                print(f"[❌] clip {r['index']:03}: {r['error']}")
+
+        if summary["failed"]:
+            print(f"[⚠️] RenderForge finished with {summary['failed']}/{len(results)} failed clips in {summary['wall_time']:.2f}s")
+        else:
+            print(f"[✅] RenderForge completed all clips in {summary['wall_time']:.2f}s")
+        return summary
+
+    def render_one(self, clip, index):
+        """Render (or restore from cache) a single clip; returns its result entry.
+
+        Used by the streaming pipeline, which hands clips over one at a time.
+        """
+        result = self.restore_from_cache(clip, index)
+        if result is None:
+            result = self._timed_job([(index, clip)])[0]
+            if result["ok"]:
+                self.store_in_cache(clip, index)
+        return result
+
+    def plan_jobs(self, indexed_clips):
+        """Split (index, clip) pairs into render jobs for the configured engine."""
+        if self.engine == "per_clip":
+            return [[item] for item in indexed_clips]
+        return self.group_clips(indexed_clips)
+
+    def group_clips(self, indexed_clips):
+        """Group clips that sit close together on the source timeline.
+
+        Each group is decoded once; clips far apart go to separate groups so a
+        single pass never decodes long stretches nobody asked for.
+        """
+        groups = []
+        group_end = None
+        for item in sorted(indexed_clips, key=lambda ic: ic[1]["start"]):
+            clip = item[1]
+            if (
+                groups
+                and clip["start"] - group_end <= self.max_gap
+                and len(groups[-1]) < self.max_group_clips
+            ):
+                groups[-1].append(item)
+                group_end = max(group_end, clip["end"])
+            else:
+                groups.append([item])
+                group_end = clip["end"]
+        return groups
+
+    def _timed_job(self, job):
+        started = time.perf_counter()
+        # Outputs may be hardlinks into the render cache; unlink them so ffmpeg
+        # writes a fresh inode instead of truncating the cached file.
+        for index, _ in job:
+            if os.path.lexists(self.output_path(index)):
+                os.unlink(self.output_path(index))
+        try:
+            if self.engine == "single_pass":
+                self.render_group(job)
+            else:
+                index, clip = job[0]
+                self.render_clip(clip, index)
+            error = None
+        except (RuntimeError, OSError) as e:
+            error = str(e)
+        # Clips of a single_pass group share one decode, so they share its wall time
+        wall_time = round(time.perf_counter() - started, 3)
+        return [
+            {
+                "index": index,
+                "output": self.output_path(index),
+                "ok": error is None,
+                "cached": False,
+                "wall_time": wall_time,
+                "error": error,
+            }
+            for index, _ in job
+        ]
+
+    def cache_key(self, clip):
+        """Content address of a rendered clip.
+
+        Covers everything that shapes the output: the source fingerprint, the
+        clip range and captions, the filter chains and the encoder settings.
+        """
+        return hash_json_payload({
+            "version": RENDER_CACHE_VERSION,
+            "source": self.source_identity(clip),
+            "start": clip["start"],
+            "end": clip["end"],
+            "captions": clip.get("captions", []),
+            "caption_style": clip.get("caption_style"),
+            "video_filters": self.build_video_filters(clip),
+            "audio_filters": self.build_audio_filters(clip),
+            "encoder": {"fps": FPS, "width": TARGET_WIDTH, "height": TARGET_HEIGHT, "movflags": "+faststart"},
+        })
+
+    def source_identity(self, clip):
+        """Fingerprint of whatever the clip is cut from, or None if nothing covers it."""
+        if os.path.exists(self.video_input):
+            return fingerprint_file(self.video_input)
+        covering = self.range_for(clip["start"], clip["end"])
+        if covering is None:
+            return None
+        return f"{fingerprint_file(covering['path'])}@{covering['start']}"
 
-        print("[✅] RenderForge completed all clips")
+    def _cache_path(self, clip):
+        return os.path.join(self.cache_dir, f"{self.cache_key(clip)}.mp4")
+
+    def restore_from_cache(self, clip, index):
+        """Link a cached render into place; returns its result entry or None on a miss."""
+        if not self.cache_dir or self.source_identity(clip) is None:
+            return None
+        cached = self._cache_path(clip)
+        if not os.path.exists(cached):
+            return None
+        started = time.perf_counter()
+        try:
+            link_or_copy(cached, self.output_path(index), methods=("hardlink", "reflink", "copy"))
+        except OSError as e:
+            print(f"[⚠️] Render cache entry unusable for clip {index}: {e}")
+            return None
+        return {
+            "index": index,
+            "output": self.output_path(index),
+            "ok": True,
+            "cached": True,
+            "wall_time": round(time.perf_counter() - started, 3),
+            "error": None,
+        }
+
+    def store_in_cache(self, clip, index):
+        if not self.cache_dir or not os.path.exists(self.output_path(index)):
+            return
+        try:
+            link_or_copy(self.output_path(index), self._cache_path(clip), methods=("hardlink", "reflink", "copy"))
+        except OSError as e:
+            print(f"[⚠️] Could not store clip {index} in render cache: {e}")
+
+    def output_path(self, index):
+        return f"{self.output_dir}/clip_{index:03}.mp4"
 
     def render_clip(self, clip, index):
         start = clip["start"]
         duration = clip["end"] - clip["start"]
-        output = f"{OUTPUT_DIR}/clip_{index:03}.mp4"
+        output = self.output_path(index)
 
         filter_chain = self.build_video_filters(clip)
         audio_chain = self.build_audio_filters(clip)
+        source, seek = self.source_for(start, clip["end"])
 
         cmd = [
-            "ffmpeg", "-y",
-            "-ss", str(start),
-            "-i", VIDEO_INPUT,
+            self.ffmpeg_bin, "-y",
+            "-ss", str(seek),
+            "-i", source,
             "-t", str(duration),
             "-vf", filter_chain,
             "-af", audio_chain,
             "-r", str(FPS),
+            "-threads", str(self.ffmpeg_threads),
             "-movflags", "+faststart",
             output
         ]
 
         print(f"[🎬] Rendering clip {index}: {output}")
+        self._run_ffmpeg(cmd, f"clip {index} ({output})")
+
+    def render_group(self, group):
+        """Render a group of (index, clip) pairs from one decode of the source."""
+        seek = min(clip["start"] for _, clip in group)
+        span = max(clip["end"] for _, clip in group) - seek
+        source, source_seek = self.source_for(seek, seek + span)
+        audio = self.has_audio(source)
+        graph = self.build_group_graph(group, seek, audio=audio)
+
+        cmd = [
+            self.ffmpeg_bin, "-y",
+            "-ss", str(source_seek),
+            "-t", str(span),
+            "-i", source,
+            "-filter_complex", graph,
+        ]
+        for n, (index, _) in enumerate(group):
+            cmd += ["-map", f"[v{n}]"] + (["-map", f"[a{n}]"] if audio else [])
+            cmd += [
+                "-r", str(FPS),
+                "-threads", str(self.ffmpeg_threads),
+                "-movflags", "+faststart",
+                self.output_path(index),
+            ]
+
+        indexes = ", ".join(str(index) for index, _ in group)
+        print(f"[🎬] Rendering clips {indexes} in one pass ({seek:.1f}s + {span:.1f}s)")
+        self._run_ffmpeg(cmd, f"clips {indexes}")
+
+    def has_audio(self, source):
+        """Whether `source` has an audio stream (assumed when ffprobe can't tell)."""
+        if source not in self._has_audio:
+            streams = probe_stream_types(source, self.ffprobe_bin)
+            self._has_audio[source] = not streams or "audio" in streams
+        return self._has_audio[source]
+
+    def build_group_graph(self, group, seek, audio=True):
+        """Build a filter_complex that splits one decoded input into per-clip branches.
+
+        Timestamps restart at 0 after the input-side seek, so each trim is
+        expressed relative to `seek`. Without `audio` the graph has video
+        branches only, like the optional audio map of the per-clip engine.
+        """
+        n = len(group)
+        vsplit = "".join(f"[vs{i}]" for i in range(n))
+        asplit = "".join(f"[as{i}]" for i in range(n))
+        parts = [f"[0:v]split={n}{vsplit}"]
+        if audio:
+            parts.append(f"[0:a]asplit={n}{asplit}")
+        for i, (_, clip) in enumerate(group):
+            start = clip["start"] - seek
+            end = clip["end"] - seek
+            parts.append(
+                f"[vs{i}]trim=start={start}:end={end},setpts=PTS-STARTPTS,"
+                f"{self.build_video_filters(clip)}[v{i}]"
+            )
+            if audio:
+                parts.append(
+                    f"[as{i}]atrim=start={start}:end={end},asetpts=PTS-STARTPTS,"
+                    f"{self.build_audio_filters(clip)}[a{i}]"
+                )
+        return ";".join(parts)
+
+    def source_for(self, start, end):
+        """Return (path, seek) to read the [start, end] range of the input from.
+
+        With pre-cut enabled this is a small keyframe-aligned stream copy of the
+        range; otherwise (or if pre-cutting fails) it is the full input. Without
+        a full input, it is the downloaded source range covering [start, end].
+        """
+        if not os.path.exists(self.video_input) and (self.ranges or self.range_fetcher):
+            covering = self.range_for(start, end)
+            if covering is None:
+                raise RuntimeError(f"{self.video_input} not present and no downloaded range covers {start}-{end}s")
+            return covering["path"], start - covering["start"]
+        if not self.precut:
+            return self.video_input, start
+        try:
+            return self.precut_segment(start, end)
+        except RuntimeError as e:
+            print(f"[⚠️] Pre-cut unavailable, seeking the full input instead: {e}")
+            return self.video_input, start
+
+    def range_for(self, start, end):
+        """Downloaded source range covering [start, end], fetched on demand; None if unavailable."""
+        with self._ranges_lock:
+            for r in self.ranges:
+                if r["start"] <= start and end <= r["end"]:
+                    return r
+            if self.range_fetcher is None:
+                return None
+            # Fetch under the lock so concurrent workers don't download the same range twice
+            fetched = self.range_fetcher(start, end)
+            self.ranges = sorted(self.ranges + fetched, key=lambda r: r["start"])
+            for r in fetched:
+                if r["start"] <= start and end <= r["end"]:
+                    return r
+        return None
+
+    def keyframe_index(self):
+        # Built once per input and shared by all render workers
+        with self._keyframes_lock:
+            if self._keyframes is None:
+                self._keyframes = load_keyframe_index(self.video_input, self.ffprobe_bin, self.keyframes_dir)
+        return self._keyframes
+
+    def precut_segment(self, start, end):
+        """Stream-copy the keyframe-aligned span around [start, end] into the pre-cut cache.
+
+        Returns (segment_path, seek) where seek is `start` relative to the segment.
+        """
+        keyframes = self.keyframe_index()
+        cut_start = keyframe_at_or_before(keyframes, start)
+        cut_end = keyframe_at_or_after(keyframes, end)
+
+        st = os.stat(self.video_input)
+        source_tag = hashlib.sha1(
+            f"{os.path.abspath(self.video_input)}:{st.st_size}:{st.st_mtime}".encode()
+        ).hexdigest()[:12]
+        end_label = f"{cut_end:.3f}" if cut_end is not None else "eof"
+        segment = os.path.join(self.precut_dir, f"{source_tag}_{cut_start:.3f}_{end_label}.mp4")
+
+        if not os.path.exists(segment):
+            tmp = f"{segment}.{os.getpid()}.{threading.get_ident()}.part.mp4"
+            cmd = [
+                self.ffmpeg_bin, "-y", "-loglevel", "error",
+                "-ss", str(cut_start),
+                "-i", self.video_input,
+            ]
+            if cut_end is not None:
+                cmd += ["-t", str(cut_end - cut_start)]
+            cmd += [
+                "-map", "0:v:0", "-map", "0:a:0?",
+                "-c", "copy",
+                "-avoid_negative_ts", "make_zero",
+                tmp,
+            ]
+            print(f"[✂️] Pre-cutting {cut_start:.3f}s-{end_label} from {self.video_input}")
+            self._run_ffmpeg(cmd, f"pre-cut {cut_start:.3f}-{end_label}")
+            os.replace(tmp, segment)
+
+        return segment, start - cut_start
+
+    def _run_ffmpeg(self, cmd, label):
         try:
             subprocess.run(cmd, check=True)
         except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Failed to render clip {index} ({output}): ffmpeg exited with code {e.returncode}") from e
+            raise RuntimeError(f"Failed to render {label}: ffmpeg exited with code {e.returncode}") from e
+        except FileNotFoundError as e:
+            raise RuntimeError(f"Failed to render {label}: {self.ffmpeg_bin} not found") from e
 
     def build_video_filters(self, clip):
         filters = [
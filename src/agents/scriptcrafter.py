@@ -1,5 +1,13 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
 from src.utils.env_loader import load_env
+from src.utils.llm_cache import LLMCache
+from src.utils.ratelimit import RateLimiter, call_with_backoff
+from src.utils.tokens import estimate_tokens
+from src.utils.transcript_index import TranscriptIndex
+from src.utils.transcript_columnar import load_transcript
+from src.utils.transcript_format import encode_transcript
+from src.utils.workspace import Workspace
 import openai
 
 
@@ -7,59 +15,155 @@ class ScriptCrafter:
     # Configuration for GPT model
     MODEL_NAME = "gpt-4-turbo"
     TEMPERATURE = 0.7
-
-    def __init__(self):
+    # Concurrency and client-side rate limits for GPT calls
+    MAX_CONCURRENCY = 4
+    REQUESTS_PER_MINUTE = 60
+    TOKENS_PER_MINUTE = 150000
+    REQUEST_TIMEOUT = 60    # seconds per clip request
+    MAX_RETRIES = 5
+    # Completion budget assumed per request when reserving tokens-per-minute
+    EXPECTED_COMPLETION_TOKENS = 600
+    # Transcript tokens packed into each clip prompt
+    PROMPT_TOKEN_BUDGET = 3000
+
+    def __init__(
+        self,
+        concurrency=None,
+        requests_per_minute=None,
+        tokens_per_minute=None,
+        request_timeout=None,
+        max_retries=None,
+        cache=None,
+        workspace=None,
+    ):
+        """Set up GPT access.
+
+        The API base URL follows openai's OPENAI_API_BASE environment variable,
+        so a local stub server can stand in for the API. `cache` is an optional
+        LLMCache shared with ClipHunter. `workspace` locates the transcript,
+        clips and editspec (default: the repo-root layout).
+        """
         print("[📝 INIT] ScriptCrafter armed")
+        self.cache = cache
         self.env = load_env()
         openai.api_key = self.env["OPENAI_API_KEY"]
-        self.transcript_path = "assets/meta/transcript.json"
-        self.clips_path = "assets/meta/clips.json"
-        self.output_path = "assets/meta/editspec.json"
+        self.concurrency = max(1, int(concurrency or self.MAX_CONCURRENCY))
+        self.request_timeout = float(request_timeout or self.REQUEST_TIMEOUT)
+        self.max_retries = int(self.MAX_RETRIES if max_retries is None else max_retries)
+        self.limiter = RateLimiter(
+            requests_per_minute or self.REQUESTS_PER_MINUTE,
+            tokens_per_minute or self.TOKENS_PER_MINUTE,
+        )
+        ws = workspace or Workspace()
+        self.transcript_path = ws.path("transcript")
+        self.clips_path = ws.path("clips")
+        self.output_path = ws.path("editspec")
 
     def craft(self):
+        """Write the editspec for every clip GPT could script.
+
+        Returns:
+            dict: {"clips": int, "written": int, "failed": int}, or None when
+            the transcript or clips could not be loaded
+        """
         print("[✂️] Generating narration, titles, overlays...")
-        transcript = self.load_json(self.transcript_path)
+        transcript = self.load_transcript()
         clips = self.load_json(self.clips_path)
 
         if transcript is None or clips is None:
             print("[❌] Failed to load required input files")
-            return
-
-        edits = []
-        for clip in clips:
-            segment_text = self.extract_text_segment(transcript, clip["start"], clip["end"])
-            gpt_input = self.build_prompt(segment_text, clip["reason"], clip["tags"])
-
-            try:
-                response = openai.ChatCompletion.create(
-                    model=self.MODEL_NAME,
-                    messages=[{"role": "user", "content": gpt_input}],
-                    temperature=self.TEMPERATURE
-                )
-            except Exception as e:
-                print(f"[❌] GPT API error for clip {clip['start']}-{clip['end']}: {e}")
-                continue
-
-            try:
-                clip_out = json.loads(response.choices[0].message["content"])
-                clip_out["start"] = clip["start"]
-                clip_out["end"] = clip["end"]
-                edits.append(clip_out)
-            except json.JSONDecodeError as e:
-                print(f"[❌] Failed to parse GPT response as JSON for clip {clip['start']}-{clip['end']}: {e}")
-                continue
-            except (KeyError, IndexError) as e:
-                print(f"[❌] Unexpected GPT response structure for clip {clip['start']}-{clip['end']}: {e}")
-                continue
+            return None
+
+        edits = [clip_out for clip_out in self.iter_crafted(transcript, clips) if clip_out is not None]
+        if self.cache:
+            print(f"[💾] {self.cache.summary()}")
+        summary = {"clips": len(clips), "written": len(edits), "failed": len(clips) - len(edits)}
 
         if not edits:
             print("[⚠️] No edit specifications were generated from clips")
-            return
+            return summary
 
         with open(self.output_path, "w") as f:
             json.dump(edits, f, indent=2)
 
-        print(f"[✅] Editspec created at {self.output_path}")
+        if summary["failed"]:
+            print(f"[⚠️] Editspec created at {self.output_path} with {summary['failed']}/{len(clips)} clips missing")
+        else:
+            print(f"[✅] Editspec created at {self.output_path}")
+        return summary
+
+    def iter_crafted(self, transcript, clips):
+        """Craft clips concurrently, yielding results (or None) in clip order."""
+        # One batched index lookup instead of a transcript scan per clip
+        clip_segments = TranscriptIndex(transcript).overlapping_batch([(c["start"], c["end"]) for c in clips])
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            yield from pool.map(self.craft_clip, clip_segments, clips)
+
+    def craft_clip(self, segments, clip):
+        """Generate the edit spec for one clip from the transcript segments it
+        overlaps; returns None when GPT fails."""
+        segment_text, _ = encode_transcript(segments, token_budget=self.PROMPT_TOKEN_BUDGET)
+        gpt_input = self.build_prompt(segment_text, clip["reason"], clip["tags"])
+
+        # No max_tokens is sent to GPT, so the cache key records None
+        cache_key = LLMCache.make_key(self.MODEL_NAME, self.TEMPERATURE, None, gpt_input)
+        cached = self.cache.get(cache_key) if self.cache else None
+        if cached is not None:
+            return self._parse_edit(cached, clip)
+
+        def request():
+            self.limiter.acquire(estimate_tokens(gpt_input) + self.EXPECTED_COMPLETION_TOKENS)
+            return openai.ChatCompletion.create(
+                model=self.MODEL_NAME,
+                messages=[{"role": "user", "content": gpt_input}],
+                temperature=self.TEMPERATURE,
+                request_timeout=self.request_timeout,
+            )
+
+        try:
+            response = call_with_backoff(
+                request,
+                max_retries=self.max_retries,
+                label=f"GPT request for clip {clip['start']}-{clip['end']}",
+            )
+        except Exception as e:
+            print(f"[❌] GPT API error for clip {clip['start']}-{clip['end']}: {e}")
+            return None
+
+        try:
+            content = response.choices[0].message["content"]
+        except (KeyError, IndexError) as e:
+            print(f"[❌] Unexpected GPT response structure for clip {clip['start']}-{clip['end']}: {e}")
+            return None
+
+        clip_out = self._parse_edit(content, clip)
+        if clip_out is not None and self.cache:
+            self.cache.put(cache_key, content)
+        return clip_out
+
+    def _parse_edit(self, content, clip):
+        try:
+            clip_out = json.loads(content)
+            clip_out["start"] = clip["start"]
+            clip_out["end"] = clip["end"]
+            return clip_out
+        except json.JSONDecodeError as e:
+            print(f"[❌] Failed to parse GPT response as JSON for clip {clip['start']}-{clip['end']}: {e}")
+            return None
+        except TypeError as e:
+            print(f"[❌] Unexpected GPT response structure for clip {clip['start']}-{clip['end']}: {e}")
+            return None
+
+    def load_transcript(self):
+        """Transcript segments, from the columnar copy when it is up to date."""
+        try:
+            return load_transcript(self.transcript_path)
+        except FileNotFoundError:
+            print(f"[❌] File not found: {self.transcript_path}")
+            return None
+        except json.JSONDecodeError as e:
+            print(f"[❌] Invalid JSON in {self.transcript_path}: {e}")
+            return None
 
     def load_json(self, path):
         try:
@@ -72,17 +176,25 @@ class ScriptCrafter:
             print(f"[❌] Invalid JSON in {path}: {e}")
             return None
 
+    def extract_segments(self, transcript, start_time, end_time):
+        """Transcript segments overlapping the clip, with timing.
+
+        `transcript` is a segment list or a prebuilt TranscriptIndex.
+        """
+        if not isinstance(transcript, TranscriptIndex):
+            transcript = TranscriptIndex(transcript)
+        return transcript.overlapping(start_time, end_time)
+
     def extract_text_segment(self, transcript, start_time, end_time):
         # Use overlapping logic to include segments that overlap with clip boundaries
-        return [seg["text"] for seg in transcript if seg["start"] < end_time and seg["end"] > start_time]
+        return [seg["text"] for seg in self.extract_segments(transcript, start_time, end_time)]
 
-    def build_prompt(self, clip_texts, reason, tags):
-        joined_text = "\n".join(clip_texts)
+    def build_prompt(self, transcript_text, reason, tags):
         return f"""
 Given the following clip transcript and context:
 
-Transcript:
-{joined_text}
+Transcript (one [mm:ss-mm:ss] text line per segment, h:mm:ss past the first hour, times from stream start):
+{transcript_text}
 
 Context: {reason}
 Tags: {', '.join(tags)}
@@ -1,11 +1,14 @@
 import json
 import random
 
+from src.utils.workspace import Workspace
+
 class TemplateForge:
-    def __init__(self):
+    def __init__(self, workspace=None):
         print("[🎬 INIT] TemplateForge online")
-        self.input_path = "assets/meta/editspec.json"
-        self.output_path = "assets/meta/augmented_editspec.json"
+        ws = workspace or Workspace()
+        self.input_path = ws.path("editspec")
+        self.output_path = ws.path("augmented_editspec")
 
     def inject(self):
         print("[🧩] Injecting dynamic templates and overlays...")
@@ -13,17 +16,22 @@ class TemplateForge:
             edits = json.load(f)
 
         for clip in edits:
-            clip["transitions"] = self.generate_transitions()
-            clip["sfx"] = self.generate_sfx_cues(clip["start"], clip["end"])
-            clip["intros"] = self.select_intro()
-            clip["outros"] = self.select_outro()
-            clip["caption_style"] = self.random_caption_style()
+            self.augment(clip)
 
         with open(self.output_path, "w") as f:
             json.dump(edits, f, indent=2)
 
         print(f"[✅] Augmented editspec saved to {self.output_path}")
 
+    def augment(self, clip):
+        """Inject templates into a single clip (in place) and return it."""
+        clip["transitions"] = self.generate_transitions()
+        clip["sfx"] = self.generate_sfx_cues(clip["start"], clip["end"])
+        clip["intros"] = self.select_intro()
+        clip["outros"] = self.select_outro()
+        clip["caption_style"] = self.random_caption_style()
+        return clip
+
     def generate_transitions(self):
         return random.choices(
             ["glitch", "vhs_rewind", "spin_snap", "meme_zoom", "wipe_flash"], k=2
@@ -2,6 +2,8 @@ import os
 import json
 from xml.etree.ElementTree import Element, SubElement, ElementTree
 
+from src.utils.workspace import Workspace
+
 
 class TimelineBuilder:
     # Timeline configuration constants
@@ -12,10 +14,11 @@ class TimelineBuilder:
     SFX_DURATION = 1  # seconds
     DEFAULT_SEQUENCE_DURATION = 300  # seconds
 
-    def __init__(self):
+    def __init__(self, workspace=None):
         print("[🎞️ INIT] TimelineBuilder active")
-        self.input_path = "assets/meta/augmented_editspec.json"
-        self.output_path = "assets/meta/pixal_timeline.fcpxml"
+        ws = workspace or Workspace()
+        self.input_path = ws.path("augmented_editspec")
+        self.output_path = ws.path("fcpxml")
 
     def build(self):
         print("[🧱] Generating Final Cut Pro XML timeline...")
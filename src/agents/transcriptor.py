@@ -1,6 +1,24 @@
 import os
 import json
-import whisper
+import multiprocessing
+import subprocess
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+from src.utils.audio_cache import DEFAULT_AUDIO_DIR, extract_pcm, open_pcm, pcm_duration, pcm_slice
+from src.utils.fingerprint import fingerprint_file
+from src.utils.media import probe_duration
+from src.utils.model_registry import choose_model_size, get_whisper_model
+from src.utils.transcript_columnar import columnar_path, write_columnar
+from src.utils.workspace import Workspace
+from src.utils.transcript_stream import (
+    append_segments,
+    read_progress,
+    read_segments,
+    rewrite_segments,
+    stream_paths,
+    write_progress,
+)
 
 
 def get_latest_file(path="vod/"):
@@ -14,37 +32,401 @@ def get_latest_file(path="vod/"):
     return os.path.join(path, files[0])
 
 
+# Parallel (chunked) transcription defaults
+DEFAULT_CHUNK_SECONDS = 600
+DEFAULT_OVERLAP_SECONDS = 5
+SAMPLE_RATE = 16000  # Whisper's expected input rate
+
+
+def _init_worker(threads):
+    # Each worker gets a fixed share of the cores instead of torch's default of all of them
+    if threads:
+        try:
+            import torch
+            torch.set_num_threads(int(threads))
+        except ImportError:
+            pass
+
+
+def _load_audio_window(input_path, start, length, ffmpeg_bin="ffmpeg"):
+    """Decode [start, start + length) of the input to 16 kHz mono float32."""
+    import numpy as np
+
+    cmd = [
+        ffmpeg_bin, "-nostdin", "-loglevel", "error",
+        "-ss", str(start), "-t", str(length),
+        "-i", input_path,
+        "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-",
+    ]
+    out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def _transcribe_window(job):
+    """Worker entry point: transcribe one window and return absolute-time segments.
+
+    `pcm_path` (the decode-once audio cache) is read through a memmap slice;
+    without it the window is decoded from the input with ffmpeg.
+    """
+    input_path, pcm_path, model_size, start, length, ffmpeg_bin, options = job
+    if pcm_path:
+        audio = pcm_slice(open_pcm(pcm_path), start, start + length)
+    else:
+        audio = _load_audio_window(input_path, start, length, ffmpeg_bin)
+    result = _run_whisper(get_whisper_model(model_size), audio, options)
+    return [
+        {"start": start + seg["start"], "end": start + seg["end"], "text": seg["text"].strip()}
+        for seg in result["segments"]
+    ]
+
+
+def _run_whisper(model, audio, options=None):
+    # torch warns when wrapping the read-only memmap; it never writes to it
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message=".*not writable.*")
+        return model.transcribe(audio, **(options or {}))
+
+
+def _available_memory_mb():
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def plan_windows(duration, chunk_seconds=DEFAULT_CHUNK_SECONDS, overlap_seconds=DEFAULT_OVERLAP_SECONDS):
+    """Fixed windows of `chunk_seconds`, each extended by `overlap_seconds` into the next."""
+    windows = []
+    start = 0.0
+    while start < duration:
+        windows.append((start, min(chunk_seconds + overlap_seconds, duration - start)))
+        start += chunk_seconds
+    return windows
+
+
+def window_upper_bound(k, n_windows, chunk_seconds=DEFAULT_CHUNK_SECONDS, overlap_seconds=DEFAULT_OVERLAP_SECONDS):
+    """Time below which window `k` owns its segments (midpoint of the next overlap)."""
+    return (k + 1) * chunk_seconds + overlap_seconds / 2 if k < n_windows - 1 else float("inf")
+
+
+def stitch_window(k, n_windows, segments, prev=None, chunk_seconds=DEFAULT_CHUNK_SECONDS, overlap_seconds=DEFAULT_OVERLAP_SECONDS):
+    """Segments of window `k` that survive stitching; `prev` is the last segment kept so far."""
+    lower = k * chunk_seconds + overlap_seconds / 2 if k else float("-inf")
+    upper = window_upper_bound(k, n_windows, chunk_seconds, overlap_seconds)
+    kept = []
+    for seg in segments:
+        mid = (seg["start"] + seg["end"]) / 2
+        if not lower <= mid < upper:
+            continue
+        if prev and prev["text"].lower() == seg["text"].lower() and seg["start"] < prev["end"]:
+            continue
+        kept.append(seg)
+        prev = seg
+    return kept
+
+
+def stitch_segments(chunks, chunk_seconds=DEFAULT_CHUNK_SECONDS, overlap_seconds=DEFAULT_OVERLAP_SECONDS):
+    """Merge per-window segments (absolute times) into one transcript.
+
+    Inside an overlap, a segment belongs to the window on its side of the
+    overlap's midpoint; a segment repeated on both sides is kept once.
+    """
+    stitched = []
+    for k, segments in enumerate(chunks):
+        prev = stitched[-1] if stitched else None
+        stitched.extend(stitch_window(k, len(chunks), segments, prev, chunk_seconds, overlap_seconds))
+    return stitched
+
+
 class Transcriptor:
-    def __init__(self):
+    DEFAULT_MODEL_SIZE = "base"  # Options: tiny, base, small, medium, large, or "auto"
+    DEFAULT_TARGET_RTF = 0.1     # used by "auto": compute seconds per second of audio
+
+    def __init__(
+        self,
+        model_size=DEFAULT_MODEL_SIZE,
+        target_rtf=DEFAULT_TARGET_RTF,
+        max_seconds=None,
+        ffprobe_bin="ffprobe",
+        ffmpeg_bin="ffmpeg",
+        workers=1,
+        chunk_seconds=DEFAULT_CHUNK_SECONDS,
+        overlap_seconds=DEFAULT_OVERLAP_SECONDS,
+        worker_memory_mb=None,
+        threads_per_worker=None,
+        audio_cache_dir=DEFAULT_AUDIO_DIR,
+        incremental=False,
+        language=None,
+        cache=None,
+        columnar=True,
+        input_path=None,
+        output_path=None,
+        workspace=None,
+    ):
+        """Models come from the process-wide registry, so constructing a
+        Transcriptor is cheap; the model loads on first transcription.
+
+        With `workers` > 1 the audio is split into overlapping windows that are
+        transcribed in a process pool; `worker_memory_mb` caps the pool so
+        that workers * memory fits the memory currently available.
+
+        Audio is decoded once into the PCM cache under `audio_cache_dir`
+        (None disables the cache and decodes straight from the input).
+
+        With `incremental`, windows are transcribed in order and each one's
+        segments are appended to `<transcript>.jsonl` with a progress
+        watermark, so consumers can follow along and an interrupted run
+        resumes where it stopped.
+
+        `language` is passed to Whisper (None lets it detect the language).
+        `cache` is an optional TranscriptCache; a hit skips transcription.
+        With `columnar`, a memory-mappable copy of the transcript is written
+        next to the JSON for fast loading by downstream agents.
+
+        `input_path` and `output_path` default to the input video and
+        transcript of `workspace` (the repo-root layout without one).
+        """
         print("[🎙️ INIT] Transcriptor ready")
-        self.model = whisper.load_model("base")  # Options: tiny, base, small, medium, large
-        self.input_path = "stream_input.mp4"  # Default input file path
-        self.output_path = "assets/meta/transcript.json"
+        self.model_size = model_size
+        self.target_rtf = float(target_rtf)
+        self.max_seconds = max_seconds
+        self.ffprobe_bin = ffprobe_bin
+        self.ffmpeg_bin = ffmpeg_bin
+        self.workers = max(1, int(workers))
+        self.chunk_seconds = float(chunk_seconds)
+        self.overlap_seconds = float(overlap_seconds)
+        self.worker_memory_mb = worker_memory_mb
+        self.threads_per_worker = threads_per_worker
+        self.audio_cache_dir = audio_cache_dir
+        self.incremental = incremental
+        self.language = language
+        self.cache = cache
+        self.columnar = columnar
+        ws = workspace or Workspace()
+        self.input_path = input_path or ws.path("input_video")
+        self.output_path = output_path or ws.path("transcript")
+        self.stream_path, self.progress_path = stream_paths(self.output_path)
+        # Whether this transcribe() call has re-initialised the incremental stream
+        self._stream_reset = False
+
+    def resolve_model_size(self):
+        if self.model_size != "auto":
+            return self.model_size
+        duration = probe_duration(self.input_path, self.ffprobe_bin)
+        size = choose_model_size(duration, self.target_rtf, self.max_seconds)
+        print(f"[🎚️] Auto-selected Whisper '{size}' for {duration or 0:.0f}s of input (target RTF {self.target_rtf})")
+        return size
+
+    @property
+    def model(self):
+        return get_whisper_model(self.resolve_model_size())
+
+    def transcribe(self, ready=None):
+        """Transcribe the input and write the transcript JSON; returns True on success.
 
-    def transcribe(self):
+        `ready` is an optional threading.Event set once the incremental stream
+        has been (re)initialised, so followers never read a stale one.
+        """
         print("[🎧] Starting transcription...")
+        self._stream_reset = False
 
         if not os.path.exists(self.input_path):
             print(f"[❌] Input file not found: {self.input_path}")
-            return
+            if self.incremental:
+                self.fail_stream(f"input file not found: {self.input_path}")
+            if ready:
+                ready.set()
+            return False
 
         try:
-            result = self.model.transcribe(self.input_path)
+            cache_key = settings = output = None
+            if self.cache:
+                settings = self.cache_settings()
+                cache_key = self.cache.make_key(self.input_path, settings)
+                output = self.cache.get(cache_key)
+            hit = output is not None
+            if hit:
+                print(f"[💾] Transcript cache hit ({cache_key[:12]})")
+                if self.incremental:
+                    self.publish_stream(output)
+            elif self.incremental:
+                output = self.transcribe_incremental(self.audio_pcm(), ready)
+            elif self.workers > 1:
+                output = self.transcribe_parallel(self.audio_pcm())
+            else:
+                pcm_path = self.audio_pcm()
+                audio = open_pcm(pcm_path) if pcm_path else self.input_path
+                result = _run_whisper(self.model, audio, self.decode_options())
+                # Sanitize and structure output
+                output = []
+                for segment in result["segments"]:
+                    output.append({
+                        "start": segment["start"],
+                        "end": segment["end"],
+                        "text": segment["text"].strip()
+                    })
+            if cache_key and not hit:
+                self.cache.put(cache_key, output, self.input_path, settings)
         except Exception as e:
             print(f"[❌] Transcription failed: {e}")
-            return
-
-        # Sanitize and structure output
-        output = []
-        for segment in result["segments"]:
-            output.append({
-                "start": segment["start"],
-                "end": segment["end"],
-                "text": segment["text"].strip()
-            })
+            if self.incremental:
+                self.fail_stream(str(e))
+            return False
+        finally:
+            if ready:
+                ready.set()
 
         os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
         with open(self.output_path, "w") as f:
             json.dump(output, f, indent=2)
+        if self.columnar:
+            write_columnar(output, columnar_path(self.output_path), source=self.output_path)
 
         print(f"[✅] Transcript saved to {self.output_path}")
+        return True
+
+    def fail_stream(self, error: str):
+        """Mark the incremental stream failed before followers are released.
+
+        Once this run has reset the stream, its key and watermark are kept so
+        the next run can resume. Before that, the stream still holds another
+        input's segments, so it is emptied rather than handed to followers.
+        """
+        if self._stream_reset:
+            progress = read_progress(self.progress_path) or {}
+        else:
+            progress = {}
+            rewrite_segments(self.stream_path, [])
+        write_progress(self.progress_path, progress.get("watermark", 0.0), key=progress.get("key"), error=error)
+
+    def decode_options(self):
+        return {"language": self.language} if self.language else {}
+
+    def cache_settings(self):
+        """Everything besides the input that changes the transcript."""
+        decode = dict(self.decode_options())
+        if self.incremental or self.workers > 1:
+            # Window boundaries and stitching shift segment edges slightly
+            decode.update(chunk_seconds=self.chunk_seconds, overlap_seconds=self.overlap_seconds)
+        return self.cache.settings(self.resolve_model_size(), self.language, decode)
+
+    def publish_stream(self, segments):
+        """Write a complete incremental stream for an already-finished transcript."""
+        rewrite_segments(self.stream_path, segments)
+        write_progress(self.progress_path, segments[-1]["end"] if segments else 0.0, complete=True)
+        self._stream_reset = True
+
+    def pool_size(self, n_windows):
+        workers = min(self.workers, n_windows)
+        if self.worker_memory_mb:
+            available = _available_memory_mb()
+            if available:
+                workers = min(workers, max(1, available // int(self.worker_memory_mb)))
+        return max(1, workers)
+
+    def audio_pcm(self):
+        """Path of the cached 16 kHz PCM for the input, or None when the cache is disabled."""
+        if not self.audio_cache_dir:
+            return None
+        return extract_pcm(self.input_path, self.audio_cache_dir, self.ffmpeg_bin)
+
+    def duration(self, pcm_path=None):
+        if pcm_path:
+            duration = pcm_duration(pcm_path)
+        else:
+            duration = probe_duration(self.input_path, self.ffprobe_bin)
+        if not duration:
+            raise RuntimeError(f"Could not determine duration of {self.input_path}")
+        return duration
+
+    def iter_windows(self, jobs):
+        """Transcribe window jobs, yielding results in order as they finish."""
+        workers = self.pool_size(len(jobs))
+        if workers == 1:
+            _init_worker(self.threads_per_worker)
+            for job in jobs:
+                yield _transcribe_window(job)
+            return
+        # spawn: workers must not inherit a forked copy of torch state
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(self.threads_per_worker,),
+        ) as pool:
+            yield from pool.map(_transcribe_window, jobs)
+
+    def transcribe_parallel(self, pcm_path=None):
+        """Transcribe overlapping windows in a process pool and stitch the results."""
+        duration = self.duration(pcm_path)
+        size = self.resolve_model_size()
+        windows = plan_windows(duration, self.chunk_seconds, self.overlap_seconds)
+        print(f"[🧩] Transcribing {len(windows)} windows of {self.chunk_seconds:.0f}s with {self.pool_size(len(windows))} workers")
+
+        jobs = [
+            (self.input_path, pcm_path, size, start, length, self.ffmpeg_bin, self.decode_options())
+            for start, length in windows
+        ]
+        chunks = list(self.iter_windows(jobs))
+        return stitch_segments(chunks, self.chunk_seconds, self.overlap_seconds)
+
+    def transcribe_incremental(self, pcm_path=None, ready=None):
+        """Transcribe windows in order, publishing each one's segments as it finishes.
+
+        Progress is keyed by the input fingerprint and window settings; a
+        matching progress file from an interrupted run is resumed from its
+        watermark, anything else starts the stream over.
+        """
+        duration = self.duration(pcm_path)
+        size = self.resolve_model_size()
+        windows = plan_windows(duration, self.chunk_seconds, self.overlap_seconds)
+        n = len(windows)
+        key = {
+            "input": fingerprint_file(self.input_path),
+            "model_size": size,
+            "chunk_seconds": self.chunk_seconds,
+            "overlap_seconds": self.overlap_seconds,
+        }
+
+        progress = read_progress(self.progress_path) or {}
+        if progress.get("key") == key and progress.get("complete"):
+            segments = read_segments(self.stream_path)
+            watermark, complete = duration, True
+        elif progress.get("key") == key:
+            watermark = progress.get("watermark", 0.0)
+            segments = read_segments(self.stream_path, watermark)
+            complete = False
+        else:
+            watermark, segments, complete = 0.0, [], False
+        rewrite_segments(self.stream_path, segments)
+        write_progress(self.progress_path, watermark, complete=complete, key=key)
+        self._stream_reset = True
+        if ready:
+            ready.set()
+
+        first = n if complete else next(
+            k for k in range(n) if window_upper_bound(k, n, self.chunk_seconds, self.overlap_seconds) > watermark
+        )
+        if first:
+            print(f"[⏩] Resuming at {watermark:.0f}s ({first}/{n} windows already transcribed)")
+        if first < n:
+            print(f"[🧩] Streaming {n - first} windows of {self.chunk_seconds:.0f}s with {self.pool_size(n - first)} workers")
+
+        jobs = [
+            (self.input_path, pcm_path, size, start, length, self.ffmpeg_bin, self.decode_options())
+            for start, length in windows[first:]
+        ]
+        for k, chunk in enumerate(self.iter_windows(jobs), start=first):
+            prev = segments[-1] if segments else None
+            kept = stitch_window(k, n, chunk, prev, self.chunk_seconds, self.overlap_seconds)
+            append_segments(self.stream_path, kept)
+            segments.extend(kept)
+            watermark = min(duration, window_upper_bound(k, n, self.chunk_seconds, self.overlap_seconds))
+            write_progress(self.progress_path, watermark, complete=k == n - 1, key=key)
+        return segments
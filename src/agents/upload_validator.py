@@ -10,6 +10,7 @@ Validates:
 - Resolution ≥ 720×1280
 - File size under platform limits
 - Metadata completeness
+- Source range not mostly black or silent (when a media analysis sidecar exists)
 """
 
 import json
@@ -20,6 +21,7 @@ from pathlib import Path
 from typing import Optional
 
 from src.utils.logger import get_logger
+from src.utils.workspace import Workspace
 
 
 # Platform constraints
@@ -31,6 +33,8 @@ ASPECT_RATIO_TOLERANCE = 0.1  # Allow 10% deviation
 MAX_FILE_SIZE_MB = 256  # YouTube Shorts limit
 MAX_TITLE_LENGTH = 100
 MAX_CAPTION_LENGTH = 500
+MAX_BLACK_FRACTION = 0.5  # of the clip's source range
+MAX_SILENT_FRACTION = 0.5
 
 
 @dataclass
@@ -88,17 +92,24 @@ class UploadValidator:
 
     def __init__(
         self,
-        shorts_dir: str = "outputs/shorts",
-        clips_index_path: str = "outputs/capsynth/CLIPS_INDEX.json",
-        report_dir: str = "outputs/validation",
+        shorts_dir: str = None,
+        clips_index_path: str = None,
+        report_dir: str = None,
         ffprobe_bin: str = "ffprobe",
-        log_file: str = "logs/pixal.log",
+        log_file: str = None,
+        analysis=None,
+        workspace: Workspace = None,
     ):
-        self.shorts_dir = Path(shorts_dir)
-        self.clips_index_path = Path(clips_index_path)
-        self.report_dir = Path(report_dir)
+        """`analysis` is an optional MediaAnalysis of the source video, used to
+        flag clips cut from black or silent stretches. Paths not given come
+        from `workspace` (default: the repo-root layout)."""
+        ws = workspace or Workspace()
+        self.shorts_dir = Path(shorts_dir or ws.path("shorts_dir"))
+        self.clips_index_path = Path(clips_index_path or os.path.join(ws.path("capsynth_dir"), "CLIPS_INDEX.json"))
+        self.report_dir = Path(report_dir or ws.path("validation_dir"))
         self.ffprobe_bin = ffprobe_bin
-        self.log = get_logger("upload_validator", log_file)
+        self.analysis = analysis
+        self.log = get_logger("upload_validator", log_file or ws.path("log_file"))
         self.log.info("[🔍 INIT] UploadValidator online")
 
     def validate_all(self) -> ValidationReport:
@@ -227,6 +238,16 @@ class UploadValidator:
         if duration is not None and duration < 1.0:
             errors.append("Duration less than 1 second (possible empty artifact)")
 
+        # Check the source range against the analysis sidecar
+        start, end = metadata.get("start"), metadata.get("end")
+        if self.analysis is not None and start is not None and end is not None:
+            black = self.analysis.black_fraction(start, end)
+            if black > MAX_BLACK_FRACTION:
+                warnings.append(f"{black*100:.0f}% of the source range is black")
+            silent = self.analysis.silent_fraction(start, end)
+            if silent > MAX_SILENT_FRACTION:
+                warnings.append(f"{silent*100:.0f}% of the source range is silent")
+
         return ClipValidation(
             clip_path=str(mp4_path),
             valid=len(errors) == 0,
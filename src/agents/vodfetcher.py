@@ -1,54 +1,282 @@
 """VODFetcher agent for downloading VODs from streaming platforms."""
+import json
 import os
+import re
+import time
+from datetime import datetime
+
+from src.utils.fingerprint import fingerprint_file
+from src.utils.fsutil import file_lock, link_or_copy, unique_tmp
+from src.utils.media import probe_duration
+
+DEFAULT_STORE_DIR = "cache/vods"
+DEFAULT_CONCURRENT_FRAGMENTS = 4
+DEFAULT_RETRIES = 10
+DURATION_TOLERANCE = 2.0  # seconds a stored file may differ from the extractor's duration
+PROGRESS_LOG_SECONDS = 10
+
+VIDEO_FORMAT = "best[ext=mp4]/best"
+# Low-bitrate audio-only rendition for the transcribe/detect pass; falls back
+# to the smallest muxed rendition for sources that have no audio-only format
+AUDIO_FORMAT = "bestaudio[abr<=96]/worstaudio/bestaudio/worst"
+DEFAULT_RANGE_PADDING = 5.0     # seconds fetched either side of a clip
+DEFAULT_RANGE_MERGE_GAP = 30.0  # clip ranges closer than this share one fetch
+
+
+def _store_key(info: dict) -> str:
+    """Stable store key from the extractor and its video ID."""
+    key = f"{info.get('extractor_key') or info.get('extractor') or 'generic'}-{info['id']}"
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", key)
+
+
+def plan_ranges(clips, padding: float = DEFAULT_RANGE_PADDING, merge_gap: float = DEFAULT_RANGE_MERGE_GAP):
+    """Padded, merged (start, end) source ranges that cover every clip."""
+    merged = []
+    for start, end in sorted((max(0.0, c["start"] - padding), c["end"] + padding) for c in clips):
+        if merged and start - merged[-1][1] <= merge_gap:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(round(start, 3), round(end, 3)) for start, end in merged]
 
 
 class VODFetcher:
-    """Downloads VODs from Twitch, YouTube, and other supported platforms using yt-dlp."""
+    """Downloads VODs from Twitch, YouTube, and other supported platforms using yt-dlp.
 
-    def __init__(self):
+    Downloads land in a store keyed by extractor and video ID, so asking for
+    the same VOD again reuses the verified file instead of re-downloading it.
+    Besides the full VOD, the store holds an audio-only rendition and
+    clip-sized ranges for the ranged ingest mode.
+    """
+
+    def __init__(
+        self,
+        store_dir: str = DEFAULT_STORE_DIR,
+        concurrent_fragments: int = DEFAULT_CONCURRENT_FRAGMENTS,
+        retries: int = DEFAULT_RETRIES,
+        ffprobe_bin: str = "ffprobe",
+    ):
         print("[📥 INIT] VODFetcher ready")
+        self.store_dir = store_dir
+        self.concurrent_fragments = max(1, int(concurrent_fragments))
+        self.retries = int(retries)
+        self.ffprobe_bin = ffprobe_bin
+        # Bytes actually transferred by this fetcher (resumed and reused bytes excluded)
+        self.bytes_fetched = 0
 
     def download(self, url: str, output_path: str = "stream_input.mp4") -> bool:
         """Download a VOD from the given URL.
-        
+
         Args:
             url: The VOD URL (Twitch, YouTube, etc.)
             output_path: Where to save the downloaded video
-            
+
         Returns:
             bool: True if download succeeded, False otherwise
-            
+
         Note:
-            Prefers mp4 format when available. If mp4 is not available, 
-            yt-dlp will download the best available format and may 
+            Prefers mp4 format when available. If mp4 is not available,
+            yt-dlp will download the best available format and may
             convert/remux it to the output path specified.
+            Interrupted downloads resume from their .part file, and HLS/DASH
+            sources fetch `concurrent_fragments` fragments in parallel.
+        """
+        return self._download_stored(url, output_path, VIDEO_FORMAT, ".mp4")
+
+    def download_audio(self, url: str, output_path: str = "stream_audio.m4a") -> bool:
+        """Download only a low-bitrate audio rendition of the VOD.
+
+        Enough for transcription and clip detection; the video for the chosen
+        clips is fetched afterwards with download_ranges().
         """
+        return self._download_stored(url, output_path, AUDIO_FORMAT, ".audio.m4a")
+
+    def _import(self):
         try:
             import yt_dlp
         except ImportError:
             print("[❌] yt-dlp not installed. Run: pip install yt-dlp")
+            return None
+        return yt_dlp
+
+    def _resolve(self, yt_dlp, url, fmt):
+        try:
+            with yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True, "format": fmt}) as ydl:
+                return ydl.extract_info(url, download=False)
+        except Exception as e:
+            print(f"[❌] Could not resolve VOD {url}: {e}")
+            return None
+
+    def _download_stored(self, url, output_path, fmt, suffix):
+        yt_dlp = self._import()
+        if yt_dlp is None:
+            return False
+        info = self._resolve(yt_dlp, url, fmt)
+        if info is None:
+            return False
+
+        key = _store_key(info)
+        store_path = os.path.join(self.store_dir, f"{key}{suffix}")
+        meta_path = os.path.splitext(store_path)[0] + ".json"
+
+        # Other jobs may want the same VOD; one downloads while the rest wait and reuse it
+        with file_lock(store_path + ".lock", f"[⏳] Waiting for another job fetching VOD {key}"):
+            if self.verify(store_path, meta_path, info):
+                print(f"[♻️] VOD {key} already in store; reusing {store_path}")
+            else:
+                if os.path.exists(store_path):
+                    # Complete but failed verification: start over rather than "resume" past the end
+                    os.unlink(store_path)
+                if not self._fetch(yt_dlp, url, store_path, key, fmt):
+                    return False
+                self._write_meta(meta_path, store_path, url, info)
+
+        try:
+            link_or_copy(store_path, output_path)
+        except OSError as e:
+            print(f"[❌] Could not place VOD at {output_path}: {e}")
             return False
+        print(f"[✅] VOD downloaded to {output_path}")
+        return True
+
+    def download_ranges(self, url: str, ranges) -> list:
+        """Fetch (start, end) ranges of the VOD at full video quality.
+
+        yt-dlp hands each range to ffmpeg, which reads progressive sources
+        with HTTP range requests and HLS/DASH sources segment by segment, so
+        only the requested minutes cross the network. Cuts are forced onto
+        keyframes so a range file's t=0 is exactly `start`.
+
+        Returns:
+            list: {"start", "end", "path"} for every range now in the store
+        """
+        yt_dlp = self._import()
+        if yt_dlp is None:
+            return []
+        info = self._resolve(yt_dlp, url, VIDEO_FORMAT)
+        if info is None:
+            return []
+        from yt_dlp.utils import download_range_func
+
+        key = _store_key(info)
+        range_dir = os.path.join(self.store_dir, f"{key}.ranges")
+        os.makedirs(range_dir, exist_ok=True)
+        before = self.bytes_fetched
+        fetched = []
+        for start, end in ranges:
+            path = os.path.join(range_dir, f"{start:.3f}-{end:.3f}.mp4")
+            expected = min(end, info.get("duration") or end) - start
+            label = f"{key} {start:.1f}-{end:.1f}s"
+            with file_lock(path + ".lock", f"[⏳] Waiting for another job fetching {label}"):
+                if self._range_ok(path, expected):
+                    print(f"[♻️] Range {start:.1f}-{end:.1f}s of {key} already in store")
+                else:
+                    if os.path.exists(path):
+                        os.unlink(path)
+                    opts = {
+                        "download_ranges": download_range_func(None, [(start, end)]),
+                        "force_keyframes_at_cuts": True,
+                    }
+                    if not self._fetch(yt_dlp, url, path, label, VIDEO_FORMAT, opts):
+                        continue
+            fetched.append({"start": start, "end": end, "path": path})
+
+        full = info.get("filesize") or info.get("filesize_approx")
+        of_full = f" of ~{full / 1e6:.0f} MB for the full VOD" if full else ""
+        print(f"[📊] Ranges: {len(fetched)}/{len(ranges)} in store, "
+              f"{(self.bytes_fetched - before) / 1e6:.1f} MB fetched{of_full}")
+        return fetched
+
+    def _range_ok(self, path, expected):
+        if not os.path.exists(path):
+            return False
+        actual = probe_duration(path, self.ffprobe_bin)
+        return actual is not None and abs(actual - expected) <= DURATION_TOLERANCE
+
+    def _fetch(self, yt_dlp, url, store_path, key, fmt, extra_opts=None):
+        # What an interrupted download left behind; yt-dlp resumes from it
+        part = store_path + ".part"
+        resumed_from = os.path.getsize(part) if os.path.exists(part) else 0
+        progress = {"started": time.monotonic(), "last_log": 0.0}
+
+        def hook(d):
+            now = time.monotonic()
+            done = d.get("downloaded_bytes") or 0
+            if d.get("status") == "downloading" and now - progress["last_log"] >= PROGRESS_LOG_SECONDS:
+                progress["last_log"] = now
+                total = d.get("total_bytes") or d.get("total_bytes_estimate")
+                speed = (d.get("speed") or 0) / 1e6
+                of_total = f" of {total / 1e6:.0f} MB" if total else ""
+                print(f"[📥] {done / 1e6:.0f} MB{of_total} at {speed:.1f} MB/s")
 
-        print(f"[📥] Downloading VOD from {url}")
-        
         ydl_opts = {
-            'format': 'best[ext=mp4]/best',
-            'outtmpl': output_path,
+            'format': fmt,
+            'outtmpl': store_path,
             'quiet': False,
             'no_warnings': False,
+            'noprogress': True,
+            'continuedl': True,
+            'concurrent_fragment_downloads': self.concurrent_fragments,
+            'retries': self.retries,
+            'fragment_retries': self.retries,
+            'progress_hooks': [hook],
+            **(extra_opts or {}),
         }
 
+        print(f"[📥] Downloading VOD {key} from {url}")
         try:
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 ydl.download([url])
-            
-            if os.path.exists(output_path):
-                print(f"[✅] VOD downloaded to {output_path}")
-                return True
-            else:
-                print(f"[❌] Download completed but file not found at {output_path}")
-                return False
-                
         except Exception as e:
             print(f"[❌] VOD download failed: {e}")
             return False
+
+        if not os.path.exists(store_path):
+            print(f"[❌] Download completed but file not found at {store_path}")
+            return False
+
+        elapsed = max(1e-6, time.monotonic() - progress["started"])
+        fetched = max(0, os.path.getsize(store_path) - resumed_from)
+        self.bytes_fetched += fetched
+        resumed = f" (resumed at {resumed_from / 1e6:.0f} MB)" if resumed_from else ""
+        print(f"[📊] Downloaded {fetched / 1e6:.1f} MB in {elapsed:.1f}s, {fetched / 1e6 / elapsed:.2f} MB/s{resumed}")
+        return True
+
+    def _write_meta(self, meta_path, store_path, url, info):
+        tmp = unique_tmp(meta_path)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "url": url,
+                "id": info.get("id"),
+                "extractor": info.get("extractor_key") or info.get("extractor"),
+                "title": info.get("title"),
+                "duration": info.get("duration"),
+                "size": os.path.getsize(store_path),
+                "fingerprint": fingerprint_file(store_path),
+                "downloaded_at": datetime.now().isoformat(timespec="seconds"),
+            }, f, indent=2)
+        os.replace(tmp, meta_path)
+
+    def verify(self, store_path: str, meta_path: str, info: dict = None) -> bool:
+        """True when the stored VOD is complete and unchanged since download.
+
+        Checks the recorded size and fingerprint, and that the container is
+        readable with a duration close to the extractor's.
+        """
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        if not os.path.exists(store_path) or os.path.getsize(store_path) != meta.get("size"):
+            return False
+        if fingerprint_file(store_path) != meta.get("fingerprint"):
+            print(f"[⚠️] Stored VOD {store_path} changed since download; fetching again")
+            return False
+        expected = (info or {}).get("duration") or meta.get("duration")
+        if expected:
+            actual = probe_duration(store_path, self.ffprobe_bin)
+            if actual is None or abs(actual - expected) > DURATION_TOLERANCE:
+                print(f"[⚠️] Stored VOD {store_path} is unreadable or truncated; fetching again")
+                return False
+        return True
@@ -1,10 +1,25 @@
+import ast
+import functools
+import hashlib
+import importlib.util
+import json
 import os
+import queue
 import shutil
+import threading
+from dataclasses import dataclass
 from datetime import datetime
-from pathlib import Path
+from typing import Callable
 
+from src.utils.artifacts import hash_artifact, load_manifest, save_manifest
 from src.utils.config import load_config, ensure_dir
+from src.utils.fsutil import link_or_copy
 from src.utils.logger import get_logger
+from src.utils.workspace import Workspace
+
+class StepIncomplete(RuntimeError):
+    """A step ran but only partly succeeded; the run goes on, but the step is
+    not recorded as up to date so the next run retries it."""
 
 def _run_id() -> str:
     return datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -29,72 +44,857 @@ def _prepare_run_dirs(cfg: dict, run_id: str) -> dict:
         "capsynth_dir": capsynth_dir,
     }
 
-def _copy_outputs_into_run(run_paths: dict):
-    # Keeps compatibility: existing agents output to outputs/shorts and outputs/capsynth
-    # After run, we copy them into the run folder as an archive.
-    src_shorts = Path("outputs/shorts")
-    if src_shorts.exists():
-        for f in src_shorts.glob("*.mp4"):
-            shutil.copy2(str(f), os.path.join(run_paths["shorts_dir"], f.name))
-
-    src_capsynth = Path("outputs/capsynth")
-    if src_capsynth.exists():
-        dest = Path(run_paths["capsynth_dir"])
-        ensure_dir(str(dest))
-        # Copy entire capsynth folder content (non-destructive)
-        for p in src_capsynth.rglob("*"):
-            if p.is_file():
-                rel = p.relative_to(src_capsynth)
-                out = dest / rel
-                out.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(str(p), str(out))
-
-def run_all(vod_url: str = None, file_path: str = None, config_path: str = "pixal.yaml") -> str:
-    cfg = load_config(config_path)
+def _legacy_output_dirs(cfg: dict, run_paths: dict):
+    """(legacy dir, run dir) pairs, e.g. outputs/shorts and outputs/runs/<id>/shorts."""
+    base_dir = cfg["outputs"]["base_dir"]
+    return [
+        (os.path.join(base_dir, cfg["outputs"]["shorts_dir_name"]), run_paths["shorts_dir"]),
+        (os.path.join(base_dir, cfg["outputs"]["capsynth_dir_name"]), run_paths["capsynth_dir"]),
+    ]
+
+def _link_tree(src: str, dst: str):
+    """Hardlink every file under `src` into `dst` (reflink, then copy as fallback)."""
+    for root, _, files in os.walk(src):
+        for name in files:
+            path = os.path.join(root, name)
+            link_or_copy(path, os.path.join(dst, os.path.relpath(path, src)))
+
+def _point_outputs_at_run(cfg: dict, run_paths: dict) -> list:
+    """Make outputs/shorts and outputs/capsynth resolve into this run's folders.
+
+    The previous outputs are hardlinked into the run folders first, so steps
+    skipped as up to date still leave a complete run. Each legacy dir is then
+    swapped for a symlink to its run folder, and agents writing to the legacy
+    paths write straight into the run without any copying. Where symlinks
+    are not available the legacy dirs stay real; those are returned so that
+    _sync_outputs_into_run() can link their files over after the run.
+    """
+    pending = []
+    for legacy, run_dir in _legacy_output_dirs(cfg, run_paths):
+        if os.path.isdir(legacy) and os.path.realpath(legacy) == os.path.realpath(run_dir):
+            continue
+        tmp = f"{legacy}.{os.getpid()}.link"
+        try:
+            os.symlink(os.path.relpath(run_dir, os.path.dirname(legacy) or "."), tmp, target_is_directory=True)
+        except OSError:
+            ensure_dir(legacy)
+            pending.append((legacy, run_dir))
+            continue
+        if os.path.isdir(legacy):
+            _link_tree(legacy, run_dir)
+        if os.path.islink(legacy):
+            os.unlink(legacy)
+        elif os.path.isdir(legacy):
+            # A pre-symlink outputs dir; its files now live on in the run folder
+            shutil.rmtree(legacy)
+        os.replace(tmp, legacy)
+    return pending
+
+def _sync_outputs_into_run(pending: list):
+    for legacy, run_dir in pending:
+        _link_tree(legacy, run_dir)
+
+def _render_forge(cfg: dict):
+    from src.agents.renderforge import RenderForge
+
+    rt = cfg["runtime"]
+    return RenderForge(
+        workers=rt.get("render_workers", "auto"),
+        ffmpeg_threads=rt.get("ffmpeg_threads", 4),
+        ffmpeg_bin=rt.get("ffmpeg_bin", "ffmpeg"),
+        engine=rt.get("render_engine", "per_clip"),
+        max_gap=rt.get("single_pass_max_gap", 120),
+        precut=rt.get("render_precut", False),
+        precut_dir=cfg.get("cache", {}).get("precut_dir", "cache/precut"),
+        cache_dir=cfg.get("cache", {}).get("render_dir", "cache/renders"),
+        keyframes_dir=cfg.get("cache", {}).get("keyframes_dir", "cache/keyframes"),
+        ranges=_source_ranges(cfg),
+        range_fetcher=_range_fetcher(cfg),
+        workspace=Workspace(cfg),
+    )
+
+def _render(cfg: dict, log):
+    summary = _render_forge(cfg).run()
+
+    for r in summary["clips"]:
+        if not r["ok"]:
+            log.error(f"Render failed: {r['output']}: {r['error']}")
+    log.info(f"Render: {len(summary['clips']) - summary['failed']}/{len(summary['clips'])} clips ok in {summary['wall_time']}s")
+    if summary["clips"] and summary["failed"] == len(summary["clips"]):
+        raise RuntimeError("RenderForge failed on every clip. Aborting run.")
+    if summary["failed"]:
+        raise StepIncomplete(f"{summary['failed']} of {len(summary['clips'])} clips failed to render")
+    return summary
+
+def _transcript_cache(cfg: dict):
+    from src.utils.transcript_cache import TranscriptCache
+
+    cache_cfg = cfg.get("cache", {})
+    if not cache_cfg.get("transcripts_enabled", True):
+        return None
+    return TranscriptCache(cache_cfg.get("transcripts_dir", "cache/transcripts"))
+
+def _transcriptor(cfg: dict):
+    from src.agents.transcriptor import Transcriptor
+
+    tr = cfg.get("transcribe", {})
+    return Transcriptor(
+        model_size=tr.get("model_size", "base"),
+        target_rtf=tr.get("target_rtf", 0.1),
+        max_seconds=tr.get("max_seconds"),
+        ffmpeg_bin=cfg["runtime"].get("ffmpeg_bin", "ffmpeg"),
+        workers=tr.get("workers", 1),
+        chunk_seconds=tr.get("chunk_seconds", 600),
+        overlap_seconds=tr.get("overlap_seconds", 5),
+        worker_memory_mb=tr.get("worker_memory_mb"),
+        threads_per_worker=tr.get("threads_per_worker"),
+        audio_cache_dir=cfg.get("cache", {}).get("audio_dir", "cache/audio"),
+        incremental=tr.get("incremental", False),
+        language=tr.get("language"),
+        cache=_transcript_cache(cfg),
+        columnar=tr.get("columnar", True),
+        input_path=_ingest_path(cfg),
+        workspace=Workspace(cfg),
+    )
+
+def _extract_audio(cfg: dict, log):
+    from src.utils.audio_cache import SAMPLE_RATE, extract_pcm, pcm_duration
+
+    artifacts = _artifact_paths(cfg)
+    try:
+        pcm_path = extract_pcm(
+            artifacts["ingest"],
+            cfg.get("cache", {}).get("audio_dir", "cache/audio"),
+            cfg["runtime"].get("ffmpeg_bin", "ffmpeg"),
+        )
+    except (RuntimeError, OSError) as e:
+        # No audio stream or no input: record that, and let transcribe report
+        # the failure as it did before there was an audio step
+        _write_json(artifacts["audio"], {"pcm": None, "error": str(e)})
+        raise StepIncomplete(f"audio extraction failed: {e}")
+    # Small pointer artifact so the DAG can track the content-addressed PCM file
+    _write_json(artifacts["audio"], {
+        "pcm": pcm_path,
+        "sample_rate": SAMPLE_RATE,
+        "duration": round(pcm_duration(pcm_path), 3),
+    })
+    log.info(f"Audio cache: {pcm_path}")
+
+def _analyze(cfg: dict, log):
+    from src.utils.media_analysis import MediaAnalysis, analyze_media
+
+    artifacts = _artifact_paths(cfg)
+    try:
+        sidecar = analyze_media(
+            artifacts["ingest"],
+            cfg.get("cache", {}).get("analysis_dir", "cache/analysis"),
+            cfg["runtime"].get("ffmpeg_bin", "ffmpeg"),
+        )
+    except (RuntimeError, OSError) as e:
+        # Analysis only refines detection; the run goes on without it
+        _write_json(artifacts["analysis"], {"sidecar": None, "error": str(e)})
+        raise StepIncomplete(f"media analysis failed: {e}")
+    analysis = MediaAnalysis(sidecar)
+    _write_json(artifacts["analysis"], {
+        "sidecar": sidecar,
+        "duration": analysis.duration,
+        "scene_cuts": len(analysis.scene_cuts()),
+        "black_intervals": len(analysis.black),
+        "silence_intervals": len(analysis.silence),
+    })
+    log.info(f"Analysis: {analysis.duration}s, {len(analysis.scene_cuts())} scene cuts, "
+             f"{len(analysis.black)} black and {len(analysis.silence)} silent stretches")
+
+def _media_analysis(cfg: dict):
+    """MediaAnalysis recorded by the analyze step, or None when it has not run."""
+    from src.utils.media_analysis import MediaAnalysis
+
+    try:
+        with open(_artifact_paths(cfg)["analysis"], "r", encoding="utf-8") as f:
+            sidecar = json.load(f).get("sidecar")
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return MediaAnalysis(sidecar) if sidecar and os.path.exists(sidecar) else None
+
+def _transcribe(cfg: dict, log, ready=None):
+    from src.utils.model_registry import model_stats
+
+    transcriptor = _transcriptor(cfg)
+    ok = transcriptor.transcribe(ready=ready)
+    if transcriptor.cache:
+        log.info(transcriptor.cache.summary())
+    for size, stats in model_stats().items():
+        log.info(f"Whisper {size}: load {stats['load_seconds']}s, +{stats['rss_delta_mb']} MB RSS")
+    if not ok:
+        # A transcript left over from an earlier input must not be recorded as this one's
+        raise StepIncomplete("transcription failed")
+
+def _vod_fetcher(cfg: dict):
+    from src.agents.vodfetcher import VODFetcher
+
+    dl = cfg.get("download", {})
+    return VODFetcher(
+        store_dir=cfg.get("cache", {}).get("vod_dir", "cache/vods"),
+        concurrent_fragments=dl.get("concurrent_fragments", 4),
+        retries=dl.get("retries", 10),
+    )
+
+def _ingest_path(cfg: dict) -> str:
+    """Media the audio/analyze/transcribe steps read.
+
+    The full input video when present, else the audio-only rendition left by
+    a ranged ingest (download.mode: ranged).
+    """
+    ws = Workspace(cfg)
+    video, audio = ws.path("input_video"), ws.path("input_audio")
+    return audio if not os.path.exists(video) and os.path.exists(audio) else video
+
+def _vod_source(cfg: dict) -> dict:
+    try:
+        with open(_artifact_paths(cfg)["vod_source"], "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def _ranged_url(cfg: dict):
+    """VOD URL to fetch clip ranges from, when the last ingest was ranged."""
+    source = _vod_source(cfg)
+    if source.get("mode") != "ranged" or os.path.exists(cfg["paths"]["input_video"]):
+        return None
+    return source.get("url")
+
+def _range_plan_args(cfg: dict) -> dict:
+    dl = cfg.get("download", {})
+    merge_gap = dl.get("range_merge_gap", 30)
+    rt = cfg["runtime"]
+    if rt.get("render_engine", "per_clip") == "single_pass":
+        # A single-pass group must fit in one range
+        merge_gap = max(merge_gap, rt.get("single_pass_max_gap", 120))
+    return {"padding": dl.get("range_padding", 5), "merge_gap": merge_gap}
+
+def _source_ranges(cfg: dict) -> list:
+    """Clip ranges recorded by the ranges step whose files still exist."""
+    url = _ranged_url(cfg)
+    try:
+        with open(_artifact_paths(cfg)["ranges"], "r", encoding="utf-8") as f:
+            recorded = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+    if not url or recorded.get("url") != url:
+        return []
+    return [r for r in recorded.get("ranges", []) if os.path.exists(r["path"])]
+
+def _range_fetcher(cfg: dict):
+    """Fetch-on-demand callable for RenderForge in ranged mode, else None."""
+    from src.agents.vodfetcher import plan_ranges
+
+    url = _ranged_url(cfg)
+    if not url:
+        return None
+    fetcher = _vod_fetcher(cfg)
+    padding = _range_plan_args(cfg)["padding"]
+    return lambda start, end: fetcher.download_ranges(url, plan_ranges([{"start": start, "end": end}], padding))
+
+def _write_ranges(cfg: dict, ranges: list):
+    source = _vod_source(cfg)
+    _write_json(_artifact_paths(cfg)["ranges"], {
+        "mode": source.get("mode", "full"),
+        "url": source.get("url"),
+        "ranges": sorted(ranges, key=lambda r: r["start"]),
+    })
+
+def _fetch_ranges(cfg: dict, log):
+    from src.agents.vodfetcher import plan_ranges
+
+    url = _ranged_url(cfg)
+    if not url:
+        # Full input on disk; RenderForge cuts from it directly
+        _write_ranges(cfg, [])
+        return
+    with open(_artifact_paths(cfg)["augmented_editspec"], "r", encoding="utf-8") as f:
+        clips = json.load(f)
+    planned = plan_ranges(clips, **_range_plan_args(cfg))
+    fetched = _vod_fetcher(cfg).download_ranges(url, planned)
+    _write_ranges(cfg, fetched)
+    seconds = sum(r["end"] - r["start"] for r in fetched)
+    log.info(f"Ranges: {len(fetched)}/{len(planned)} fetched for {len(clips)} clips ({seconds:.0f}s of video)")
+    if len(fetched) < len(planned):
+        log.warning(f"{len(planned) - len(fetched)} clip ranges could not be fetched")
+
+def _llm_cache(cfg: dict):
+    from src.utils.llm_cache import LLMCache
+
+    cache_cfg = cfg.get("cache", {})
+    if not cache_cfg.get("llm_enabled", True):
+        return None
+    return LLMCache(
+        path=cache_cfg.get("llm_db", "cache/llm.sqlite3"),
+        max_mb=cache_cfg.get("llm_max_mb", 256),
+        ttl_hours=cache_cfg.get("llm_ttl_hours", 168),
+        bypass=cache_cfg.get("llm_bypass", False),
+    )
+
+def _audio_pcm(cfg: dict):
+    """Path of the cached PCM recorded by the audio step, if it still exists."""
+    try:
+        with open(_artifact_paths(cfg)["audio"], "r", encoding="utf-8") as f:
+            pcm = json.load(f).get("pcm")
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return pcm if pcm and os.path.exists(pcm) else None
+
+def _follow_timeout(cfg: dict) -> float:
+    from src.utils.transcript_stream import stall_timeout
+
+    tr = cfg.get("transcribe", {})
+    return stall_timeout(tr.get("chunk_seconds", 600), tr.get("target_rtf", 0.1))
+
+def _clip_hunter(cfg: dict):
+    from src.agents.cliphunter import ClipHunter
+
+    det = cfg.get("detect", {})
+    return ClipHunter(
+        cache=_llm_cache(cfg),
+        mode=det.get("mode", "single"),
+        window_tokens=det.get("window_tokens"),
+        window_overlap=det.get("window_overlap"),
+        concurrency=det.get("concurrency"),
+        requests_per_minute=det.get("requests_per_minute"),
+        tokens_per_minute=det.get("tokens_per_minute"),
+        max_retries=cfg.get("llm", {}).get("max_retries"),
+        follow=det.get("follow", False),
+        follow_timeout=_follow_timeout(cfg),
+        prescore_top_k=det.get("prescore_top_k"),
+        audio_path=_audio_pcm(cfg),
+        analysis=_media_analysis(cfg),
+        workspace=Workspace(cfg),
+    )
+
+def _detect(cfg: dict, log, writer_alive=None):
+    if not _clip_hunter(cfg).detect(writer_alive=writer_alive):
+        raise StepIncomplete("no clips were written")
+
+def _script_crafter(cfg: dict):
+    from src.agents.scriptcrafter import ScriptCrafter
+
+    llm = cfg.get("llm", {})
+    return ScriptCrafter(
+        concurrency=llm.get("concurrency"),
+        requests_per_minute=llm.get("requests_per_minute"),
+        tokens_per_minute=llm.get("tokens_per_minute"),
+        request_timeout=llm.get("request_timeout"),
+        max_retries=llm.get("max_retries"),
+        cache=_llm_cache(cfg),
+        workspace=Workspace(cfg),
+    )
+
+def _craft(cfg: dict, log):
+    summary = _script_crafter(cfg).craft()
+    if summary is None:
+        raise StepIncomplete("transcript or clips could not be loaded")
+    log.info(f"Craft: {summary['written']}/{summary['clips']} clips scripted")
+    if summary["failed"] or not summary["written"]:
+        # An editspec left over from earlier clips must not be recorded as this one's
+        raise StepIncomplete(f"{summary['failed']} of {summary['clips']} clips could not be scripted")
+
+def _forge(cfg: dict, log):
+    from src.agents.templateforge import TemplateForge
+    TemplateForge(Workspace(cfg)).inject()
+
+def _timeline(cfg: dict, log):
+    from src.agents.timeline_builder import TimelineBuilder
+    TimelineBuilder(Workspace(cfg)).build()
+
+def _capsynth(cfg: dict, log):
+    from src.agents.capsynth import CapSynth
+    CapSynth(Workspace(cfg)).run()
+
+@dataclass(frozen=True)
+class Step:
+    """A pipeline step and the artifacts it reads and writes.
+
+    Artifact names resolve to paths via _artifact_paths(). The step's code
+    version is the hash of its agent module's source; the src.utils modules
+    it imports and the pixal.yaml settings named in `config` (sections or
+    dotted keys) are hashed alongside it.
+    """
+    name: str
+    inputs: tuple
+    outputs: tuple
+    module: str
+    run: Callable
+    config: tuple = ()
+
+# Declared DAG, in execution order. Edges follow from shared artifact names.
+STEPS = (
+    Step("audio", ("ingest",), ("audio",), "src.utils.audio_cache", _extract_audio),
+    Step("analyze", ("ingest",), ("analysis",), "src.utils.media_analysis", _analyze),
+    Step("transcribe", ("ingest", "audio"), ("transcript",), "src.agents.transcriptor", _transcribe,
+         config=("transcribe",)),
+    Step("detect", ("transcript", "stream_meta", "audio", "analysis"), ("clips",), "src.agents.cliphunter", _detect,
+         config=("detect",)),
+    Step("craft", ("transcript", "clips"), ("editspec",), "src.agents.scriptcrafter", _craft,
+         config=("llm",)),
+    Step("forge", ("editspec",), ("augmented_editspec",), "src.agents.templateforge", _forge),
+    Step("timeline", ("augmented_editspec",), ("fcpxml",), "src.agents.timeline_builder", _timeline),
+    Step("ranges", ("augmented_editspec", "vod_source"), ("ranges",), "src.agents.vodfetcher", _fetch_ranges,
+         config=("download.range_padding", "download.range_merge_gap",
+                 "runtime.render_engine", "runtime.single_pass_max_gap")),
+    Step("render", ("ingest", "augmented_editspec", "ranges"), ("shorts",), "src.agents.renderforge", _render,
+         config=("runtime.render_engine", "runtime.ffmpeg_threads",
+                 "runtime.single_pass_max_gap", "runtime.render_precut")),
+    Step("capsynth", ("augmented_editspec",), ("capsynth",), "src.agents.capsynth", _capsynth),
+)
+STEPS_BY_NAME = {s.name: s for s in STEPS}
+
+def _artifact_paths(cfg: dict) -> dict:
+    ws = Workspace(cfg)
+    names = (
+        "input_video", "vod_source", "ranges", "stream_meta", "audio", "analysis",
+        "transcript", "clips", "editspec", "augmented_editspec", "fcpxml",
+    )
+    return {
+        **{name: ws.path(name) for name in names},
+        "ingest": _ingest_path(cfg),
+        "shorts": ws.path("shorts_dir"),
+        "capsynth": ws.path("capsynth_dir"),
+    }
+
+def downstream_of(names) -> set:
+    """Return the named steps plus every step that transitively consumes their outputs."""
+    unknown = [n for n in names if n not in STEPS_BY_NAME and n != "all"]
+    if unknown:
+        raise ValueError(f"Unknown step(s): {', '.join(unknown)}")
+    if "all" in names:
+        return set(STEPS_BY_NAME)
+
+    selected = set(names)
+    produced = {a for n in selected for a in STEPS_BY_NAME[n].outputs}
+    for step in STEPS:
+        if step.name not in selected and produced.intersection(step.inputs):
+            selected.add(step.name)
+            produced.update(step.outputs)
+    return selected
+
+def _module_origin(module: str):
+    spec = importlib.util.find_spec(module)
+    return spec.origin if spec and spec.origin else None
+
+def _utils_path(module: str):
+    """Source file of a src.utils module, found without importing it."""
+    parts = module.split(".")
+    if parts[:2] != ["src", "utils"] or len(parts) < 3:
+        return None
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), *parts[1:]) + ".py"
+    return path if os.path.isfile(path) else None
+
+@functools.lru_cache(maxsize=None)
+def _utils_imports(module: str) -> frozenset:
+    """src.utils modules that `module` imports, directly or through each other."""
+    origin = _utils_path(module) or _module_origin(module)
+    if not origin:
+        return frozenset()
+    with open(origin, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=origin)
+    direct = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names = [node.module] + [f"{node.module}.{a.name}" for a in node.names]
+        elif isinstance(node, ast.Import):
+            names = [a.name for a in node.names]
+        else:
+            continue
+        direct.update(n for n in names if _utils_path(n))
+    found = set(direct)
+    for dep in direct - {module}:
+        found |= _utils_imports(dep)
+    found.discard(module)
+    return frozenset(found)
+
+def _config_value(cfg: dict, key: str):
+    value = cfg
+    for part in key.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+def _versions(step: Step, cfg: dict) -> dict:
+    """Code, helper-module and config hashes a step's outputs depend on."""
+    origin = _module_origin(step.module)
+    deps = hashlib.sha256()
+    for module in sorted(_utils_imports(step.module)):
+        deps.update(module.encode("utf-8"))
+        deps.update(hash_artifact(_utils_path(module)).encode("ascii"))
+    settings = {key: _config_value(cfg, key) for key in step.config}
+    return {
+        "code": hash_artifact(origin) if origin else "unknown",
+        "deps": deps.hexdigest(),
+        "config": hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode("utf-8")).hexdigest(),
+    }
+
+def _hashes(names, artifacts: dict) -> dict:
+    return {n: hash_artifact(artifacts[n]) for n in names}
+
+def _skip_reason(step: Step, record: dict, artifacts: dict, cfg: dict):
+    """Return why `step` is up to date, or None when it has to run."""
+    if not record:
+        return None
+    if any(record.get(k) != v for k, v in _versions(step, cfg).items()):
+        return None
+    inputs = _hashes(step.inputs, artifacts)
+    if any(h is None for h in inputs.values()) or inputs != record.get("inputs"):
+        return None
+    if _hashes(step.outputs, artifacts) != record.get("outputs"):
+        return None
+    return "inputs, outputs, code and config unchanged"
+
+def _record(step: Step, manifest: dict, artifacts: dict, inputs: dict, versions: dict, log) -> bool:
+    """Record a finished step in the manifest; returns False if outputs are missing."""
+    outputs = _hashes(step.outputs, artifacts)
+    missing = [n for n, h in outputs.items() if h is None]
+    if missing:
+        # Agents report their own failures; don't mark the step up to date
+        log.warning(f"{step.name} did not produce: {', '.join(missing)}")
+        manifest["steps"].pop(step.name, None)
+        return False
+
+    manifest["steps"][step.name] = {
+        **versions,
+        "inputs": inputs,
+        "outputs": outputs,
+        "completed_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    return True
+
+def _execute(step: Step, cfg: dict, log, manifest: dict, artifacts: dict, force: bool):
+    record = manifest["steps"].get(step.name)
+    reason = None if force else _skip_reason(step, record, artifacts, cfg)
+    if reason:
+        log.info(f"Skip {step.name}: {reason}")
+        return False
+
+    log.info(f"Run {step.name}")
+    inputs = _hashes(step.inputs, artifacts)
+    versions = _versions(step, cfg)
+    try:
+        step.run(cfg, log)
+    except StepIncomplete as e:
+        log.warning(f"{step.name} incomplete: {e}; it will run again next time")
+        manifest["steps"].pop(step.name, None)
+        return True
+    _record(step, manifest, artifacts, inputs, versions, log)
+    return True
+
+def _detect_follows(cfg: dict) -> bool:
+    """True when detect can consume the transcript stream while transcribe runs."""
+    det = cfg.get("detect", {})
+    return bool(
+        cfg.get("transcribe", {}).get("incremental")
+        and det.get("follow")
+        and det.get("mode", "single") == "windowed"
+    )
+
+def _execute_overlapped(cfg: dict, log, manifest: dict, artifacts: dict, forced: set):
+    """Run transcribe with detect following its incremental output in a thread."""
+    transcribe, detect = STEPS_BY_NAME["transcribe"], STEPS_BY_NAME["detect"]
+    if "transcribe" not in forced and _skip_reason(transcribe, manifest["steps"].get("transcribe"), artifacts, cfg):
+        # Transcript is current, so there is nothing to follow
+        _execute(transcribe, cfg, log, manifest, artifacts, force=False)
+        _execute(detect, cfg, log, manifest, artifacts, force="detect" in forced)
+        return
+
+    log.info("Run transcribe, detect (following the transcript stream)")
+    inputs = _hashes(transcribe.inputs, artifacts)
+    versions = _versions(transcribe, cfg)
+    ready = threading.Event()
+    writer_done = threading.Event()
+    failed, incomplete, errors = [], [], []
+
+    def follow():
+        ready.wait()
+        if failed:
+            return
+        try:
+            _detect(cfg, log, writer_alive=lambda: not writer_done.is_set())
+        except StepIncomplete as e:
+            incomplete.append(e)
+        except Exception as e:
+            errors.append(e)
+
+    follower = threading.Thread(target=follow, name="pixal-detect", daemon=True)
+    follower.start()
+    try:
+        _transcribe(cfg, log, ready=ready)
+    except BaseException as e:
+        failed.append(e)
+        if not isinstance(e, StepIncomplete):
+            raise
+    finally:
+        writer_done.set()
+        ready.set()
+    follower.join()
+
+    if failed:
+        # Whatever detect saw came from a failed stream; neither step is up to date
+        log.warning(f"transcribe incomplete: {failed[0]}; transcribe and detect will run again next time")
+        manifest["steps"].pop("transcribe", None)
+        manifest["steps"].pop("detect", None)
+        return
+    _record(transcribe, manifest, artifacts, inputs, versions, log)
+    if errors:
+        raise errors[0]
+    if incomplete:
+        log.warning(f"detect incomplete: {incomplete[0]}; it will run again next time")
+        manifest["steps"].pop("detect", None)
+        return
+    _record(detect, manifest, artifacts, _hashes(detect.inputs, artifacts), _versions(detect, cfg), log)
+
+# Steps that the streaming mode runs per clip instead of per artifact
+STREAMED_STEPS = ("craft", "forge", "timeline", "ranges", "render", "capsynth")
+_DONE = object()
+
+def _stage(worker, src: queue.Queue, dst: queue.Queue, errors: list, name: str, workers: int = 1):
+    """Start `workers` threads mapping items from `src` to `dst`.
+
+    `worker(item)` returns the item to forward or None to drop it. Once every
+    thread has seen the end marker, the marker is forwarded to `dst`.
+    """
+    def loop():
+        while True:
+            item = src.get()
+            if item is _DONE:
+                src.put(_DONE)  # let sibling threads see it too
+                return
+            try:
+                out = worker(item)
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+                continue
+            if out is not None:
+                dst.put(out)
+
+    threads = [threading.Thread(target=loop, name=f"pixal-{name}-{i}", daemon=True) for i in range(workers)]
+    for t in threads:
+        t.start()
+
+    def close():
+        for t in threads:
+            t.join()
+        dst.put(_DONE)
+
+    closer = threading.Thread(target=close, name=f"pixal-{name}-close", daemon=True)
+    closer.start()
+    return closer
+
+def _write_json(path: str, data):
+    ensure_dir(os.path.dirname(path) or ".")
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+def run_streaming(cfg: dict, log) -> set:
+    """Move each clip through craft → forge → render → capsynth on its own.
+
+    Stages are connected by bounded queues, so GPT latency for one clip overlaps
+    with ffmpeg encoding of the previous one. The editspec, augmented editspec,
+    timeline and CLIPS_INDEX.json artifacts are written once the stream drains,
+    identical in shape to the batch pipeline.
+
+    Returns the names of steps that must not be recorded as up to date:
+    every streamed step when inputs are missing or a clip was dropped on the
+    way (craft failure, stage error), else "render" if any render failed.
+    """
+    from src.agents.templateforge import TemplateForge
+    from src.agents.timeline_builder import TimelineBuilder
+    from src.agents.capsynth import CapSynth
+
+    crafter = _script_crafter(cfg)
+    transcript = crafter.load_transcript()
+    clips = crafter.load_json(crafter.clips_path)
+    if transcript is None or clips is None:
+        log.error("Streaming run: transcript or clips missing; nothing to do.")
+        return set(STREAMED_STEPS)
+
+    maxsize = int(cfg.get("pipeline", {}).get("queue_size", 2))
+    crafted_q, forged_q, rendered_q, done_q = (queue.Queue(maxsize=maxsize) for _ in range(4))
+    workspace = Workspace(cfg)
+    forge = TemplateForge(workspace)
+    render = _render_forge(cfg)
+    capsynth = CapSynth(workspace)
+    crafted, forged, exported, renders, errors = [], [], [], [], []
+    dropped = []
+
+    def produce():
+        # Results come back in clip order so numbering matches the batch pipeline
+        try:
+            for clip, out in zip(clips, crafter.iter_crafted(transcript, clips)):
+                if out is None:
+                    dropped.append(clip)
+                    continue
+                crafted.append(out)
+                crafted_q.put((len(crafted), out))
+        except Exception as e:
+            errors.append(f"craft: {e}")
+        finally:
+            crafted_q.put(_DONE)
+
+    def do_forge(item):
+        index, clip = item
+        clip = forge.augment(dict(clip))
+        forged.append((index, clip))
+        return index, clip
+
+    def do_render(item):
+        index, clip = item
+        renders.append(render.render_one(clip, index))
+        return index, clip
+
+    def do_capsynth(item):
+        index, clip = item
+        exported.append(capsynth.export_clip(clip, index))
+        return None
+
+    producer = threading.Thread(target=produce, name="pixal-craft", daemon=True)
+    producer.start()
+    _stage(do_forge, crafted_q, forged_q, errors, "forge")
+    _stage(do_render, forged_q, rendered_q, errors, "render", workers=render.workers)
+    _stage(do_capsynth, rendered_q, done_q, errors, "capsynth").join()
+    producer.join()
+
+    for err in errors:
+        log.error(f"Streaming stage error: {err}")
+    failed = [r for r in renders if not r["ok"]]
+    for r in failed:
+        log.error(f"Render failed: {r['output']}: {r['error']}")
+    log.info(f"Streaming run: {len(crafted)}/{len(clips)} crafted, {len(renders) - len(failed)}/{len(renders)} rendered")
+    incomplete = {"render"} if failed else set()
+    if dropped or errors or not clips:
+        # A clip missing from the editspec leaves every streamed artifact short of it
+        incomplete = set(STREAMED_STEPS)
+    if crafter.cache:
+        log.info(crafter.cache.summary())
+
+    if not crafted:
+        log.warning("No edit specifications were generated from clips")
+        return incomplete
+    _write_json(crafter.output_path, crafted)
+    _write_json(forge.output_path, [clip for _, clip in sorted(forged, key=lambda ic: ic[0])])
+    # Ranges were fetched per clip as the render stage asked for them
+    _write_ranges(cfg, render.ranges if render.range_fetcher else [])
+    TimelineBuilder(workspace).build()
+    capsynth.write_index(sorted(exported, key=lambda e: e["clip_id"]))
+    return incomplete
+
+def _run_streamed_steps(cfg: dict, log, manifest: dict, artifacts: dict, forced: set):
+    steps = [STEPS_BY_NAME[n] for n in STREAMED_STEPS]
+    if not forced.intersection(STREAMED_STEPS) and all(
+        _skip_reason(step, manifest["steps"].get(step.name), artifacts, cfg) for step in steps
+    ):
+        log.info(f"Skip {', '.join(STREAMED_STEPS)}: inputs, outputs, code and config unchanged")
+        return
+
+    log.info(f"Run {', '.join(STREAMED_STEPS)} (streaming)")
+    incomplete = run_streaming(cfg, log)
+    # Inputs of later steps are produced inside the stream, so hash them afterwards
+    for step in steps:
+        if step.name in incomplete:
+            log.warning(f"{step.name} incomplete; it will run again next time")
+            manifest["steps"].pop(step.name, None)
+            continue
+        _record(step, manifest, artifacts, _hashes(step.inputs, artifacts), _versions(step, cfg), log)
+
+def _manifest_path(cfg: dict) -> str:
+    return Workspace(cfg).path("run_manifest")
+
+def run_all(
+    vod_url: str = None,
+    file_path: str = None,
+    config_path: str = "pixal.yaml",
+    force=None,
+    mode: str = None,
+    bypass_llm_cache: bool = False,
+    workspace: Workspace = None,
+) -> str:
+    """Run the pipeline DAG, skipping steps whose inputs and code are unchanged.
+
+    `force` lists step names (or "all") to re-run together with everything
+    downstream of them. `mode` is "batch" or "streaming" (default from
+    pipeline.mode in pixal.yaml). `bypass_llm_cache` skips LLM cache lookups
+    (fresh responses still refresh the cache). `workspace` runs the job in
+    its own directory tree (see Workspace.for_job) instead of the layout of
+    `config_path`, so several runs can share a host.
+    """
+    cfg = workspace.cfg if workspace else load_config(config_path)
+    workspace = workspace or Workspace(cfg)
+    if bypass_llm_cache:
+        cfg.setdefault("cache", {})["llm_bypass"] = True
     log = get_logger("pixal", cfg["runtime"]["log_file"])
+    forced = downstream_of(force or [])
+    mode = mode or cfg.get("pipeline", {}).get("mode", "batch")
+    if mode not in ("batch", "streaming"):
+        raise ValueError(f"Unknown pipeline mode: {mode}")
 
     run_id = _run_id() if cfg["runtime"]["enable_run_ids"] else "default"
     run_paths = _prepare_run_dirs(cfg, run_id)
+    unlinked_outputs = _point_outputs_at_run(cfg, run_paths)
 
-    log.info(f"Pixal run start: run_id={run_id}")
+    log.info(f"Pixal run start: run_id={run_id} workspace={workspace.root or '.'}")
 
     # Lazy imports so doctor can run without all deps installed
     if vod_url:
-        from src.agents.vodfetcher import VODFetcher
-        log.info(f"VOD fetch: {vod_url}")
-        ok = VODFetcher().download(vod_url, output_path=cfg["paths"]["input_video"])
+        ingest = cfg.get("download", {}).get("mode", "full")
+        if ingest not in ("full", "ranged"):
+            raise ValueError(f"Unknown download mode: {ingest}")
+        log.info(f"VOD fetch ({ingest}): {vod_url}")
+        fetcher = _vod_fetcher(cfg)
+        if ingest == "ranged":
+            # Audio first; video only for the clip ranges, fetched by the ranges step
+            ok = fetcher.download_audio(vod_url, output_path=workspace.path("input_audio"))
+            if ok and os.path.exists(workspace.path("input_video")):
+                os.unlink(workspace.path("input_video"))
+        else:
+            ok = fetcher.download(vod_url, output_path=workspace.path("input_video"))
         if not ok:
             raise RuntimeError("VODFetcher failed. Aborting run.")
+        _write_json(_artifact_paths(cfg)["vod_source"], {"mode": ingest, "url": vod_url})
     elif file_path:
-        # Copy/normalize into expected input path
-        ensure_dir(os.path.dirname(cfg["paths"]["input_video"]) or ".")
-        shutil.copy2(file_path, cfg["paths"]["input_video"])
-        log.info(f"Using local file copied to {cfg['paths']['input_video']}")
+        # Agents read the file in place through a link at the expected input
+        # path; only filesystems without any kind of link get a copy.
+        input_video = workspace.path("input_video")
+        ensure_dir(os.path.dirname(input_video) or ".")
+        method = link_or_copy(file_path, input_video, methods=("hardlink", "reflink", "symlink", "copy"))
+        log.info(f"Using local file {file_path} via {method} at {input_video}")
+        _write_json(_artifact_paths(cfg)["vod_source"], {"mode": "file", "path": os.path.abspath(file_path)})
     else:
         log.info("No vod_url or file_path provided; expecting input video already present.")
 
-    from src.agents.transcriptor import Transcriptor
-    from src.agents.cliphunter import ClipHunter
-    from src.agents.scriptcrafter import ScriptCrafter
-    from src.agents.templateforge import TemplateForge
-    from src.agents.timeline_builder import TimelineBuilder
-    from src.agents.renderforge import RenderForge
-    from src.agents.capsynth import CapSynth
-
-    Transcriptor().transcribe()
-    ClipHunter().detect()
-    ScriptCrafter().craft()
-    TemplateForge().inject()
-    TimelineBuilder().build()
-    RenderForge().run()
-    CapSynth().run()
+    artifacts = _artifact_paths(cfg)
+    manifest_path = _manifest_path(cfg)
+    manifest = load_manifest(manifest_path)
+    overlapped = _detect_follows(cfg)
+    for step in STEPS:
+        if mode == "streaming" and step.name in STREAMED_STEPS:
+            continue
+        if overlapped and step.name == "detect":
+            continue
+        if overlapped and step.name == "transcribe":
+            _execute_overlapped(cfg, log, manifest, artifacts, forced)
+        else:
+            _execute(step, cfg, log, manifest, artifacts, force=step.name in forced)
+        save_manifest(manifest_path, manifest)
+    if mode == "streaming":
+        _run_streamed_steps(cfg, log, manifest, artifacts, forced)
+        save_manifest(manifest_path, manifest)
 
-    _copy_outputs_into_run(run_paths)
+    _sync_outputs_into_run(unlinked_outputs)
+    save_manifest(os.path.join(run_paths["run_root"], "manifest.json"), manifest)
     log.info(f"Pixal run complete: run_id={run_id}")
     return run_id
 
-def run_step(step: str, config_path: str = "pixal.yaml"):
-    cfg = load_config(config_path)
+def run_step(step: str, config_path: str = "pixal.yaml", bypass_llm_cache: bool = False,
+             workspace: Workspace = None):
+    """Run one step unconditionally and record it in the run manifest."""
+    cfg = workspace.cfg if workspace else load_config(config_path)
+    if bypass_llm_cache:
+        cfg.setdefault("cache", {})["llm_bypass"] = True
     log = get_logger("pixal", cfg["runtime"]["log_file"])
     step = step.strip().lower()
 
@@ -102,33 +902,10 @@ def run_step(step: str, config_path: str = "pixal.yaml"):
 
     if step == "vodfetch":
         raise ValueError("vodfetch requires --vod URL; use pixalctl run --vod ...")
-    if step == "transcribe":
-        from src.agents.transcriptor import Transcriptor
-        Transcriptor().transcribe()
-        return
-    if step == "detect":
-        from src.agents.cliphunter import ClipHunter
-        ClipHunter().detect()
-        return
-    if step == "craft":
-        from src.agents.scriptcrafter import ScriptCrafter
-        ScriptCrafter().craft()
-        return
-    if step == "forge":
-        from src.agents.templateforge import TemplateForge
-        TemplateForge().inject()
-        return
-    if step == "timeline":
-        from src.agents.timeline_builder import TimelineBuilder
-        TimelineBuilder().build()
-        return
-    if step == "render":
-        from src.agents.renderforge import RenderForge
-        RenderForge().run()
-        return
-    if step == "capsynth":
-        from src.agents.capsynth import CapSynth
-        CapSynth().run()
-        return
+    if step not in STEPS_BY_NAME:
+        raise ValueError(f"Unknown step: {step}")
 
-    raise ValueError(f"Unknown step: {step}")
+    manifest_path = _manifest_path(cfg)
+    manifest = load_manifest(manifest_path)
+    _execute(STEPS_BY_NAME[step], cfg, log, manifest, _artifact_paths(cfg), force=True)
+    save_manifest(manifest_path, manifest)
@@ -0,0 +1,56 @@
+"""Content hashes of pipeline artifacts and the run manifest that records them."""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from src.utils.fingerprint import fingerprint_file
+
+# Files above this size are fingerprinted by sampled blocks instead of hashed in full
+FULL_HASH_MAX_BYTES = 64 * 1024 * 1024
+
+
+def hash_file(path: str) -> str:
+    if os.path.getsize(path) > FULL_HASH_MAX_BYTES:
+        return "fp:" + fingerprint_file(path)
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def hash_artifact(path: str):
+    """Hash a file or directory artifact; None when it does not exist.
+
+    Directories hash their relative file names together with each file's hash,
+    so adding, removing or changing any file changes the result.
+    """
+    p = Path(path)
+    if p.is_file():
+        return hash_file(str(p))
+    if p.is_dir():
+        h = hashlib.sha256()
+        for f in sorted(x for x in p.rglob("*") if x.is_file()):
+            h.update(str(f.relative_to(p)).encode("utf-8"))
+            h.update(hash_file(str(f)).encode("ascii"))
+        return "dir:" + h.hexdigest()
+    return None
+
+
+def load_manifest(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"steps": {}}
+    manifest.setdefault("steps", {})
+    return manifest
+
+
+def save_manifest(path: str, manifest: dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
@@ -0,0 +1,79 @@
+"""Decode-once audio cache.
+
+The audio track of an input is decoded a single time to 16 kHz mono float32
+raw PCM (Whisper's native format) and stored under the input's fingerprint.
+Consumers open it with numpy.memmap and read slices zero-copy, so worker
+processes never re-decode the video or hold the whole track in RAM.
+"""
+import json
+import os
+import subprocess
+
+from src.utils.fingerprint import fingerprint_file
+from src.utils.fsutil import unique_tmp
+
+SAMPLE_RATE = 16000
+DTYPE = "float32"
+DEFAULT_AUDIO_DIR = "cache/audio"
+
+
+def pcm_cache_path(input_path: str, cache_dir: str = DEFAULT_AUDIO_DIR) -> str:
+    return os.path.join(cache_dir, f"{fingerprint_file(input_path)}.f32")
+
+
+def extract_pcm(input_path: str, cache_dir: str = DEFAULT_AUDIO_DIR, ffmpeg_bin: str = "ffmpeg") -> str:
+    """Return the cached PCM file for `input_path`, decoding it on a miss."""
+    pcm_path = pcm_cache_path(input_path, cache_dir)
+    if os.path.exists(pcm_path):
+        return pcm_path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = unique_tmp(pcm_path)
+    cmd = [
+        ffmpeg_bin, "-nostdin", "-y", "-loglevel", "error",
+        "-i", input_path,
+        "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-f", "f32le", tmp,
+    ]
+    print(f"[🔊] Decoding audio of {input_path} to {pcm_path}")
+    try:
+        subprocess.run(cmd, check=True)
+    except subprocess.CalledProcessError as e:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise RuntimeError(f"Audio extraction failed for {input_path}: ffmpeg exited with code {e.returncode}") from e
+    except FileNotFoundError as e:
+        raise RuntimeError(f"{ffmpeg_bin} not found") from e
+    os.replace(tmp, pcm_path)
+
+    sidecar = pcm_path + ".json"
+    tmp = unique_tmp(sidecar)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({
+            "source": os.path.abspath(input_path),
+            "sample_rate": SAMPLE_RATE,
+            "dtype": DTYPE,
+            "samples": os.path.getsize(pcm_path) // 4,
+        }, f, indent=2)
+    os.replace(tmp, sidecar)
+    return pcm_path
+
+
+def open_pcm(pcm_path: str):
+    """Memory-map a PCM cache file read-only as a float32 numpy array."""
+    import numpy as np
+
+    if os.path.getsize(pcm_path) == 0:
+        return np.zeros(0, dtype=DTYPE)
+    return np.memmap(pcm_path, dtype=DTYPE, mode="r")
+
+
+def pcm_duration(pcm_path: str) -> float:
+    return os.path.getsize(pcm_path) / 4 / SAMPLE_RATE
+
+
+def pcm_slice(pcm, start: float, end: float = None):
+    """Samples between `start` and `end` seconds, as a view into the memmap."""
+    lo = max(0, int(start * SAMPLE_RATE))
+    hi = len(pcm) if end is None else min(len(pcm), int(end * SAMPLE_RATE))
+    return pcm[lo:hi]
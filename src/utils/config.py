@@ -52,6 +52,8 @@ def load_config(path: str = DEFAULT_CONFIG_PATH) -> dict:
                 # scalar
                 if val.lower() in ("true", "false"):
                     v = val.lower() == "true"
+                elif _is_number(val):
+                    v = float(val) if "." in val else int(val)
                 else:
                     # strip quotes if present
                     v = val.strip("'\"")
@@ -67,5 +69,12 @@ def load_config(path: str = DEFAULT_CONFIG_PATH) -> dict:
 
     return normalize(cfg)
 
+def _is_number(val: str) -> bool:
+    try:
+        float(val)
+    except ValueError:
+        return False
+    return val.lstrip("-").replace(".", "", 1).isdigit()
+
 def ensure_dir(path: str):
     Path(path).mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,174 @@
+"""Local, signal-based highlight pre-scoring.
+
+Before any transcript goes to Claude, every second of the VOD is scored from
+cheap vectorized features:
+
+- audio (from the decode-once PCM cache): RMS loudness, loudness spikes
+  over a rolling baseline, burstiness of 50 ms energies within the second
+  (a laughter proxy) and loud, bright frames (a shouting proxy, from the
+  zero-crossing rate)
+- transcript: speech rate in words per second and density of hype
+  keywords / laughter markers
+- video (from the media analysis sidecar, when present): scene changes
+- stream metadata: `peak_moments` from the summary email
+
+Each feature is robustly standardized and combined with fixed weights;
+windows are ranked by the mean of their hottest seconds so ClipHunter can
+send only the top-K windows to the LLM, keeping token spend flat as VODs
+get longer.
+"""
+import re
+
+import numpy as np
+
+from src.utils.audio_cache import SAMPLE_RATE, open_pcm
+
+FEATURE_WEIGHTS = {
+    "loudness": 0.15,
+    "spike": 0.25,
+    "burst": 0.15,
+    "shout": 0.15,
+    "speech_rate": 0.10,
+    "keywords": 0.20,
+    "scene": 0.10,
+}
+PEAK_MOMENT_BONUS = 3.0       # added (in z units) within PEAK_MOMENT_RADIUS of a metadata peak
+PEAK_MOMENT_RADIUS = 30
+BASELINE_SECONDS = 31         # rolling median window for loudness spikes
+SUBFRAMES_PER_SECOND = 20     # 50 ms energy frames for burstiness
+BLOCK_SECONDS = 600           # PCM processed in blocks to bound memory on long VODs
+TOP_SECONDS_FRACTION = 0.2    # a window scores the mean of its hottest 20% of seconds
+
+HYPE_KEYWORDS = re.compile(
+    r"\b(no way|let'?s go+|oh my god|omg|insane|crazy|clip (it|that)|what the|holy|"
+    r"wtf|hype|pog\w*|gg|clutch|wow|yo+)\b|\b(ha){2,}\b|\blo+l\b|\blmao\b|\[laugh\w*\]",
+    re.IGNORECASE,
+)
+
+
+def _robust_z(x):
+    """Standardize by median and MAD so a few huge peaks don't flatten the rest."""
+    x = np.asarray(x, dtype=np.float64)
+    if not len(x):
+        return x
+    med = np.median(x)
+    mad = np.median(np.abs(x - med)) * 1.4826
+    if mad < 1e-9:
+        mad = x.std() or 1.0
+    return (x - med) / mad
+
+
+def _rolling_median(x, width):
+    if len(x) < width:
+        return np.full_like(x, np.median(x) if len(x) else 0.0)
+    pad = width // 2
+    padded = np.pad(x, pad, mode="edge")
+    return np.median(np.lib.stride_tricks.sliding_window_view(padded, width), axis=1)
+
+
+def parse_timestamp(value) -> float:
+    """Seconds from "HH:MM:SS" / "MM:SS" strings or plain numbers."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    seconds = 0.0
+    for part in str(value).split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def audio_features(pcm_path: str) -> dict:
+    """Per-second audio features from a 16 kHz float32 PCM cache file."""
+    pcm = open_pcm(pcm_path)
+    n_seconds = len(pcm) // SAMPLE_RATE
+    rms = np.zeros(n_seconds)
+    burst = np.zeros(n_seconds)
+    zcr = np.zeros(n_seconds)
+    sub = SAMPLE_RATE // SUBFRAMES_PER_SECOND
+    for block_start in range(0, n_seconds, BLOCK_SECONDS):
+        block_end = min(n_seconds, block_start + BLOCK_SECONDS)
+        frames = np.asarray(pcm[block_start * SAMPLE_RATE:block_end * SAMPLE_RATE], dtype=np.float32)
+        frames = frames.reshape(block_end - block_start, SAMPLE_RATE)
+        rms[block_start:block_end] = np.sqrt(np.mean(frames * frames, axis=1))
+        energies = np.mean(frames.reshape(len(frames), SUBFRAMES_PER_SECOND, sub) ** 2, axis=2)
+        burst[block_start:block_end] = energies.std(axis=1) / (energies.mean(axis=1) + 1e-10)
+        zcr[block_start:block_end] = np.count_nonzero(np.diff(np.signbit(frames), axis=1), axis=1) / SAMPLE_RATE
+
+    loudness = 20 * np.log10(rms + 1e-10)
+    spike = loudness - _rolling_median(loudness, BASELINE_SECONDS)
+    shout = np.clip(_robust_z(spike), 0, None) * np.clip(_robust_z(zcr), 0, None)
+    return {"loudness": loudness, "spike": spike, "burst": burst, "shout": shout}
+
+
+def transcript_features(transcript, n_seconds: int) -> dict:
+    """Per-second speech rate and hype-keyword density from transcript segments."""
+    words = np.zeros(n_seconds)
+    keywords = np.zeros(n_seconds)
+    for seg in transcript:
+        lo = max(0, int(seg["start"]))
+        hi = min(n_seconds, max(lo + 1, int(np.ceil(seg["end"]))))
+        if lo >= n_seconds:
+            continue
+        span = hi - lo
+        text = seg["text"]
+        words[lo:hi] += len(text.split()) / span
+        hits = len(HYPE_KEYWORDS.findall(text))
+        if hits:
+            keywords[lo:hi] += hits / span
+    return {"speech_rate": words, "keywords": keywords}
+
+
+class HighlightScorer:
+    def __init__(self, pcm_path: str = None, weights: dict = None, analysis=None):
+        """`pcm_path` is the audio cache file and `analysis` an optional
+        MediaAnalysis; features whose source is missing are skipped."""
+        self.pcm_path = pcm_path
+        self.analysis = analysis
+        self.weights = dict(weights or FEATURE_WEIGHTS)
+
+    def score(self, transcript, meta: dict = None, duration: float = None):
+        """Combined per-second highlight score (z units) and the raw features."""
+        features = audio_features(self.pcm_path) if self.pcm_path else {}
+        if features:
+            n_seconds = len(features["loudness"])
+        else:
+            last = max((seg["end"] for seg in transcript), default=0.0)
+            n_seconds = int(np.ceil(duration or last))
+        features.update(transcript_features(transcript, n_seconds))
+        if self.analysis is not None:
+            scene = np.zeros(n_seconds)
+            m = min(n_seconds, len(self.analysis.scene))
+            scene[:m] = self.analysis.scene[:m]
+            features["scene"] = scene
+
+        score = np.zeros(n_seconds)
+        for name, weight in self.weights.items():
+            if name in features and len(features[name]):
+                score += weight * _robust_z(features[name][:n_seconds])
+        for peak in (meta or {}).get("peak_moments", []):
+            try:
+                t = int(parse_timestamp(peak))
+            except ValueError:
+                continue
+            score[max(0, t - PEAK_MOMENT_RADIUS):max(0, t + PEAK_MOMENT_RADIUS)] += PEAK_MOMENT_BONUS
+        return score, features
+
+    @staticmethod
+    def window_scores(score, windows) -> np.ndarray:
+        """Score each (start, end) range by the mean of its hottest seconds."""
+        out = np.zeros(len(windows))
+        for i, (start, end) in enumerate(windows):
+            seconds = score[max(0, int(start)):max(0, int(np.ceil(end)))]
+            if not len(seconds):
+                continue
+            k = max(1, int(len(seconds) * TOP_SECONDS_FRACTION))
+            out[i] = np.partition(seconds, len(seconds) - k)[-k:].mean()
+        return out
+
+    def top_windows(self, windows, transcript, meta=None, k: int = 8):
+        """The `k` best-scoring transcript windows, returned in time order."""
+        if len(windows) <= k:
+            return list(windows)
+        score, _ = self.score(transcript, meta)
+        ranges = [(w[0]["start"], w[-1]["end"]) for w in windows]
+        best = np.argsort(-self.window_scores(score, ranges), kind="stable")[:k]
+        return [windows[i] for i in sorted(best)]
@@ -0,0 +1,225 @@
+"""Durable pipeline job queue.
+
+Jobs live in a SQLite database (WAL mode) so they survive restarts of the
+watchdog and of the workers. Producers (the email watchdog, `pixalctl submit`)
+only enqueue; `pixalctl worker` processes claim jobs under a time-limited
+lease and extend it with heartbeats while the pipeline runs:
+
+    queued --claim--> running --complete--> done
+                         |
+                         +--fail / lease expired--> queued (after a backoff)
+                                                  or dead (out of attempts)
+
+A worker that crashes simply stops heartbeating; once its lease expires the
+job is claimed again by another worker. Claims take SQLite's write lock
+(BEGIN IMMEDIATE), so any number of worker processes can share one queue.
+"""
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+DEFAULT_DB_PATH = "workspaces/jobs.sqlite3"
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_BACKOFF_SECONDS = 60  # doubled for every further attempt
+
+STATES = ("queued", "running", "done", "dead")
+
+
+class JobQueue:
+    def __init__(
+        self,
+        path: str = DEFAULT_DB_PATH,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF_SECONDS,
+    ):
+        self.path = path
+        self.lease_seconds = float(lease_seconds)
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_backoff = float(retry_backoff)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._transaction() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " job_id TEXT NOT NULL,"
+                " source TEXT NOT NULL,"
+                " options TEXT NOT NULL,"
+                " state TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " max_attempts INTEGER NOT NULL,"
+                " available_at REAL NOT NULL,"
+                " lease_owner TEXT,"
+                " lease_until REAL,"
+                " last_error TEXT,"
+                " created REAL NOT NULL,"
+                " updated REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, available_at)")
+
+    @classmethod
+    def from_config(cls, cfg: dict):
+        """The queue configured in the `queue` section of pixal.yaml."""
+        q = cfg.get("queue", {})
+        return cls(
+            q.get("db", DEFAULT_DB_PATH),
+            lease_seconds=q.get("lease_seconds", DEFAULT_LEASE_SECONDS),
+            max_attempts=q.get("max_attempts", DEFAULT_MAX_ATTEMPTS),
+            retry_backoff=q.get("retry_backoff_seconds", DEFAULT_RETRY_BACKOFF_SECONDS),
+        )
+
+    @contextmanager
+    def _transaction(self):
+        # One short-lived connection per operation, like the LLM cache; BEGIN
+        # IMMEDIATE takes the write lock up front so two claims never race
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _as_dict(row) -> dict:
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        return job
+
+    def enqueue(self, job_id: str, source: str, options: dict = None, max_attempts: int = None) -> int:
+        """Queue a pipeline run of `source` in workspace `job_id`.
+
+        `options` (stream meta, streaming mode, ...) are handed to the worker
+        unchanged. A job that is already queued or running for the same
+        workspace is returned instead of queueing a duplicate.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT id FROM jobs WHERE job_id = ? AND state IN ('queued', 'running')", (job_id,)
+            ).fetchone()
+            if row:
+                return row["id"]
+            cur = db.execute(
+                "INSERT INTO jobs (job_id, source, options, state, max_attempts, available_at, created, updated)"
+                " VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, source, json.dumps(options or {}), max_attempts or self.max_attempts, now, now, now),
+            )
+            return cur.lastrowid
+
+    def claim(self, worker: str):
+        """Lease the oldest runnable job to `worker`; None when nothing is runnable.
+
+        Jobs whose lease expired (their worker died) are runnable again, or
+        dead-lettered if that was their last attempt.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET state = 'dead', lease_owner = NULL, lease_until = NULL, updated = ?,"
+                " last_error = COALESCE(last_error, 'lease expired')"
+                " WHERE state = 'running' AND lease_until < ? AND attempts >= max_attempts",
+                (now, now),
+            )
+            row = db.execute(
+                "SELECT id FROM jobs"
+                " WHERE (state = 'queued' AND available_at <= ?) OR (state = 'running' AND lease_until < ?)"
+                " ORDER BY available_at, id LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET state = 'running', attempts = attempts + 1, lease_owner = ?, lease_until = ?,"
+                " updated = ? WHERE id = ?",
+                (worker, now + self.lease_seconds, now, row["id"]),
+            )
+            return self._as_dict(db.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+
+    def heartbeat(self, id: int, worker: str) -> bool:
+        """Extend `worker`'s lease on job `id`; False if the lease was lost."""
+        now = time.time()
+        with self._transaction() as db:
+            cur = db.execute(
+                "UPDATE jobs SET lease_until = ?, updated = ? WHERE id = ? AND state = 'running' AND lease_owner = ?",
+                (now + self.lease_seconds, now, id, worker),
+            )
+            return cur.rowcount == 1
+
+    def complete(self, id: int, worker: str) -> bool:
+        return self._finish(id, worker, "done", None)
+
+    def fail(self, id: int, worker: str, error: str) -> bool:
+        """Record a failed attempt: retry after a backoff, or dead-letter the job."""
+        return self._finish(id, worker, None, error)
+
+    def release(self, id: int, worker: str) -> bool:
+        """Hand a job back without counting the attempt (worker shutting down)."""
+        now = time.time()
+        with self._transaction() as db:
+            cur = db.execute(
+                "UPDATE jobs SET state = 'queued', attempts = MAX(0, attempts - 1), lease_owner = NULL,"
+                " lease_until = NULL, available_at = ?, updated = ?"
+                " WHERE id = ? AND state = 'running' AND lease_owner = ?",
+                (now, now, id, worker),
+            )
+            return cur.rowcount == 1
+
+    def _finish(self, id, worker, state, error):
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND state = 'running' AND lease_owner = ?",
+                (id, worker),
+            ).fetchone()
+            if row is None:
+                # Lease expired and the job went to another worker; its result wins
+                return False
+            available_at = now
+            if state is None:
+                if row["attempts"] >= row["max_attempts"]:
+                    state = "dead"
+                else:
+                    state = "queued"
+                    available_at = now + self.retry_backoff * 2 ** (row["attempts"] - 1)
+            db.execute(
+                "UPDATE jobs SET state = ?, lease_owner = NULL, lease_until = NULL, available_at = ?,"
+                " last_error = ?, updated = ? WHERE id = ?",
+                (state, available_at, error, now, id),
+            )
+            return True
+
+    def retry(self, id: int) -> bool:
+        """Put a dead job back in the queue with a fresh set of attempts."""
+        now = time.time()
+        with self._transaction() as db:
+            cur = db.execute(
+                "UPDATE jobs SET state = 'queued', attempts = 0, available_at = ?, updated = ?"
+                " WHERE id = ? AND state = 'dead'",
+                (now, now, id),
+            )
+            return cur.rowcount == 1
+
+    def jobs(self, state: str = None) -> list:
+        with self._transaction() as db:
+            if state:
+                rows = db.execute("SELECT * FROM jobs WHERE state = ? ORDER BY id", (state,)).fetchall()
+            else:
+                rows = db.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+        return [self._as_dict(r) for r in rows]
+
+    def counts(self) -> dict:
+        with self._transaction() as db:
+            rows = db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = dict.fromkeys(STATES, 0)
+        counts.update({state: n for state, n in rows})
+        return counts
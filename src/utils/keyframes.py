@@ -0,0 +1,84 @@
+"""Keyframe index for long inputs.
+
+One ffprobe pass over the video packets records every keyframe timestamp. The
+result is cached under `cache/keyframes/<fingerprint>.json`, keyed by the
+input's content fingerprint like the audio and analysis caches, so a
+different input never reuses it and nothing is written next to the input.
+"""
+import bisect
+import json
+import os
+import subprocess
+
+from src.utils.fingerprint import fingerprint_file
+from src.utils.fsutil import unique_tmp
+
+DEFAULT_KEYFRAMES_DIR = "cache/keyframes"
+
+
+def sidecar_path(video_path: str, cache_dir: str = DEFAULT_KEYFRAMES_DIR) -> str:
+    return os.path.join(cache_dir, f"{fingerprint_file(video_path)}.json")
+
+
+def probe_keyframes(video_path: str, ffprobe_bin: str = "ffprobe") -> list:
+    """Return sorted keyframe timestamps (seconds) of the first video stream.
+
+    Reads packet headers only; nothing is decoded.
+    """
+    cmd = [
+        ffprobe_bin,
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,flags",
+        "-of", "csv=p=0",
+        video_path,
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffprobe failed on {video_path}: exit code {e.returncode}") from e
+    except FileNotFoundError as e:
+        raise RuntimeError(f"{ffprobe_bin} not found") from e
+
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts, _, flags = line.partition(",")
+        if "K" not in flags or pts in ("", "N/A"):
+            continue
+        keyframes.append(float(pts))
+    keyframes.sort()
+    return keyframes
+
+
+def load_keyframe_index(video_path: str, ffprobe_bin: str = "ffprobe",
+                        cache_dir: str = DEFAULT_KEYFRAMES_DIR) -> list:
+    """Load the cached keyframe index of `video_path`, probing it on a miss."""
+    sidecar = sidecar_path(video_path, cache_dir)
+    if os.path.exists(sidecar):
+        try:
+            with open(sidecar, "r", encoding="utf-8") as f:
+                return json.load(f)["keyframes"]
+        except (json.JSONDecodeError, KeyError, OSError):
+            pass
+
+    print(f"[🔑] Indexing keyframes of {video_path}...")
+    keyframes = probe_keyframes(video_path, ffprobe_bin)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = unique_tmp(sidecar)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"input": os.path.abspath(video_path), "keyframes": keyframes}, f)
+    os.replace(tmp, sidecar)
+    print(f"[✅] {len(keyframes)} keyframes indexed to {sidecar}")
+    return keyframes
+
+
+def keyframe_at_or_before(keyframes: list, t: float) -> float:
+    """Latest keyframe <= t (0.0 when t precedes the first keyframe)."""
+    i = bisect.bisect_right(keyframes, t)
+    return keyframes[i - 1] if i else 0.0
+
+
+def keyframe_at_or_after(keyframes: list, t: float):
+    """Earliest keyframe >= t, or None when t is past the last keyframe."""
+    i = bisect.bisect_left(keyframes, t)
+    return keyframes[i] if i < len(keyframes) else None
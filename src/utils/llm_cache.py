@@ -0,0 +1,124 @@
+"""Disk-backed LLM response cache shared by ClipHunter and ScriptCrafter.
+
+Responses live in a SQLite database keyed by a hash of the model, sampling
+settings and full prompt. Entries expire after a TTL and the least recently
+used ones are evicted once the cache grows past its size cap.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_DB_PATH = "cache/llm.sqlite3"
+DEFAULT_MAX_MB = 256
+DEFAULT_TTL_HOURS = 24 * 7
+
+
+class LLMCache:
+    def __init__(
+        self,
+        path: str = DEFAULT_DB_PATH,
+        max_mb: float = DEFAULT_MAX_MB,
+        ttl_hours: float = DEFAULT_TTL_HOURS,
+        bypass: bool = False,
+    ):
+        """Open (or create) the cache.
+
+        With `bypass`, lookups always miss but fresh responses are still stored,
+        which refreshes stale entries.
+        """
+        self.path = path
+        self.max_bytes = int(float(max_mb) * 1024 * 1024)
+        self.ttl = float(ttl_hours) * 3600 if ttl_hours else None
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created REAL NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation keeps the cache thread-safe
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def make_key(model: str, temperature, max_tokens, prompt: str) -> str:
+        payload = json.dumps(
+            {"model": model, "temperature": temperature, "max_tokens": max_tokens, "prompt": prompt},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """Return the cached response text, or None on a miss."""
+        if self.bypass:
+            self._count(hit=False)
+            return None
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and self.ttl and now - row[1] > self.ttl:
+                db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row:
+                db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        self._count(hit=row is not None)
+        return row[0] if row else None
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict(db)
+
+    def _evict(self, db):
+        if self.ttl:
+            db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until we are back under the cap
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY accessed ASC").fetchall():
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        with self._connect() as db:
+            entries, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+    def summary(self) -> str:
+        return f"LLM cache: {self.hits} hits, {self.misses} misses" + (" (bypass)" if self.bypass else "")
@@ -0,0 +1,35 @@
+"""Small ffprobe helpers shared by agents."""
+import json
+import subprocess
+
+
+def probe_duration(path: str, ffprobe_bin: str = "ffprobe"):
+    """Container duration in seconds, or None when ffprobe cannot tell."""
+    cmd = [
+        ffprobe_bin,
+        "-v", "quiet",
+        "-print_format", "json",
+        "-show_format",
+        path,
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        return float(json.loads(result.stdout)["format"]["duration"])
+    except (subprocess.CalledProcessError, json.JSONDecodeError, FileNotFoundError, KeyError, ValueError):
+        return None
+
+
+def probe_stream_types(path: str, ffprobe_bin: str = "ffprobe") -> set:
+    """Codec types ("video", "audio", ...) of the streams in `path`; empty on failure."""
+    cmd = [
+        ffprobe_bin,
+        "-v", "quiet",
+        "-print_format", "json",
+        "-show_streams",
+        path,
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        return {s.get("codec_type") for s in json.loads(result.stdout).get("streams", [])}
+    except (subprocess.CalledProcessError, json.JSONDecodeError, FileNotFoundError):
+        return set()
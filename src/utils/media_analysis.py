@@ -0,0 +1,212 @@
+"""Single-pass media analysis sidecar.
+
+One ffmpeg run over the input, at reduced frame rate and resolution, feeds
+a combined filter graph:
+
+    video: fps → scale → scene-change score → blackdetect
+    audio: mono 8 kHz → 1 s frames → astats RMS level → silencedetect
+
+The results are bucketed per second and cached as a compact JSON sidecar
+under `cache/analysis/<fingerprint>.json`, so ClipHunter, HighlightScorer
+and UploadValidator can ask "is this range black / silent" or read the
+per-second scene scores without touching the video again.
+"""
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+import numpy as np
+
+from src.utils.fingerprint import fingerprint_file
+from src.utils.fsutil import unique_tmp
+from src.utils.media import probe_stream_types
+
+DEFAULT_ANALYSIS_DIR = "cache/analysis"
+SIDECAR_VERSION = 1
+ANALYSIS_FPS = 2
+ANALYSIS_WIDTH = 160
+ANALYSIS_SAMPLE_RATE = 8000
+BLACK_MIN_SECONDS = 0.5
+BLACK_PIXEL_THRESHOLD = 0.10
+SILENCE_THRESHOLD_DB = -40
+SILENCE_MIN_SECONDS = 1.0
+RMS_FLOOR_DB = -120.0
+SCENE_CUT_THRESHOLD = 0.3
+
+_BLACK_RE = re.compile(r"black_start:\s*([\d.]+)\s+black_end:\s*([\d.]+)")
+_SILENCE_START_RE = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END_RE = re.compile(r"silence_end:\s*([\d.]+)")
+
+
+def sidecar_path(input_path: str, cache_dir: str = DEFAULT_ANALYSIS_DIR) -> str:
+    return os.path.join(cache_dir, f"{fingerprint_file(input_path)}.json")
+
+
+def _read_metadata_file(path: str, key: str) -> list:
+    """(pts_time, value) pairs from a metadata=print / ametadata=print file."""
+    points, t = [], None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("frame:"):
+                    m = re.search(r"pts_time:\s*([-\d.]+)", line)
+                    t = float(m.group(1)) if m else None
+                elif line.startswith(key + "=") and t is not None:
+                    raw = line.split("=", 1)[1]
+                    try:
+                        value = float(raw)
+                    except ValueError:
+                        value = float("-inf")  # astats reports "-inf" for digital silence
+                    points.append((t, value))
+    except FileNotFoundError:
+        pass
+    return points
+
+
+def _parse_intervals(stderr: str, duration: float):
+    black = [[float(a), float(b)] for a, b in _BLACK_RE.findall(stderr)]
+    silence, start = [], None
+    for line in stderr.splitlines():
+        m = _SILENCE_START_RE.search(line)
+        if m:
+            start = max(0.0, float(m.group(1)))
+            continue
+        m = _SILENCE_END_RE.search(line)
+        if m and start is not None:
+            silence.append([start, float(m.group(1))])
+            start = None
+    if start is not None:
+        silence.append([start, duration])  # silence ran to the end of the file
+    return black, silence
+
+
+def run_analysis(input_path: str, ffmpeg_bin: str = "ffmpeg", ffprobe_bin: str = "ffprobe") -> dict:
+    """Run the combined analysis pass and return the per-second sidecar data."""
+    streams = probe_stream_types(input_path, ffprobe_bin)
+    has_video, has_audio = "video" in streams, "audio" in streams
+    if not streams:
+        # ffprobe unavailable or unsure; let ffmpeg try both branches
+        has_video = has_audio = True
+
+    workdir = tempfile.mkdtemp(prefix="pixal-analysis-")
+    scene_file = os.path.join(workdir, "scene.txt")
+    astats_file = os.path.join(workdir, "astats.txt")
+    graph, maps = [], []
+    if has_video:
+        graph.append(
+            f"[0:v]fps={ANALYSIS_FPS},scale={ANALYSIS_WIDTH}:-2,"
+            f"select='gte(scene,0)',metadata=print:key=lavfi.scene_score:file={scene_file},"
+            f"blackdetect=d={BLACK_MIN_SECONDS}:pix_th={BLACK_PIXEL_THRESHOLD}[vout]"
+        )
+        maps += ["-map", "[vout]"]
+    if has_audio:
+        graph.append(
+            f"[0:a]aresample={ANALYSIS_SAMPLE_RATE},aformat=channel_layouts=mono,"
+            f"asetnsamples=n={ANALYSIS_SAMPLE_RATE}:p=0,astats=metadata=1:reset=1,"
+            f"ametadata=print:key=lavfi.astats.Overall.RMS_level:file={astats_file},"
+            f"silencedetect=n={SILENCE_THRESHOLD_DB}dB:d={SILENCE_MIN_SECONDS}[aout]"
+        )
+        maps += ["-map", "[aout]"]
+    if not graph:
+        raise RuntimeError(f"No audio or video streams to analyze in {input_path}")
+
+    cmd = [
+        ffmpeg_bin, "-nostdin", "-hide_banner", "-nostats", "-loglevel", "info",
+        "-i", input_path,
+        "-filter_complex", ";".join(graph),
+        *maps,
+        "-f", "null", "-",
+    ]
+    print(f"[🔬] Analyzing {input_path} (scene, black, audio energy, silence)...")
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, errors="replace", check=True)
+        scene_points = _read_metadata_file(scene_file, "lavfi.scene_score")
+        rms_points = _read_metadata_file(astats_file, "lavfi.astats.Overall.RMS_level")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Media analysis failed for {input_path}: ffmpeg exited with code {e.returncode}") from e
+    except FileNotFoundError as e:
+        raise RuntimeError(f"{ffmpeg_bin} not found") from e
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    last = max([t for t, _ in scene_points] + [t + 1 for t, _ in rms_points] + [0.0])
+    n = int(math.ceil(last))
+    scene = np.zeros(n)
+    for t, v in scene_points:
+        i = min(n - 1, int(t))
+        scene[i] = max(scene[i], v)
+    rms = np.full(n, RMS_FLOOR_DB)
+    for t, v in rms_points:
+        rms[min(n - 1, int(t))] = max(RMS_FLOOR_DB, v)
+    black, silence = _parse_intervals(result.stderr, float(n))
+
+    return {
+        "version": SIDECAR_VERSION,
+        "bucket_seconds": 1,
+        "duration": n,
+        "has_video": has_video,
+        "has_audio": has_audio,
+        "scene": [round(float(v), 3) for v in scene],
+        "rms_db": [round(float(v), 1) for v in rms],
+        "black": black,
+        "silence": silence,
+    }
+
+
+def analyze_media(input_path: str, cache_dir: str = DEFAULT_ANALYSIS_DIR, ffmpeg_bin: str = "ffmpeg",
+                  ffprobe_bin: str = "ffprobe") -> str:
+    """Return the analysis sidecar for `input_path`, running the pass on a miss."""
+    path = sidecar_path(input_path, cache_dir)
+    if os.path.exists(path):
+        return path
+    data = run_analysis(input_path, ffmpeg_bin, ffprobe_bin)
+    data["input"] = os.path.abspath(input_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = unique_tmp(path)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+    print(f"[✅] Analysis sidecar written to {path}")
+    return path
+
+
+def _covered(intervals, start: float, end: float) -> float:
+    total = sum(max(0.0, min(b, end) - max(a, start)) for a, b in intervals)
+    return total / (end - start) if end > start else 0.0
+
+
+class MediaAnalysis:
+    """Query interface over a sidecar written by analyze_media()."""
+
+    def __init__(self, path: str):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.path = path
+        self.duration = data["duration"]
+        self.scene = np.asarray(data["scene"], dtype=np.float64)
+        self.rms_db = np.asarray(data["rms_db"], dtype=np.float64)
+        self.black = data["black"]
+        self.silence = data["silence"]
+
+    @classmethod
+    def for_input(cls, input_path: str, cache_dir: str = DEFAULT_ANALYSIS_DIR):
+        """The cached analysis of `input_path`, or None if it was never analyzed."""
+        if not os.path.exists(input_path):
+            return None
+        path = sidecar_path(input_path, cache_dir)
+        return cls(path) if os.path.exists(path) else None
+
+    def scene_cuts(self, threshold: float = SCENE_CUT_THRESHOLD) -> np.ndarray:
+        """Seconds whose strongest frame-to-frame change exceeds `threshold`."""
+        return np.nonzero(self.scene > threshold)[0].astype(np.float64)
+
+    def black_fraction(self, start: float, end: float) -> float:
+        return _covered(self.black, start, end)
+
+    def silent_fraction(self, start: float, end: float) -> float:
+        return _covered(self.silence, start, end)
@@ -0,0 +1,80 @@
+"""Process-level registry of loaded Whisper models.
+
+Loading a Whisper model costs seconds and hundreds of MB, so each size is
+loaded once per process and shared by every Transcriptor (pipeline runs,
+single steps and EmailWatchdog triggers alike).
+"""
+import os
+import resource
+import threading
+import time
+
+WHISPER_SIZES = ("tiny", "base", "small", "medium", "large")
+# Approximate CPU real-time factors (compute seconds per second of audio)
+APPROX_RTF = {"tiny": 0.03, "base": 0.06, "small": 0.18, "medium": 0.5, "large": 1.0}
+
+_models = {}
+_stats = {}
+_lock = threading.Lock()
+
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is the peak, in KiB on Linux; good enough as a fallback
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def get_whisper_model(size: str = "base"):
+    """Return the shared Whisper model of `size`, loading it on first use."""
+    if size not in WHISPER_SIZES:
+        raise ValueError(f"Unknown Whisper model size: {size} (expected one of: {', '.join(WHISPER_SIZES)})")
+    with _lock:
+        if size in _models:
+            return _models[size]
+
+        import whisper
+
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+        model = whisper.load_model(size)
+        load_seconds = time.perf_counter() - started
+        rss_after = _rss_bytes()
+
+        _models[size] = model
+        _stats[size] = {
+            "load_seconds": round(load_seconds, 2),
+            "rss_delta_mb": round((rss_after - rss_before) / (1024 * 1024), 1),
+            "rss_after_mb": round(rss_after / (1024 * 1024), 1),
+        }
+        print(
+            f"[🧠] Whisper '{size}' loaded in {load_seconds:.1f}s "
+            f"(+{_stats[size]['rss_delta_mb']} MB RSS, {_stats[size]['rss_after_mb']} MB total)"
+        )
+        return model
+
+
+def model_stats() -> dict:
+    """Load time and memory of every model loaded in this process."""
+    with _lock:
+        return {size: dict(stats) for size, stats in _stats.items()}
+
+
+def choose_model_size(duration_seconds=None, target_rtf: float = 0.1, max_seconds: float = None) -> str:
+    """Pick the largest model expected to meet the real-time-factor target.
+
+    With a known VOD duration and `max_seconds`, the expected transcription
+    time (duration * RTF) must also fit that wall-clock budget.
+    """
+    chosen = WHISPER_SIZES[0]
+    for size in WHISPER_SIZES:
+        rtf = APPROX_RTF[size]
+        if rtf > target_rtf:
+            break
+        if duration_seconds and max_seconds and duration_seconds * rtf > max_seconds:
+            break
+        chosen = size
+    return chosen
@@ -0,0 +1,90 @@
+"""Client-side rate limiting and retry helpers for LLM API calls."""
+import random
+import threading
+import time
+
+# HTTP statuses worth retrying: rate limited or transient server errors
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504, 529}
+RETRYABLE_ERROR_NAMES = {
+    "RateLimitError",
+    "APIConnectionError",
+    "APITimeoutError",
+    "InternalServerError",
+    "ServiceUnavailableError",
+    "Timeout",
+    "TryAgain",
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = float(rate_per_minute) / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount: float = 1.0):
+        """Block until `amount` tokens are available, then take them.
+
+        Requests larger than the bucket capacity are clamped so they can still
+        go through once the bucket is full.
+        """
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits applied together.
+
+    A limit of 0 or None disables that bucket.
+    """
+
+    def __init__(self, requests_per_minute: float = None, tokens_per_minute: float = None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def acquire(self, tokens: int = 0):
+        if self.requests:
+            self.requests.acquire(1)
+        if self.tokens and tokens:
+            self.tokens.acquire(tokens)
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for rate limits (429), 5xx responses, timeouts and connection errors."""
+    for attr in ("http_status", "status_code", "status"):
+        status = getattr(error, attr, None)
+        if isinstance(status, int):
+            return status in RETRYABLE_STATUSES
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES or isinstance(error, (TimeoutError, ConnectionError))
+
+
+def call_with_backoff(fn, max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 30.0, label: str = "request"):
+    """Call `fn()` retrying retryable errors with full-jitter exponential backoff."""
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            attempt += 1
+            print(f"[⏳] {label} failed ({type(e).__name__}); retry {attempt}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
@@ -0,0 +1,16 @@
+"""Local token estimation for prompt budgeting and rate limiting.
+
+Approximates BPE tokenizers without a tokenizer dependency: words cost about
+one token per four characters, every punctuation mark and bracket costs one,
+and each line break costs one.
+"""
+import re
+
+_PIECES = re.compile(r"\w+|[^\w\s]|\n")
+
+
+def estimate_tokens(text: str) -> int:
+    tokens = 0
+    for piece in _PIECES.findall(text):
+        tokens += (len(piece) + 3) // 4 if piece[0].isalnum() or piece[0] == "_" else 1
+    return max(1, tokens)
@@ -0,0 +1,127 @@
+"""Transcript cache keyed by media fingerprint and ASR settings.
+
+Re-cutting clips from the same VOD re-runs transcription with identical
+inputs, so finished transcripts are stored under a key built from the
+input's sampled-block fingerprint plus the model size, language and
+decoding options. Each entry is `<key>.json` (the segments) with a small
+`<key>.meta.json` next to it holding the source, settings and hit counters,
+so listing and pruning never load whole transcripts.
+"""
+import json
+import os
+import time
+
+from src.utils.fingerprint import fingerprint_file, hash_json_payload
+from src.utils.fsutil import unique_tmp
+
+DEFAULT_TRANSCRIPT_DIR = "cache/transcripts"
+
+
+def _write_json(path: str, data, indent=None):
+    tmp = unique_tmp(path)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+class TranscriptCache:
+    def __init__(self, cache_dir: str = DEFAULT_TRANSCRIPT_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def settings(model_size: str, language=None, decode=None) -> dict:
+        return {"model_size": model_size, "language": language, "decode": decode or {}}
+
+    def make_key(self, input_path: str, settings: dict) -> str:
+        return hash_json_payload({"input": fingerprint_file(input_path), **settings})
+
+    def _paths(self, key: str):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".meta.json"
+
+    def _read_meta(self, key: str):
+        try:
+            with open(self._paths(key)[1], "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def get(self, key: str):
+        """Return the cached segments, or None on a miss."""
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(data_path, "r", encoding="utf-8") as f:
+                segments = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        meta = self._read_meta(key) or {"key": key}
+        meta["hits"] = meta.get("hits", 0) + 1
+        meta["last_used"] = time.time()
+        _write_json(meta_path, meta, indent=2)
+        return segments
+
+    def put(self, key: str, segments: list, input_path: str, settings: dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data_path, meta_path = self._paths(key)
+        _write_json(data_path, segments)
+        now = time.time()
+        _write_json(meta_path, {
+            "key": key,
+            "source": os.path.abspath(input_path),
+            "settings": settings,
+            "segments": len(segments),
+            "created": now,
+            "last_used": now,
+            "hits": 0,
+        }, indent=2)
+
+    def entries(self) -> list:
+        """Metadata of every entry, most recently used first, with its size on disk."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".meta.json"):
+                continue
+            key = name[: -len(".meta.json")]
+            meta = self._read_meta(key)
+            data_path = self._paths(key)[0]
+            if meta is None or not os.path.exists(data_path):
+                continue
+            meta["bytes"] = os.path.getsize(data_path)
+            entries.append(meta)
+        return sorted(entries, key=lambda m: m.get("last_used", 0), reverse=True)
+
+    def remove(self, key: str):
+        for path in self._paths(key):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def prune(self, older_than_days: float = None, max_mb: float = None) -> list:
+        """Drop entries unused for `older_than_days`, then least recently used
+        ones until the cache fits in `max_mb`. Returns the removed entries."""
+        removed = []
+        kept = []
+        cutoff = time.time() - older_than_days * 86400 if older_than_days is not None else None
+        for meta in self.entries():
+            if cutoff is not None and meta.get("last_used", 0) < cutoff:
+                removed.append(meta)
+            else:
+                kept.append(meta)
+        if max_mb is not None:
+            budget = float(max_mb) * 1024 * 1024
+            total = sum(m["bytes"] for m in kept)
+            while kept and total > budget:
+                meta = kept.pop()  # least recently used is last
+                total -= meta["bytes"]
+                removed.append(meta)
+        for meta in removed:
+            self.remove(meta["key"])
+        return removed
+
+    def summary(self) -> str:
+        return f"Transcript cache: {self.hits} hits, {self.misses} misses"
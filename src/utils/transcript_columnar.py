@@ -0,0 +1,151 @@
+"""Columnar, memory-mappable transcript storage.
+
+An 8-hour transcript as indented JSON runs to tens of MB and loads into
+hundreds of thousands of dicts. The columnar form is a directory of raw
+arrays next to the JSON (`transcript.json` -> `transcript.cols/`):
+
+    starts.npy   float64 segment start times (sorted)
+    ends.npy     float64 segment end times
+    offsets.npy  int64 byte offsets into text.bin, one more than segments
+    text.bin     every segment's UTF-8 text, concatenated
+    meta.json    segment count plus the size/mtime of the JSON it mirrors
+
+Arrays and text are memory-mapped, so loading costs a few page faults and
+segment dicts are only built for the rows a consumer actually touches.
+The JSON stays the interchange format (FCP workflows, hand edits); the
+columnar copy is ignored as soon as the JSON changes underneath it.
+"""
+import json
+import mmap
+import os
+import shutil
+
+import numpy as np
+
+COLUMNAR_SUFFIX = ".cols"
+
+
+def columnar_path(json_path: str) -> str:
+    return os.path.splitext(json_path)[0] + COLUMNAR_SUFFIX
+
+
+def write_columnar(segments, path: str, source: str = None):
+    """Write segments (sorted by start) to a columnar directory at `path`.
+
+    `source` is the JSON file these segments came from; its size and mtime
+    are recorded so stale copies are detected.
+    """
+    segments = sorted(segments, key=lambda s: s["start"])
+    encoded = [s["text"].encode("utf-8") for s in segments]
+    offsets = np.zeros(len(segments) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp):
+        shutil.rmtree(tmp)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "starts.npy"), np.array([s["start"] for s in segments], dtype=np.float64))
+    np.save(os.path.join(tmp, "ends.npy"), np.array([s["end"] for s in segments], dtype=np.float64))
+    np.save(os.path.join(tmp, "offsets.npy"), offsets)
+    with open(os.path.join(tmp, "text.bin"), "wb") as f:
+        f.write(b"".join(encoded))
+    meta = {"segments": len(segments)}
+    if source:
+        st = os.stat(source)
+        meta.update(source_size=st.st_size, source_mtime_ns=st.st_mtime_ns)
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    # Swap the whole directory in; readers never see a half-written copy
+    if os.path.exists(path):
+        old = f"{path}.{os.getpid()}.old"
+        os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old)
+    else:
+        os.replace(tmp, path)
+
+
+class ColumnarTranscript:
+    """Read-only, lazily decoded view of a columnar transcript.
+
+    Behaves like a list of {"start", "end", "text"} dicts for iteration,
+    len() and indexing; `starts` and `ends` expose the raw arrays.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        # Plain ndarray views of the maps: memmap's per-item indexing is slow
+        self.starts = np.asarray(np.load(os.path.join(path, "starts.npy"), mmap_mode="r"))
+        self.ends = np.asarray(np.load(os.path.join(path, "ends.npy"), mmap_mode="r"))
+        self.offsets = np.asarray(np.load(os.path.join(path, "offsets.npy"), mmap_mode="r"))
+        text_path = os.path.join(path, "text.bin")
+        self.blob = b""
+        if os.path.getsize(text_path):
+            with open(text_path, "rb") as f:
+                self.blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def text(self, i: int) -> str:
+        return self.blob[int(self.offsets[i]):int(self.offsets[i + 1])].decode("utf-8")
+
+    def segment(self, i: int) -> dict:
+        return {"start": float(self.starts[i]), "end": float(self.ends[i]), "text": self.text(i)}
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.segment(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("transcript index out of range")
+        return self.segment(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.segment(i)
+
+    def to_segments(self) -> list:
+        return list(self)
+
+
+def is_current(path: str, source: str) -> bool:
+    """True when the columnar copy at `path` still mirrors the JSON `source`."""
+    try:
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        st = os.stat(source)
+    except (OSError, json.JSONDecodeError):
+        return False
+    return meta.get("source_size") == st.st_size and meta.get("source_mtime_ns") == st.st_mtime_ns
+
+
+def load_transcript(json_path: str):
+    """Load a transcript, preferring an up-to-date columnar copy over the JSON.
+
+    Raises FileNotFoundError / json.JSONDecodeError like json.load would.
+    """
+    cols = columnar_path(json_path)
+    if is_current(cols, json_path):
+        return ColumnarTranscript(cols)
+    with open(json_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def json_to_columnar(json_path: str, out_path: str = None) -> str:
+    out_path = out_path or columnar_path(json_path)
+    with open(json_path, "r", encoding="utf-8") as f:
+        segments = json.load(f)
+    write_columnar(segments, out_path, source=json_path)
+    return out_path
+
+
+def columnar_to_json(path: str, json_path: str) -> str:
+    segments = ColumnarTranscript(path).to_segments()
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(segments, f, indent=2)
+    return json_path
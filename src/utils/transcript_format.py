@@ -0,0 +1,67 @@
+"""Compact transcript encoding for LLM prompts.
+
+Instead of pretty-printed JSON (mostly whitespace, braces and repeated keys),
+segments are rendered as one `[mm:ss-mm:ss] text` line each. Short segments are
+merged first, and the result is packed into a token budget with deterministic
+truncation: lines are kept in order until the next one would not fit.
+"""
+from src.utils.tokens import estimate_tokens
+
+MIN_SEGMENT_SECONDS = 4.0
+MAX_SEGMENT_SECONDS = 20.0
+
+
+def format_timestamp(seconds: float) -> str:
+    total = int(seconds)
+    h, rem = divmod(total, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02}:{s:02}" if h else f"{m:02}:{s:02}"
+
+
+def merge_short_segments(segments, min_seconds: float = MIN_SEGMENT_SECONDS, max_seconds: float = MAX_SEGMENT_SECONDS):
+    """Merge consecutive segments until each spans at least `min_seconds`.
+
+    A merged segment never grows beyond `max_seconds`, so timing stays useful
+    for picking clip boundaries.
+    """
+    merged = []
+    for seg in segments:
+        text = seg["text"].strip()
+        if not text:
+            continue
+        last = merged[-1] if merged else None
+        if (
+            last is not None
+            and last["end"] - last["start"] < min_seconds
+            and seg["end"] - last["start"] <= max_seconds
+        ):
+            last["end"] = seg["end"]
+            last["text"] = f"{last['text']} {text}"
+        else:
+            merged.append({"start": seg["start"], "end": seg["end"], "text": text})
+    return merged
+
+
+def encode_segment(seg) -> str:
+    return f"[{format_timestamp(seg['start'])}-{format_timestamp(seg['end'])}] {seg['text'].strip()}"
+
+
+def encode_transcript(segments, token_budget: int = None, merge: bool = True):
+    """Encode segments as compact lines, packed into `token_budget` tokens.
+
+    Returns (text, covered_until) where covered_until is the end time (seconds)
+    of the last segment that fit, or None for an empty transcript.
+    """
+    if merge:
+        segments = merge_short_segments(segments)
+    lines, used, covered_until = [], 0, None
+    for seg in segments:
+        line = encode_segment(seg)
+        cost = estimate_tokens(line) + 1
+        if token_budget is not None and used + cost > token_budget:
+            lines.append(f"[... transcript truncated after {format_timestamp(covered_until or 0)}]")
+            break
+        lines.append(line)
+        used += cost
+        covered_until = seg["end"]
+    return "\n".join(lines), covered_until
@@ -0,0 +1,100 @@
+"""Interval index over transcript segments.
+
+Segments are sorted by start time into NumPy arrays. A running maximum of
+the end times makes "segments overlapping [a, b)" two binary searches
+instead of a scan of the whole transcript, and the same arrays answer
+batched queries for many clips at once and snap times to the nearest
+segment boundary.
+"""
+from functools import cached_property
+
+import numpy as np
+
+from src.utils.transcript_columnar import ColumnarTranscript
+
+
+class TranscriptIndex:
+    def __init__(self, segments):
+        if isinstance(segments, ColumnarTranscript):
+            # Already sorted arrays; segment dicts are only built for hits
+            self.segments = segments
+            self.starts = np.asarray(segments.starts)
+            self.ends = np.asarray(segments.ends)
+        else:
+            segments = list(segments)
+            starts = np.fromiter((s["start"] for s in segments), dtype=np.float64, count=len(segments))
+            order = np.argsort(starts, kind="stable")
+            self.segments = [segments[i] for i in order]
+            self.starts = starts[order]
+            self.ends = np.fromiter((s["end"] for s in self.segments), dtype=np.float64, count=len(segments))
+        # max_end[i] = latest end among segments[:i + 1]; non-decreasing, so searchable
+        self.max_end = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+
+    @cached_property
+    def sorted_ends(self):
+        return np.sort(self.ends)
+
+    @cached_property
+    def boundaries(self):
+        return np.unique(np.concatenate([self.starts, self.ends]))
+
+    def __len__(self):
+        return len(self.segments)
+
+    def _candidates(self, start, end):
+        # Everything before `lo` ends at or before `start`; everything from `hi` starts at or after `end`
+        lo = np.searchsorted(self.max_end, start, side="right")
+        hi = np.searchsorted(self.starts, end, side="left")
+        return lo, hi
+
+    def _overlapping_slice(self, lo, hi, start):
+        if lo >= hi:
+            return []
+        # Segments inside [lo, hi) can still end before `start` when a long one precedes them
+        keep = np.nonzero(self.ends[lo:hi] > start)[0]
+        return [self.segments[lo + i] for i in keep]
+
+    def overlapping(self, start: float, end: float) -> list:
+        """Segments with start < `end` and end > `start`, in start order."""
+        lo, hi = self._candidates(start, end)
+        return self._overlapping_slice(lo, hi, start)
+
+    def overlapping_batch(self, ranges) -> list:
+        """`overlapping` for many (start, end) ranges with vectorized searches."""
+        ranges = np.asarray(ranges, dtype=np.float64).reshape(-1, 2)
+        los, his = self._candidates(ranges[:, 0], ranges[:, 1])
+        return [self._overlapping_slice(lo, hi, start) for lo, hi, start in zip(los, his, ranges[:, 0])]
+
+    def text(self, start: float, end: float) -> list:
+        return [seg["text"] for seg in self.overlapping(start, end)]
+
+    def snap(self, times, to: str = "any", max_shift: float = None):
+        """Move each time to the nearest segment boundary.
+
+        `to` picks the boundaries: "start", "end" or "any". Times with no
+        boundary within `max_shift` seconds are left unchanged. Accepts a
+        scalar or an array and returns the same shape.
+        """
+        bounds = {"any": self.boundaries, "start": self.starts, "end": self.sorted_ends}[to]
+        t = np.asarray(times, dtype=np.float64)
+        if len(bounds):
+            idx = np.searchsorted(bounds, t)
+            before = bounds[np.clip(idx - 1, 0, len(bounds) - 1)]
+            after = bounds[np.clip(idx, 0, len(bounds) - 1)]
+            nearest = np.where(np.abs(t - before) <= np.abs(after - t), before, after)
+            if max_shift is not None:
+                nearest = np.where(np.abs(nearest - t) <= max_shift, nearest, t)
+        else:
+            nearest = t
+        return nearest if nearest.ndim else float(nearest)
+
+    def snap_clip(self, start: float, end: float, max_shift: float = None):
+        """Snap a clip's start to a segment start and its end to a segment end.
+
+        The original times are returned when snapping would empty the clip.
+        """
+        new_start = self.snap(start, "start", max_shift)
+        new_end = self.snap(end, "end", max_shift)
+        if new_end <= new_start:
+            return start, end
+        return new_start, new_end
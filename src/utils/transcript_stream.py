@@ -0,0 +1,146 @@
+"""Incremental transcript output: a JSONL segment log plus a progress watermark.
+
+The writer appends finished segments to `<transcript>.jsonl` and then moves
+the watermark (seconds of audio fully transcribed) forward in
+`<transcript>.progress.json`. A segment is final once its midpoint lies
+below the watermark, so readers can consume the head of a VOD while later
+parts are still being transcribed, and a crashed run resumes from the last
+watermark instead of from zero.
+"""
+import json
+import os
+import time
+
+DEFAULT_IDLE_TIMEOUT = 600
+STALL_RTF_MARGIN = 10        # a window may take this many times the target RTF...
+MODEL_LOAD_ALLOWANCE = 300   # ...plus this long for loading the model before the first one
+
+
+class StreamIncomplete(RuntimeError):
+    """The transcript stream ended without being marked complete (writer failed or stalled)."""
+
+
+def stall_timeout(chunk_seconds: float, target_rtf: float) -> float:
+    """Seconds without watermark progress after which a follower gives up.
+
+    The watermark moves once per finished window, so the timeout has to
+    cover a whole window at a pessimistic real-time factor, plus model load.
+    """
+    window = float(chunk_seconds) * float(target_rtf) * STALL_RTF_MARGIN
+    return max(DEFAULT_IDLE_TIMEOUT, window + MODEL_LOAD_ALLOWANCE)
+
+
+def stream_paths(transcript_path: str):
+    """Default (jsonl, progress) paths next to a transcript JSON file."""
+    root, _ = os.path.splitext(transcript_path)
+    return root + ".jsonl", root + ".progress.json"
+
+
+def _midpoint(seg) -> float:
+    return (seg["start"] + seg["end"]) / 2
+
+
+def append_segments(path: str, segments):
+    """Append segments as JSON lines and flush them to disk."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for seg in segments:
+            f.write(json.dumps(seg, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def rewrite_segments(path: str, segments):
+    """Replace the JSONL log with `segments` (used when resuming or restarting)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for seg in segments:
+            f.write(json.dumps(seg, ensure_ascii=False) + "\n")
+    os.replace(tmp, path)
+
+
+def read_segments(path: str, watermark: float = None) -> list:
+    """Segments from a JSONL log, optionally only those final below `watermark`.
+
+    A torn last line from an interrupted write is ignored.
+    """
+    segments = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    seg = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if watermark is None or _midpoint(seg) < watermark:
+                    segments.append(seg)
+    except FileNotFoundError:
+        pass
+    return segments
+
+
+def write_progress(path: str, watermark: float, complete: bool = False, **extra):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"watermark": round(watermark, 3), "complete": complete, **extra}, f, indent=2)
+    os.replace(tmp, path)
+
+
+def read_progress(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def follow_segments(jsonl_path: str, progress_path: str, poll_interval: float = 1.0,
+                    idle_timeout: float = DEFAULT_IDLE_TIMEOUT, writer_alive=None):
+    """Yield segments in order as the writer makes them final.
+
+    Stops once the writer marks the transcript complete. Raises
+    StreamIncomplete when the writer reports an error, or when the watermark
+    has not moved for `idle_timeout` seconds; with `writer_alive` (a callable
+    telling whether the in-process writer is still running) the timeout only
+    starts counting once the writer is gone.
+    """
+    offset = 0
+    pending = []
+    watermark = -1.0
+    last_change = time.monotonic()
+    while True:
+        progress = read_progress(progress_path) or {}
+        if progress.get("watermark", -1.0) != watermark:
+            watermark = progress.get("watermark", -1.0)
+            last_change = time.monotonic()
+        if writer_alive is not None and writer_alive():
+            last_change = time.monotonic()
+
+        try:
+            with open(jsonl_path, "r", encoding="utf-8") as f:
+                f.seek(offset)
+                while True:
+                    line = f.readline()
+                    if not line.endswith("\n"):
+                        break  # not fully written yet
+                    offset = f.tell()
+                    pending.append(json.loads(line))
+        except FileNotFoundError:
+            pass
+
+        final = 0
+        while final < len(pending) and _midpoint(pending[final]) < watermark:
+            final += 1
+        yield from pending[:final]
+        del pending[:final]
+
+        if progress.get("error"):
+            raise StreamIncomplete(f"transcription failed at {max(watermark, 0):.0f}s: {progress['error']}")
+        if progress.get("complete"):
+            yield from pending
+            return
+        if time.monotonic() - last_change > idle_timeout:
+            raise StreamIncomplete(f"transcript stream stalled at {watermark:.0f}s")
+        time.sleep(poll_interval)
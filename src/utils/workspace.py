@@ -0,0 +1,132 @@
+"""Per-job workspaces.
+
+Agents used to hard-code `stream_input.mp4`, `assets/meta/*.json` and
+`outputs/...`, so two runs on one host overwrote each other. A Workspace
+resolves every per-job path from the `paths`, `outputs` and
+`runtime.log_file` sections of pixal.yaml:
+
+    Workspace(cfg)                    the configured layout, relative to the repo
+    Workspace.for_job(cfg, job_id)    the same layout under workspaces/<job_id>/
+
+Agents take a `workspace` and fall back to the default layout without one.
+Caches under `cache/` are deliberately not re-rooted: they are
+content-addressed and written atomically under unique temp names, and the
+VOD store locks each entry while it downloads, so concurrent jobs share them.
+"""
+import copy
+import hashlib
+import os
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_JOBS_DIR = "workspaces"
+
+# Layout used when pixal.yaml (or a section of it) is not given
+DEFAULT_PATHS = {
+    "input_video": "stream_input.mp4",
+    "input_audio": "stream_audio.m4a",
+    "editspec": "assets/meta/editspec.json",
+    "augmented_editspec": "assets/meta/augmented_editspec.json",
+    "transcript": "assets/meta/transcript.json",
+    "clips": "assets/meta/clips.json",
+    "fcpxml": "assets/meta/pixal_timeline.fcpxml",
+    "stream_meta": "assets/meta/stream_meta.json",
+    "run_manifest": "assets/meta/run_manifest.json",
+    "audio": "assets/meta/audio.json",
+    "analysis": "assets/meta/analysis.json",
+    "vod_source": "assets/meta/vod_source.json",
+    "ranges": "assets/meta/ranges.json",
+}
+DEFAULT_OUTPUTS = {
+    "base_dir": "outputs",
+    "runs_dir": "outputs/runs",
+    "shorts_dir_name": "shorts",
+    "capsynth_dir_name": "capsynth",
+}
+DEFAULT_LOG_FILE = "logs/pixal.log"
+
+
+def normalize_source(source: str) -> str:
+    """Canonical form of a VOD URL or file path, so spellings of one VOD match.
+
+    URLs lose the scheme difference between http and https, a leading
+    "www.", the fragment and any trailing slash; file paths become absolute.
+    """
+    source = source.strip()
+    parts = urlsplit(source)
+    if parts.scheme.lower() in ("http", "https"):
+        host = parts.netloc.lower()
+        host = host[4:] if host.startswith("www.") else host
+        return urlunsplit(("https", host, parts.path.rstrip("/"), parts.query, ""))
+    return os.path.abspath(os.path.expanduser(source))
+
+
+def job_id_for(source: str) -> str:
+    """Stable, filesystem-safe job ID for a VOD URL or file path.
+
+    Stable so that re-submitting the same VOD, however it is spelled (see
+    normalize_source), reuses its workspace and the pipeline can skip steps
+    that are already up to date.
+    """
+    source = normalize_source(source)
+    tail = source.rstrip("/").rsplit("/", 1)[-1]
+    stem = re.sub(r"[^A-Za-z0-9]+", "-", os.path.splitext(tail)[0]).strip("-")[:40] or "job"
+    return f"{stem}-{hashlib.sha1(source.encode('utf-8')).hexdigest()[:8]}"
+
+
+def _rebase(value: str, root: str) -> str:
+    return value if os.path.isabs(value) else os.path.join(root, value)
+
+
+class Workspace:
+    """Resolves the per-job paths of one pipeline run."""
+
+    def __init__(self, cfg: dict = None, root: str = None):
+        """`cfg` is a loaded pixal.yaml; with `root`, every per-job path in
+        it is re-rooted under that directory (`cfg` itself is not modified)."""
+        self.root = root
+        cfg = cfg or {}
+        if root:
+            cfg = copy.deepcopy(cfg)
+            paths = cfg.setdefault("paths", {})
+            for name, default in DEFAULT_PATHS.items():
+                paths[name] = _rebase(paths.get(name, default), root)
+            outputs = cfg.setdefault("outputs", {})
+            for name in ("base_dir", "runs_dir"):
+                outputs[name] = _rebase(outputs.get(name, DEFAULT_OUTPUTS[name]), root)
+            runtime = cfg.setdefault("runtime", {})
+            runtime["log_file"] = _rebase(runtime.get("log_file", DEFAULT_LOG_FILE), root)
+        self.cfg = cfg
+
+    @classmethod
+    def for_job(cls, cfg: dict, job_id: str, jobs_dir: str = None):
+        jobs_dir = jobs_dir or cfg.get("batch", {}).get("jobs_dir", DEFAULT_JOBS_DIR)
+        return cls(cfg, os.path.join(jobs_dir, job_id))
+
+    def _outputs(self, name: str) -> str:
+        return self.cfg.get("outputs", {}).get(name, DEFAULT_OUTPUTS[name])
+
+    def path(self, name: str) -> str:
+        """Path of a named artifact (any key of `paths`) or output directory
+        ("shorts_dir", "capsynth_dir", "validation_dir", "runs_dir", "log_file")."""
+        if name == "shorts_dir":
+            return os.path.join(self._outputs("base_dir"), self._outputs("shorts_dir_name"))
+        if name == "capsynth_dir":
+            return os.path.join(self._outputs("base_dir"), self._outputs("capsynth_dir_name"))
+        if name == "validation_dir":
+            return os.path.join(self._outputs("base_dir"), "validation")
+        if name == "runs_dir":
+            return self._outputs("runs_dir")
+        if name == "log_file":
+            return self.cfg.get("runtime", {}).get("log_file", DEFAULT_LOG_FILE)
+        paths = self.cfg.get("paths", {})
+        if name not in paths and name not in DEFAULT_PATHS:
+            raise KeyError(f"Unknown workspace path: {name}")
+        return paths.get(name, DEFAULT_PATHS.get(name))
+
+    def meta_dir(self) -> str:
+        """Directory holding the JSON artifacts (assets/meta in the default layout)."""
+        return os.path.dirname(self.path("transcript")) or "."
+
+    def __repr__(self):
+        return f"Workspace(root={self.root or '.'!r})"